@@ -1,43 +1,271 @@
+import csv
+import os
+import tempfile
 import streamlit as st
-import pandas as pd
-import logging
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from config import LOCATIONS, JOB_TITLES, OUTPUT_FILE, CSV_COLUMNS
-from utils import setup_logger, parse_relative_date, normalize_url
+from config import LOCATIONS, JOB_TITLES, CSV_COLUMNS
+from utils import parse_dates, normalize_url
+from executor import SearchExecutor, CircuitOpenError
+from store import JobStore
+from planner import plan_searches
+from dedupe import NearDuplicateIndex
+from records import JobRecord, jobs_frame
+from fetch import Fetcher
 from scrapers.brightermonday import BrighterMondayScraper
 from scrapers.myjobmag import MyJobMagScraper
-from scrapers.linkedin import LinkedinScraper
+from scrapers.linkedin_guest import create_linkedin_scraper
 
 # Configure Streamlit
 st.set_page_config(page_title="Eastern Africa Job Scraper", layout="wide")
 
+@st.cache_resource
+def get_fetcher():
+    """HTTP fetcher behind the scrapers; its retry budget is reset as each scrape starts"""
+    return Fetcher()
+
+@st.cache_resource
 def get_scrapers():
-    """Returns initialized scrapers"""
+    """Returns initialized scrapers, shared across sessions so browsers and sessions stay warm"""
+    fetcher = get_fetcher()
     return [
-        BrighterMondayScraper(),
-        MyJobMagScraper(),
-        LinkedinScraper()
+        BrighterMondayScraper(fetcher=fetcher),
+        MyJobMagScraper(fetcher=fetcher),
+        create_linkedin_scraper(fetcher=fetcher)
     ]
 
-def filter_jobs_by_date(jobs, days_lookback):
-    """Filters jobs based on parsed date"""
-    cutoff_date = datetime.now() - timedelta(days=days_lookback)
-    filtered = []
+@st.cache_resource
+def get_store():
+    """Job history shared by all sessions and background scrapes"""
+    return JobStore()
+
+@st.cache_data(ttl=600)
+def load_history_page(latest_run, filters, page, page_size):
+    """One page of the filtered history; `latest_run` is part of the key so new runs invalidate it"""
+    return get_store().query(**dict(filters), limit=page_size, offset=page * page_size)
+
+@st.cache_data(ttl=600)
+def count_history(latest_run, filters):
+    return get_store().count_history(**dict(filters))
+
+@contextmanager
+def history_csv_file(filters):
+    """
+    The filtered history as a CSV file open for reading. Rows are written to
+    a temporary file a chunk at a time, so only one chunk is in memory while
+    it's built. Built when asked for rather than cached, since each copy is
+    as big as the history.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", encoding="utf-8", delete=False) as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        for rows in get_store().iter_history(**dict(filters)):
+            writer.writerows(rows)
+    try:
+        with open(f.name, "rb") as data:
+            yield data
+    finally:
+        os.remove(f.name)
+
+class ScrapeJob:
+    """
+    A scrape running on a background thread.
+
+    The page only reads its progress and the jobs found so far, so reruns
+    (touching a widget) don't interrupt it. Results are appended to the job
+    history as each search finishes, and deduped (exact and near-duplicate)
+    and date-parsed once as they come in, so the page's once-a-second reruns
+    don't redo that work for everything found so far.
+    """
+
+    def __init__(self, scrapers, locations, titles, days_lookback):
+        # Only dispatch searches the scrapers support, merging synonym titles
+        plan, self.naive_count = plan_searches(scrapers, locations, titles)
+        self.searches = [(search.scraper, search.search_term) for search in plan]
+        self.params = {"locations": locations, "titles": titles, "days": days_lookback}
+        self.days_lookback = days_lookback
+
+        # Deduped jobs as compact records, with the parsed date and canonical ID of each
+        self.jobs = []
+        self.dates = []
+        self.ids = []
+        self.raw_count = 0
+        self.errors = []
+        self.done_count = 0
+        self.status = "Starting..."
+        self.finished = False
+        self.run_id = None
+
+        self._seen = set()
+        self._near = NearDuplicateIndex()
+        self._frame = None
+        self._frame_key = None
+
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    @property
+    def progress(self):
+        return min(self.done_count / max(len(self.searches), 1), 1.0)
+
+    def results(self, days_lookback):
+        """
+        (jobs found, jobs after dedupe, DataFrame of those posted in the last
+        `days_lookback` days) so far. The DataFrame is only rebuilt when new
+        jobs came in.
+        """
+        with self._lock:
+            raw_count, count = self.raw_count, len(self.jobs)
+            key = (count, days_lookback)
+            if self._frame_key != key:
+                cutoff = datetime.now() - timedelta(days=days_lookback)
+                kept = [i for i, date in enumerate(self.dates) if date >= cutoff]
+                self._frame = jobs_frame([self.jobs[i] for i in kept])
+                self._frame["canonical_id"] = [self.ids[i] for i in kept]
+                self._frame_key = key
+            return raw_count, count, self._frame
+
+    def _run(self):
+        store = get_store()
+        self.run_id = store.start_run(self.params)
+        # The fetcher outlives runs, so give each one the full retry budget
+        get_fetcher().retry.reset()
+        try:
+            SearchExecutor().run(self.searches, on_result=self._on_result, keep_results=False)
+        except Exception as e:
+            self.errors.append(f"Scrape failed: {e}")
+        finally:
+            store.finish_run(self.run_id)
+            self.finished = True
+
+    def _on_result(self, index, scraper, search_term, jobs, error):
+        scraper_name = scraper.__class__.__name__
+        if isinstance(error, CircuitOpenError):
+            # One notice per source rather than one per skipped search
+            notice = f"Skipping the rest of {scraper_name}: too many failed searches in a row"
+            if notice not in self.errors:
+                self.errors.append(notice)
+        elif error:
+            self.errors.append(f"Error on {scraper_name}: {error}")
+        if jobs:
+            get_store().append(self.run_id, jobs, country=search_term["location"])
+
+        records, ids = self._dedupe(jobs)
+        dates = parse_dates([record.posted_date for record in records]).tolist()
+        with self._lock:
+            # Held for the whole scrape, so kept as compact records
+            self.jobs.extend(records)
+            self.dates.extend(dates)
+            self.ids.extend(ids)
+            self.raw_count += len(jobs)
+            self.done_count += 1
+        self.status = f"Scraped {scraper_name}: {search_term['title']} in {search_term['location']}"
+
+    def _dedupe(self, jobs):
+        """
+        Drops jobs already seen (same title, company and link) and
+        near-duplicates of earlier ones (the same posting on another site).
+        Returns the kept jobs as records and their canonical IDs. Only called
+        from the scrape thread.
+        """
+        records, ids = [], []
+        for job in jobs:
+            key = (job.get("title"), str(job.get("company")), normalize_url(job.get("link")))
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            canonical_id, is_duplicate = self._near.add(job)
+            if not is_duplicate:
+                records.append(JobRecord.from_dict(job))
+                ids.append(canonical_id)
+        return records, ids
+
+def show_stored_jobs(selected_locations, days_lookback):
+    """
+    Browses the stored history. Filtering and paging run in SQLite, so only
+    the visible page is loaded however much history has built up.
+    """
+    store = get_store()
+    latest_run = store.latest_run()
+    if latest_run is None:
+        st.info("No stored jobs yet. Start a scrape from the sidebar.")
+        return
     
-    for job in jobs:
-        # Parse date if not already datetime
-        posted = job.get('posted_date', 'Recent')
-        job_dt = parse_relative_date(posted)
-        
-        # If parsing fails or implies older than cutoff (rough heuristic)
-        # Note: parse_relative_date defaults to NOW if it fails or is 'recent', 
-        # so 'recent' jobs will always pass.
-        
-        if job_dt >= cutoff_date:
-            job['parsed_date'] = job_dt # Store for sorting
-            filtered.append(job)
-            
-    return filtered
+    st.subheader("Stored jobs")
+    col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+    title = col1.text_input("Title contains")
+    company = col2.text_input("Company contains")
+    sources = col3.multiselect("Sources", store.history_sources())
+    latest_only = col4.checkbox("Latest run only", value=True)
+    
+    # Filters are passed as a sorted tuple so they can key the caches
+    cutoff = (datetime.now() - timedelta(days=days_lookback)).replace(hour=0, minute=0, second=0, microsecond=0)
+    filters = tuple(sorted({
+        "run_id": latest_run if latest_only else None,
+        "countries": tuple(selected_locations) or None,
+        "sources": tuple(sources) or None,
+        "title": title or None,
+        "company": company or None,
+        "since": cutoff
+    }.items()))
+    
+    total = count_history(latest_run, filters)
+    if not total:
+        st.info("No stored jobs match these filters.")
+        return
+    
+    col1, col2 = st.columns([1, 4])
+    page_size = col1.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+    pages = (total + page_size - 1) // page_size
+    page = col1.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) - 1
+    col2.caption(f"{total} jobs (latest run #{latest_run})")
+    
+    st.dataframe(load_history_page(latest_run, filters, page, page_size), use_container_width=True)
+    
+    if st.button("Prepare CSV download"):
+        with history_csv_file(filters) as data:
+            st.download_button(
+                "📥 Download CSV",
+                data,
+                f"eastern_africa_jobs_{datetime.now().strftime('%Y%m%d')}.csv",
+                "text/csv",
+                key='download-history-csv'
+            )
+
+def show_results(job, metric_total, metric_new, metric_filtered, download=True):
+    """Displays a scrape's deduped, date-filtered jobs (see ScrapeJob.results)"""
+    days_lookback = job.days_lookback
+    initial_count, unique_count, df_filtered = job.results(days_lookback)
+    if not initial_count:
+        return False
+    
+    # Display Metrics
+    metric_total.metric("Jobs Found (Raw)", initial_count)
+    metric_new.metric("After Dedupe", unique_count)
+    metric_filtered.metric(f"Last {days_lookback} Days", len(df_filtered))
+    
+    # Clean up columns for display
+    display_cols = ['title', 'company', 'location', 'posted_date', 'link', 'source', 'canonical_id']
+    final_df = df_filtered[display_cols]
+    
+    st.dataframe(final_df, use_container_width=True)
+    
+    # CSV Download
+    if download:
+        csv = final_df.to_csv(index=False).encode('utf-8')
+        st.download_button(
+            "📥 Download CSV",
+            csv,
+            f"eastern_africa_jobs_{datetime.now().strftime('%Y%m%d')}.csv",
+            "text/csv",
+            key='download-csv'
+        )
+    return True
 
 def main():
     st.title("🐯 Eastern Africa Data Job Scraper")
@@ -65,92 +293,51 @@ def main():
     col1, col2, col3 = st.columns(3)
     metric_total = col1.empty()
     metric_new = col2.empty()
+    metric_filtered = col3.empty()
     status_text = st.empty()
     
+    # The scrape lives in session state, so it survives reruns of this script
+    job = st.session_state.get("scrape_job")
+    
     if run_btn:
-        if not selected_locations or not selected_titles:
+        if job and not job.finished:
+            st.warning("A scrape is already running.")
+        elif not selected_locations or not selected_titles:
             st.error("Please select at least one location and one job title.")
             return
-            
-        scrapers = get_scrapers()
-        all_jobs = []
-        progress_bar = st.progress(0)
-        
-        total_steps = len(scrapers) * len(selected_locations) * len(selected_titles)
-        step_count = 0
-        
-        status_text.info(f"Starting scrape for {len(selected_titles)} titles in {len(selected_locations)} countries...")
-        
-        # Scrape Loop
-        for scraper in scrapers:
-            scraper_name = scraper.__class__.__name__
-            
-            for location in selected_locations:
-                for title in selected_titles:
-                    status_text.text(f"Scraping {scraper_name}: {title} in {location}...")
-                    
-                    search_term = {"title": title, "location": location}
-                    try:
-                        jobs = scraper.scrape(search_term)
-                        if jobs:
-                            all_jobs.extend(jobs)
-                    except Exception as e:
-                        st.warning(f"Error on {scraper_name}: {e}")
-                        
-                    step_count += 1
-                    progress_bar.progress(min(step_count / total_steps, 0.99))
-        
-        progress_bar.progress(1.0)
-        status_text.success("Scraping completed!")
-        
-        # Processing
-        if all_jobs:
-            df = pd.DataFrame(all_jobs)
-            
-            # 1. Normalize URLs
-            df['link_clean'] = df['link'].apply(normalize_url)
-            
-            # 2. Key Deduplication (Title + Company + Normalized Link)
-            # Create a composite key to be safe
-            df['dedupe_id'] = df['title'] + df['company'] + df['link_clean']
-            
-            initial_count = len(df)
-            df.drop_duplicates(subset=['dedupe_id'], keep='first', inplace=True)
-            unique_count = len(df)
-            
-            # 3. Date Filtering
-            # We convert DF back to list of dicts for our helper, or apply on DF
-            # Applying on DF using lambda with our util
-            df['parsed_date'] = df['posted_date'].apply(parse_relative_date)
-            cutoff = datetime.now() - timedelta(days=days_lookback)
-            
-            # Filter
-            df_filtered = df[df['parsed_date'] >= cutoff].copy()
-            filtered_count = len(df_filtered)
-            
-            # Display Metrics
-            metric_total.metric("Jobs Found (Raw)", initial_count)
-            metric_new.metric("After Dedupe", unique_count)
-            col3.metric(f"Last {days_lookback} Days", filtered_count)
-            
-            # Clean up columns for display
-            display_cols = ['title', 'company', 'location', 'posted_date', 'link', 'source']
-            final_df = df_filtered[display_cols]
-            
-            st.dataframe(final_df, use_container_width=True)
-            
-            # CSV Download
-            csv = final_df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                "📥 Download CSV",
-                csv,
-                f"eastern_africa_jobs_{datetime.now().strftime('%Y%m%d')}.csv",
-                "text/csv",
-                key='download-csv'
-            )
-            
         else:
-            st.warning("No jobs found matching your criteria.")
+            job = ScrapeJob(get_scrapers(), selected_locations, selected_titles, days_lookback)
+            job.start()
+            st.session_state["scrape_job"] = job
+    
+    if not job:
+        show_stored_jobs(selected_locations, days_lookback)
+        return
+    
+    progress_bar = st.progress(job.progress)
+    for error in list(job.errors):
+        st.warning(error)
+    
+    if not job.finished:
+        status_text.info(
+            f"Scraping {len(job.params['titles'])} titles in {len(job.params['locations'])} countries "
+            f"({len(job.searches)} searches instead of {job.naive_count}). {job.status}"
+        )
+        show_results(job, metric_total, metric_new, metric_filtered, download=False)
+        
+        # Poll for progress
+        time.sleep(1)
+        st.rerun()
+    
+    progress_bar.progress(1.0)
+    status_text.success("Scraping completed!")
+    
+    if not show_results(job, metric_total, metric_new, metric_filtered):
+        st.warning("No jobs found matching your criteria.")
+    
+    # The scrape's jobs are in the history now, browse them alongside earlier runs
+    st.divider()
+    show_stored_jobs(selected_locations, days_lookback)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,79 @@
+"""
+Date parsing throughput: the original row-wise dateparser filter vs the
+fast-path / memoized / vectorized one, on a synthetic job history.
+
+    python -m benchmarks.bench_dates
+    python -m benchmarks.bench_dates --rows 100000 --legacy-rows 2000 --days 10
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+import dateparser
+import pandas as pd
+from config import OUTPUT_FILE
+from utils import filter_by_days, is_within_days
+
+# Relative strings as they come off MyJobMag / BrighterMonday cards
+RELATIVE_SAMPLES = ["Recent", "N/A", "Today", "Yesterday", "1 day ago", "3 days ago",
+                    "2 weeks ago", "a month ago", "Dec 03, 2025", "Nov 14, 2025"]
+
+
+def build_history(rows, seed=0):
+    """Samples posted_date values shaped like the stored CSV plus relative strings"""
+    try:
+        dates = pd.read_csv(OUTPUT_FILE, skiprows=1)["posted_date"].dropna().tolist()
+    except (OSError, KeyError, ValueError):
+        dates = []
+    dates = dates or ["2025-11-15", "2025-11-14", "2025-07-08"]
+
+    rng = random.Random(seed)
+    values = [rng.choice(dates) if rng.random() < 0.7 else rng.choice(RELATIVE_SAMPLES) for _ in range(rows)]
+    return pd.DataFrame({"posted_date": values})
+
+
+def legacy_filter(df, days):
+    """The original per-row filter: dateparser on every row via df.apply"""
+    def check_date(row):
+        date_str = row["posted_date"]
+        if not date_str or date_str.lower() in ["recent", "n/a", "today", "just now"]:
+            return True
+        try:
+            dt = dateparser.parse(date_str) or datetime.now()
+        except Exception:
+            dt = datetime.now()
+        return is_within_days(dt, days)
+
+    return df[df.apply(check_date, axis=1)]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark date parsing and filtering")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows in the synthetic history")
+    parser.add_argument("--legacy-rows", type=int, default=2_000, help="Rows to time the legacy filter on (it is slow)")
+    parser.add_argument("--days", type=int, default=10)
+    args = parser.parse_args()
+
+    df = build_history(args.rows)
+    sample = df.head(args.legacy_rows)
+
+    legacy_kept, legacy_time = timed(legacy_filter, sample, args.days)
+    fast_sample_kept, _ = timed(filter_by_days, sample, args.days)
+    fast_kept, fast_time = timed(filter_by_days, df, args.days)
+
+    legacy_rate = len(sample) / legacy_time
+    fast_rate = len(df) / fast_time
+    print(f"legacy row-wise: {legacy_rate:>12,.0f} rows/s ({len(sample):,} rows in {legacy_time:.2f}s)")
+    print(f"vectorized:      {fast_rate:>12,.0f} rows/s ({len(df):,} rows in {fast_time:.2f}s)")
+    print(f"speedup:         {fast_rate / legacy_rate:>12,.1f}x")
+    print(f"same rows kept on the legacy sample: {legacy_kept.index.equals(fast_sample_kept.index)}")
+
+
+if __name__ == "__main__":
+    main()
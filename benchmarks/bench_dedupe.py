@@ -0,0 +1,111 @@
+"""
+Near-duplicate clustering: MinHash/LSH (dedupe.NearDuplicateIndex) vs a
+naive pairwise comparison, on synthetic postings syndicated across sources
+with small title / company spelling differences.
+
+Companies are either spread evenly, or skewed the way real listings are: a
+few big employers post most jobs (Zipf-distributed) and a share of jobs has
+a placeholder company ("N/A", "Confidential"). The skewed set is the one
+that shows whether blocking stays near-linear.
+
+    python -m benchmarks.bench_dedupe
+    python -m benchmarks.bench_dedupe --sizes 2000 8000 32000 --pairwise-rows 2000
+"""
+import argparse
+import random
+import string
+import time
+from dedupe import assign_canonical_ids, is_near_duplicate, is_placeholder_company, shingles
+
+TITLES = ["data analyst", "senior data analyst", "data engineer", "data scientist", "BI developer",
+          "business intelligence analyst", "analytics engineer", "machine learning engineer"]
+SOURCES = ["LinkedIn", "BrighterMonday", "MyJobMag"]
+LOCATIONS = ["Nairobi", "Kampala", "Kigali", "Dar es Salaam", "Addis Ababa"]
+SUFFIXES = ["", " Ltd", " Limited", " PLC"]
+PLACEHOLDERS = ["N/A", "Confidential"]
+
+
+def build_postings(rows, repost_rate=0.3, seed=0, skewed=False, placeholder_rate=0.2):
+    """Unique postings, a share of which reappear on other sources with a varied spelling"""
+    rng = random.Random(seed)
+    companies = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12))).title()
+                 for _ in range(max(rows // 5, 10))]
+    # Zipf: the k-th company posts 1/k as often as the biggest one
+    weights = [1 / rank for rank in range(1, len(companies) + 1)] if skewed else None
+
+    jobs = []
+    clusters = []
+    seen = set()
+    while len(jobs) < rows:
+        placeholder = skewed and rng.random() < placeholder_rate
+        job = {
+            "title": rng.choice(TITLES),
+            "company": rng.choice(PLACEHOLDERS) if placeholder else rng.choices(companies, weights)[0],
+            "location": rng.choice(LOCATIONS),
+            "source": rng.choice(SOURCES)
+        }
+        # One opening per (title, company, location), anything else would be ambiguous.
+        # Placeholder jobs can't be told apart anyway, so they're never reposted here.
+        key = (job["title"], job["company"], job["location"])
+        if key in seen and not placeholder:
+            continue
+        seen.add(key)
+        cluster = len(clusters)
+        copies = [job]
+        if rng.random() < repost_rate and not placeholder:
+            for source in SOURCES:
+                if source != job["source"] and rng.random() < 0.7:
+                    title = job["title"].title() if rng.random() < 0.5 else job["title"] + " "
+                    copies.append(dict(job, title=title, company=job["company"] + rng.choice(SUFFIXES), source=source))
+        for copy in copies:
+            copy["link"] = f"https://example.com/{copy['source']}/{len(jobs)}"
+            jobs.append(copy)
+            clusters.append(cluster)
+
+    return jobs[:rows], clusters[:rows]
+
+
+def pairwise_ids(jobs):
+    """Naive O(n^2) clustering with the same similarity test, for comparison"""
+    grams = [shingles(job) for job in jobs]
+    ids = list(range(len(jobs)))
+    for i in range(len(jobs)):
+        for j in range(i):
+            if is_placeholder_company(jobs[i]["company"]) or is_placeholder_company(jobs[j]["company"]):
+                continue
+            if jobs[i]["source"] != jobs[j]["source"] and is_near_duplicate(grams[i], grams[j]):
+                ids[i] = ids[j]
+                break
+    return ids
+
+
+def cluster_count(ids):
+    return len(set(ids))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate clustering")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2_000, 8_000, 32_000], help="Postings per run")
+    parser.add_argument("--pairwise-rows", type=int, default=2_000, help="Rows to time the pairwise baseline on (it is quadratic)")
+    args = parser.parse_args()
+
+    jobs, clusters = build_postings(args.pairwise_rows)
+    _, pairwise_time = timed(pairwise_ids, jobs)
+    print(f"pairwise:  {len(jobs):>7,} jobs in {pairwise_time:6.2f}s")
+
+    for skewed in (False, True):
+        for size in args.sizes:
+            jobs, clusters = build_postings(size, skewed=skewed)
+            ids, lsh_time = timed(assign_canonical_ids, jobs)
+            print(f"minhash:   {size:>7,} jobs in {lsh_time:6.2f}s ({'skewed' if skewed else 'even'} companies, "
+                  f"{size / lsh_time:>8,.0f} jobs/s, {cluster_count(ids):,} clusters, {cluster_count(clusters):,} true postings)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Parse step of each scraper in isolation, on the recorded fixtures
+(see benchmarks/fixture_pages.py). For every fixture it reports whether the
+records match the expected ones, records per second, allocated blocks and
+the peak traced memory of a single parse.
+
+    python -m benchmarks.bench_parse
+    python -m benchmarks.bench_parse --source MyJobMag --repeat 50
+    python -m benchmarks.bench_parse --compare benchmarks/results/parse-<...>.json
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from benchmarks.fixture_pages import load_fixtures, make_scraper, SOURCES
+from benchmarks.results import save_results, compare
+
+
+def measure_memory(scraper, html, search_term):
+    """(allocated blocks, peak bytes) traced while parsing once"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        scraper.parse(html, search_term)
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return blocks, peak
+
+
+def bench_fixture(fixture, repeat):
+    scraper = make_scraper(fixture["source"])
+    search_term = {"location": fixture["location"]}
+
+    records = scraper.parse(fixture["html"], search_term)
+    mismatches = sum(1 for got, want in zip(records, fixture["expected"]) if got != want)
+    mismatches += abs(len(records) - len(fixture["expected"]))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scraper.parse(fixture["html"], search_term)
+    elapsed = time.perf_counter() - start
+
+    blocks, peak = measure_memory(scraper, fixture["html"], search_term)
+    return {
+        "name": fixture["file"],
+        "source": fixture["source"],
+        "page_bytes": len(fixture["html"]),
+        "records": len(records),
+        "expected": len(fixture["expected"]),
+        "mismatches": mismatches,
+        "records_per_sec": len(records) * repeat / elapsed,
+        "ms_per_page": elapsed / repeat * 1000,
+        "alloc_blocks": blocks,
+        "peak_bytes": peak
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper parsing on recorded pages")
+    parser.add_argument("--source", action="append", choices=SOURCES, help="Only these sources (repeatable)")
+    parser.add_argument("--repeat", type=int, default=20, help="Parses per fixture for the timing")
+    parser.add_argument("--fixtures", help="Fixtures directory (defaults to benchmarks/fixtures)")
+    parser.add_argument("--output", help="Results file (defaults to benchmarks/results/parse-<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = [bench_fixture(fixture, args.repeat) for fixture in load_fixtures(args.fixtures, args.source)]
+
+    print(f"{'fixture':<32} {'ok':>4} {'records/s':>11} {'ms/page':>8} {'blocks':>8} {'peak KiB':>9}")
+    for r in results:
+        ok = "yes" if not r["mismatches"] else f"{r['mismatches']}!"
+        print(f"{r['name']:<32} {ok:>4} {r['records_per_sec']:>11,.0f} {r['ms_per_page']:>8.2f} "
+              f"{r['alloc_blocks']:>8,} {r['peak_bytes'] / 1024:>9,.0f}")
+
+    path = save_results("parse", results, args.output)
+    print(f"\nResults written to {path}")
+    if args.compare:
+        compare(results, args.compare, ["records_per_sec", "peak_bytes"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Full pipeline from run_scraper through the CSV write, with the network
+replaced by the recorded fixtures (FixtureFetcher) and LinkedIn forced onto
+the HTTP backend so no browser is started.
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --limit 5 --repeat 3 --workers 8
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from benchmarks.fixture_pages import load_fixtures, FixtureFetcher
+from benchmarks.results import save_results, compare
+from main import run_scraper
+
+
+def run_once(fixtures, args, output_file):
+    fetcher = FixtureFetcher(fixtures)
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_scraper(
+            limit=args.limit, days=args.days, workers=args.workers, executor_type=args.executor,
+            output_format="csv", fetcher=fetcher, output_file=output_file, linkedin_backend="http",
+            metrics_file=os.path.join(os.path.dirname(output_file), "metrics.json"),
+            manifest_file=os.path.join(os.path.dirname(output_file), "manifest.sqlite")
+        )
+    with open(output_file, encoding="utf-8") as f:
+        # Summary line and column header
+        rows = sum(1 for _ in f) - 2
+    return fetcher.requests, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the full scrape pipeline on recorded pages")
+    parser.add_argument("--limit", type=int, help="Searches per scraper (default: all planned searches)")
+    parser.add_argument("--days", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--executor", choices=["thread", "async"], default="thread")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs (the best one is reported)")
+    parser.add_argument("--fixtures", help="Fixtures directory (defaults to benchmarks/fixtures)")
+    parser.add_argument("--output", help="Results file (defaults to benchmarks/results/pipeline-<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "jobs.csv")
+
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            requests, rows = run_once(fixtures, args, output_file)
+            times.append(time.perf_counter() - start)
+
+        # Separate traced run, tracemalloc slows everything down
+        tracemalloc.start()
+        try:
+            run_once(fixtures, args, output_file)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    best = min(times)
+    result = {
+        "name": f"run_scraper[{args.executor}, limit={args.limit}, workers={args.workers}]",
+        "requests": requests,
+        "rows_written": rows,
+        "seconds": best,
+        "requests_per_sec": requests / best,
+        "peak_bytes": peak
+    }
+    print(f"{result['name']}: {requests} pages, {rows} rows written in {best:.2f}s "
+          f"({result['requests_per_sec']:,.0f} pages/s, peak {peak / 2**20:,.1f} MiB)")
+
+    path = save_results("pipeline", [result], args.output)
+    print(f"Results written to {path}")
+    if args.compare:
+        compare([result], args.compare, ["seconds", "peak_bytes"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Memory of a long job history held as plain dicts vs JobRecords, and as a
+DataFrame with object vs categorical columns (see records.py).
+
+The synthetic history has the shape of eastern_africa_data_jobs.csv: titles,
+companies, locations, dates and sources are sampled at the frequencies they
+have there, links are unique, and every row gets its own string objects, as
+rows parsed from HTML do.
+
+    python -m benchmarks.bench_records
+    python -m benchmarks.bench_records --rows 200000 --compare benchmarks/results/records-<...>.json
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+import pandas as pd
+from benchmarks.results import save_results, compare
+from config import CSV_COLUMNS, CATEGORICAL_COLUMNS, OUTPUT_FILE
+from records import JobRecord, intern_value, jobs_frame
+from store import read_output_csv
+
+SAMPLED_COLUMNS = ["title", "company", "location", "posted_date", "source"]
+
+
+def load_shape(path=None):
+    """Observed values per column (repeated as often as they occur) to sample rows from"""
+    df = read_output_csv(path or OUTPUT_FILE)
+    return {column: df[column].astype(object).fillna("N/A").astype(str).tolist() for column in SAMPLED_COLUMNS}
+
+
+def fresh(value):
+    # A new string object, like the ones a parser hands back
+    return value.encode().decode()
+
+
+def synthetic_history(rows, shape, seed=0):
+    rng = random.Random(seed)
+    for i in range(rows):
+        job = {column: fresh(rng.choice(shape[column])) for column in SAMPLED_COLUMNS}
+        job["link"] = f"https://jobs.example.com/{job['source'].lower()}/{i:08d}"
+        yield {column: job[column] for column in CSV_COLUMNS}
+
+
+def interned(job):
+    return {column: intern_value(value) if column in CATEGORICAL_COLUMNS else value for column, value in job.items()}
+
+
+def object_frame(jobs):
+    return pd.DataFrame(list(jobs), columns=CSV_COLUMNS)
+
+
+def categorical_frame(jobs):
+    return jobs_frame([JobRecord.from_dict(job) for job in jobs])
+
+
+LAYOUTS = {
+    "dicts": lambda jobs: list(jobs),
+    "dicts, interned": lambda jobs: [interned(job) for job in jobs],
+    "JobRecords": lambda jobs: [JobRecord.from_dict(job) for job in jobs],
+    "DataFrame, object columns": object_frame,
+    "DataFrame, categorical columns": categorical_frame,
+}
+
+
+def measure(name, build, rows, shape):
+    """Memory still held once the structure is built (strings included), and the peak while building it"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        built = build(synthetic_history(rows, shape))
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del built
+
+    return {
+        "name": name,
+        "rows": rows,
+        "retained_bytes": retained,
+        "bytes_per_row": retained / rows,
+        "peak_bytes": peak,
+        "seconds": elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory of job history representations")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--csv", help="CSV whose shape the history follows (defaults to OUTPUT_FILE)")
+    parser.add_argument("--layout", action="append", choices=sorted(LAYOUTS), help="Only these layouts (repeatable)")
+    parser.add_argument("--output", help="Results file (defaults to benchmarks/results/records-<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    shape = load_shape(args.csv)
+    results = [measure(name, LAYOUTS[name], args.rows, shape) for name in args.layout or LAYOUTS]
+
+    print(f"{'layout':<32} {'retained MiB':>12} {'bytes/row':>10} {'peak MiB':>9} {'seconds':>8}")
+    for r in results:
+        print(f"{r['name']:<32} {r['retained_bytes'] / 2**20:>12,.1f} {r['bytes_per_row']:>10,.0f} "
+              f"{r['peak_bytes'] / 2**20:>9,.1f} {r['seconds']:>8.1f}")
+
+    path = save_results("records", results, args.output)
+    print(f"\nResults written to {path}")
+    if args.compare:
+        compare(results, args.compare, ["retained_bytes", "peak_bytes"])
+
+
+if __name__ == "__main__":
+    main()
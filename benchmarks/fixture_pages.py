@@ -0,0 +1,300 @@
+"""
+Recorded search pages for the offline benchmarks.
+
+Fixtures live in benchmarks/fixtures/: one HTML file per page, the records
+it should parse to in a matching .json file, and a manifest.json listing
+them. They are either recorded from the response cache (real pages fetched
+with --cache-mode use) or generated as synthetic pages shaped like each site:
+
+    python -m benchmarks.fixture_pages record --cache-dir .cache/http
+    python -m benchmarks.fixture_pages generate --cards 25
+
+Recorded pages are expected to parse to whatever the reference parser
+(html.parser, full tree) returned when they were recorded.
+"""
+import argparse
+import json
+import os
+import random
+from urllib.parse import parse_qs, urlparse
+from config import CACHE_DIR
+from fetch import FetchResponse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MANIFEST = "manifest.json"
+
+# Scraper keys used in the manifest
+SOURCES = ["BrighterMonday", "MyJobMag", "LinkedInGuest", "LinkedIn"]
+
+
+def make_scraper(source, **kwargs):
+    """Scraper instance used to parse a fixture (no network, no browser)"""
+    if source == "BrighterMonday":
+        from scrapers.brightermonday import BrighterMondayScraper
+        return BrighterMondayScraper(**kwargs)
+    if source == "MyJobMag":
+        from scrapers.myjobmag import MyJobMagScraper
+        return MyJobMagScraper(**kwargs)
+    if source == "LinkedInGuest":
+        from scrapers.linkedin_guest import LinkedinGuestScraper
+        return LinkedinGuestScraper(**kwargs)
+    if source == "LinkedIn":
+        from scrapers.linkedin import LinkedinScraper
+        scraper = LinkedinScraper()
+        # Fixtures are public search pages; Chrome is only started on checkout, never here
+        scraper.cookie = None
+        return scraper
+    raise ValueError(f"Unknown fixture source '{source}', expected one of {SOURCES}")
+
+
+def load_fixtures(directory=None, sources=None):
+    """Returns manifest entries with their html and expected records loaded"""
+    directory = directory or FIXTURES_DIR
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    fixtures = []
+    for entry in manifest:
+        if sources and entry["source"] not in sources:
+            continue
+        with open(os.path.join(directory, entry["file"]), encoding="utf-8") as f:
+            html = f.read()
+        with open(os.path.join(directory, entry["expected"]), encoding="utf-8") as f:
+            expected = json.load(f)
+        fixtures.append(dict(entry, html=html, expected=expected))
+    return fixtures
+
+
+def save_fixture(directory, manifest, source, location, name, html, expected, url=None):
+    file_name = f"{source.lower()}_{name}.html"
+    expected_name = f"{source.lower()}_{name}.json"
+    with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+        f.write(html)
+    with open(os.path.join(directory, expected_name), "w", encoding="utf-8") as f:
+        json.dump(expected, f, indent=1, ensure_ascii=False)
+    manifest.append({
+        "source": source, "location": location, "url": url,
+        "file": file_name, "expected": expected_name, "records": len(expected)
+    })
+
+
+def write_manifest(directory, manifest):
+    with open(os.path.join(directory, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+
+class FixtureFetcher:
+    """
+    Stand-in for Fetcher that replays fixture pages instead of using the network.
+
+    The first results page of each search gets the next fixture for that
+    source (cycling), later pages come back empty so paging stops. Responses
+    are marked as cached, so scrapers skip their politeness delays.
+    """
+
+    def __init__(self, fixtures):
+        self.pages = {}
+        for fixture in fixtures:
+            source = "LinkedIn" if fixture["source"] == "LinkedInGuest" else fixture["source"]
+            self.pages.setdefault(source, []).append(fixture["html"])
+        self.requests = 0
+        self._next = {}
+
+    def _is_first_page(self, url):
+        params = parse_qs(urlparse(url).query)
+        return params.get("page", ["1"])[0] == "1" and params.get("currentpage", ["1"])[0] == "1" \
+            and params.get("start", ["0"])[0] == "0"
+
+    def get(self, url, headers=None, timeout=None, source=None):
+        self.requests += 1
+        pages = self.pages.get(source)
+        html = "<html><body></body></html>"
+        if pages and self._is_first_page(url):
+            index = self._next.get(source, 0)
+            self._next[source] = index + 1
+            html = pages[index % len(pages)]
+
+        response = FetchResponse(url, 200, html)
+        response.from_cache = True
+        return response
+
+    def close(self):
+        pass
+
+
+# --- Recording from the response cache ---
+
+def record(cache_dir, directory, limit=None):
+    """Copies cached search pages into fixtures, with reference-parser records as the expected output"""
+    manifest = []
+    entries_dir = os.path.join(cache_dir, "entries")
+    counts = {}
+    for name in sorted(os.listdir(entries_dir)):
+        with open(os.path.join(entries_dir, name)) as f:
+            entry = json.load(f)
+
+        source = entry.get("source")
+        if source == "LinkedIn" and "/jobs-guest/" in entry["url"]:
+            source = "LinkedInGuest"
+        if source not in SOURCES or (limit and counts.get(source, 0) >= limit):
+            continue
+
+        with open(os.path.join(cache_dir, "bodies", entry["body"]), encoding="utf-8") as f:
+            html = f.read()
+
+        reference = make_scraper(source) if source.startswith("LinkedIn") else make_scraper(source, parser="html.parser", strain=False)
+        location = location_for(reference, entry["url"])
+        expected = reference.parse(html, {"location": location})
+        if not expected:
+            continue
+
+        counts[source] = counts.get(source, 0) + 1
+        save_fixture(directory, manifest, source, location, f"recorded{counts[source]}", html, expected, entry["url"])
+    return manifest
+
+
+def location_for(scraper, url):
+    for location, base_url in getattr(scraper, "domains", {}).items():
+        if url.startswith(base_url):
+            return location
+    return parse_qs(urlparse(url).query).get("location", [None])[0]
+
+
+# --- Synthetic pages ---
+
+TITLES = ["Data Analyst", "Senior Data Analyst", "Data Engineer", "Data Scientist", "BI Developer",
+          "Business Intelligence Analyst", "Analytics Engineer", "Machine Learning Engineer"]
+COMPANIES = ["Safaricom PLC", "Equity Bank", "KCB Group", "Twiga Foods", "Cellulant", "Andela",
+             "M-KOPA", "Jumia", "Sendy", "Copia Global", "Old Mutual", "Britam"]
+CITIES = ["Nairobi", "Mombasa", "Kisumu", "Nakuru"]
+RELATIVE_DATES = ["1 day ago", "2 days ago", "5 days ago", "1 week ago", "2 weeks ago"]
+
+
+def page_chrome(body, rng):
+    """Wraps cards in the navigation, inline scripts and footer real pages carry"""
+    nav = "".join(f'<li class="nav-item"><a class="nav-link" href="/section/{i}">Section {i}</a></li>' for i in range(120))
+    script = "window.__STATE__ = " + json.dumps({"items": [{"id": i, "v": rng.random()} for i in range(400)]}) + ";"
+    icons = "".join(f'<svg class="icon" viewBox="0 0 24 24"><path d="M{i} 0L24 {i}Z"/></svg>' for i in range(80))
+    footer = "".join(f'<div class="flex-1 footer-col"><p>Footer column {i}</p></div>' for i in range(12))
+    return (
+        f'<!DOCTYPE html><html><head><title>Jobs</title><script>{script}</script></head>'
+        f'<body><header><ul class="nav">{nav}</ul>{icons}</header><main>{body}</main>'
+        f'<footer>{footer}</footer></body></html>'
+    )
+
+
+def synthetic_cards(rng, cards):
+    return [{
+        "title": rng.choice(TITLES),
+        "company": rng.choice(COMPANIES),
+        "city": rng.choice(CITIES),
+        "date": rng.choice(RELATIVE_DATES),
+        "slug": f"{rng.randrange(10**6, 10**7)}"
+    } for _ in range(cards)]
+
+
+def brightermonday_page(cards, rng):
+    base_url = "https://www.brightermonday.co.ke"
+    html_cards = "".join(
+        f'<div class="flex-1 items-center"><a href="/listings/{c["title"].lower().replace(" ", "-")}-{c["slug"]}">'
+        f'<p class="text-lg font-medium">{c["title"]}</p></a>'
+        f'<p class="text-sm text-link-500">{c["company"]}</p>'
+        f'<span class="text-gray-500">{c["city"]}</span><span>{c["date"]}</span></div>'
+        for c in cards
+    )
+    expected = [{
+        "title": c["title"], "company": c["company"], "location": "Kenya", "posted_date": "Recent",
+        "link": f'{base_url}/listings/{c["title"].lower().replace(" ", "-")}-{c["slug"]}', "source": "BrighterMonday"
+    } for c in cards]
+    return f'<div data-cy="listing-cards-components">{html_cards}</div>', expected
+
+
+def myjobmag_page(cards, rng):
+    base_url = "https://www.myjobmag.co.ke"
+    html_cards = "".join(
+        f'<li class="job-list-li"><ul><li class="job-logo"><img alt="{c["company"]}" src="/logo/{c["slug"]}.png"></li>'
+        f'<li class="job-info"><h2><a href="/job/{c["slug"]}">{c["title"]}</a></h2>'
+        f'<p class="job-desc">{c["city"]} - full time role working with data.</p></li>'
+        f'<li id="job-date">{c["date"]}</li></ul></li>'
+        for c in cards
+    )
+    expected = [{
+        "title": c["title"], "company": c["company"], "location": "Kenya", "posted_date": c["date"],
+        "link": f'{base_url}/job/{c["slug"]}', "source": "MyJobMag"
+    } for c in cards]
+    return f'<ul class="job-list">{html_cards}</ul>', expected
+
+
+def linkedin_cards(cards):
+    html_cards = "".join(
+        f'<li><div class="base-card base-search-card job-search-card">'
+        f'<a class="base-card__full-link" href="https://ke.linkedin.com/jobs/view/{c["slug"]}"></a>'
+        f'<div class="base-search-card__info"><h3 class="base-search-card__title">{c["title"]}</h3>'
+        f'<h4 class="base-search-card__subtitle"><a>{c["company"]}</a></h4>'
+        f'<div><span class="job-search-card__location">{c["city"]}, Kenya</span>'
+        f'<time class="job-search-card__listdate" datetime="2025-12-0{1 + int(c["slug"]) % 9}">{c["date"]}</time></div>'
+        f'</div></div></li>'
+        for c in cards
+    )
+    expected = [{
+        "title": c["title"], "company": c["company"], "location": f'{c["city"]}, Kenya',
+        "posted_date": f'2025-12-0{1 + int(c["slug"]) % 9}',
+        "link": f'https://ke.linkedin.com/jobs/view/{c["slug"]}', "source": "LinkedIn"
+    } for c in cards]
+    return html_cards, expected
+
+
+def generate(directory, cards=25, pages=2, seed=0):
+    """Writes synthetic pages for every source with their known records as the expected output"""
+    rng = random.Random(seed)
+    manifest = []
+    for page in range(1, pages + 1):
+        body, expected = brightermonday_page(synthetic_cards(rng, cards), rng)
+        save_fixture(directory, manifest, "BrighterMonday", "Kenya", f"synthetic{page}", page_chrome(body, rng), expected)
+
+        body, expected = myjobmag_page(synthetic_cards(rng, cards), rng)
+        save_fixture(directory, manifest, "MyJobMag", "Kenya", f"synthetic{page}", page_chrome(body, rng), expected)
+
+        # The guest API returns a bare fragment of cards, the browser gets a full page
+        fragment, expected = linkedin_cards(synthetic_cards(rng, cards))
+        save_fixture(directory, manifest, "LinkedInGuest", "Kenya", f"synthetic{page}", fragment, expected)
+
+        body, expected = linkedin_cards(synthetic_cards(rng, cards))
+        page_html = page_chrome(f'<ul class="jobs-search__results-list">{body}</ul>', rng)
+        save_fixture(directory, manifest, "LinkedIn", "Kenya", f"synthetic{page}", page_html, expected)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or generate benchmark fixtures")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="Copy pages from the response cache")
+    rec.add_argument("--cache-dir", default=CACHE_DIR)
+    rec.add_argument("--limit", type=int, default=3, help="Pages per source")
+    gen = sub.add_parser("generate", help="Write synthetic pages")
+    gen.add_argument("--cards", type=int, default=25, help="Job cards per page")
+    gen.add_argument("--pages", type=int, default=2, help="Pages per source")
+    for p in (rec, gen):
+        p.add_argument("--dir", default=FIXTURES_DIR, help="Fixtures directory")
+        p.add_argument("--append", action="store_true", help="Add to the existing manifest instead of replacing it")
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    existing = []
+    if args.append and os.path.exists(os.path.join(args.dir, MANIFEST)):
+        with open(os.path.join(args.dir, MANIFEST)) as f:
+            existing = json.load(f)
+
+    if args.command == "record":
+        manifest = record(args.cache_dir, args.dir, args.limit)
+    else:
+        manifest = generate(args.dir, args.cards, args.pages)
+
+    # Later entries replace earlier ones for the same file
+    files = {entry["file"] for entry in manifest}
+    write_manifest(args.dir, [entry for entry in existing if entry["file"] not in files] + manifest)
+    print(f"Wrote {len(manifest)} fixtures to {args.dir}")
+
+
+if __name__ == "__main__":
+    main()
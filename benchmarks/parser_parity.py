@@ -0,0 +1,94 @@
+"""
+Checks that the fast parser path (HTML_PARSER backend + SoupStrainer) yields
+exactly the same job records as the original full html.parser tree.
+
+Pages come from the committed fixtures in benchmarks/fixtures (checked on
+every test run too, see tests/test_parser_parity.py), the response cache
+(see --cache-mode) and/or HTML files:
+
+    python -m benchmarks.parser_parity
+    python -m benchmarks.parser_parity --cache-dir .cache/http
+    python -m benchmarks.parser_parity --page MyJobMag:Kenya:saved_page.html
+"""
+import argparse
+import json
+import os
+import sys
+from benchmarks.fixture_pages import load_fixtures, location_for
+from config import CACHE_DIR
+from scrapers.brightermonday import BrighterMondayScraper
+from scrapers.myjobmag import MyJobMagScraper
+from scrapers.linkedin_guest import LinkedinGuestScraper
+
+# Every HttpScraper, by fixture source name
+SCRAPERS = {
+    "BrighterMonday": BrighterMondayScraper,
+    "MyJobMag": MyJobMagScraper,
+    "LinkedInGuest": LinkedinGuestScraper
+}
+
+
+def fixture_pages(directory=None):
+    """Yields (source, location, html) for the committed fixture pages of the HTML scrapers"""
+    for fixture in load_fixtures(directory, sources=SCRAPERS):
+        yield fixture["source"], fixture["location"], fixture["html"]
+
+
+def cached_pages(cache_dir):
+    """Yields (source, location, html) for every cached HTML scraper page"""
+    entries_dir = os.path.join(cache_dir, "entries")
+    if not os.path.isdir(entries_dir):
+        return
+
+    for name in sorted(os.listdir(entries_dir)):
+        with open(os.path.join(entries_dir, name)) as f:
+            entry = json.load(f)
+        source = entry.get("source")
+        if source == "LinkedIn" and "/jobs-guest/" in entry["url"]:
+            source = "LinkedInGuest"
+        if source not in SCRAPERS:
+            continue
+
+        location = location_for(SCRAPERS[source](), entry["url"])
+        with open(os.path.join(cache_dir, "bodies", entry["body"]), encoding="utf-8") as f:
+            yield source, location, f.read()
+
+
+def check_page(source, location, html, backend=None):
+    """Returns (reference records, fast records) for one page"""
+    reference = SCRAPERS[source](parser="html.parser", strain=False)
+    fast = SCRAPERS[source](parser=backend, strain=True)
+    search_term = {"location": location}
+    return reference.parse(html, search_term), fast.parse(html, search_term)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fast and reference HTML parsing")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Response cache to read pages from")
+    parser.add_argument("--page", action="append", default=[], help="SOURCE:LOCATION:PATH of a saved page")
+    parser.add_argument("--backend", help="Parser backend to check (defaults to HTML_PARSER)")
+    args = parser.parse_args()
+
+    pages = list(fixture_pages()) + list(cached_pages(args.cache_dir))
+    for spec in args.page:
+        source, location, path = spec.split(":", 2)
+        with open(path, encoding="utf-8") as f:
+            pages.append((source, location, f.read()))
+
+    if not pages:
+        print("No pages to check (no fixtures, run with --cache-mode use first, or pass --page)")
+        return 1
+
+    mismatches = 0
+    for source, location, html in pages:
+        reference, fast = check_page(source, location, html, args.backend)
+        if reference != fast:
+            mismatches += 1
+            print(f"MISMATCH {source}/{location}: {len(reference)} reference vs {len(fast)} fast records")
+
+    print(f"Checked {len(pages)} pages, {mismatches} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
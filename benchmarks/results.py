@@ -0,0 +1,62 @@
+"""
+Machine-readable benchmark results, so runs can be compared across commits.
+
+Each run is written to benchmarks/results/<name>-<timestamp>-<commit>.json
+along with the commit, Python version and platform it ran on.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(RESULTS_DIR)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(name, results, output=None):
+    """Writes `results` (a list of dicts with a 'name' key) and returns the path"""
+    run = {
+        "benchmark": name,
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results
+    }
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{name}-{stamp}-{run['commit']}.json")
+
+    with open(output, "w") as f:
+        json.dump(run, f, indent=1)
+    return output
+
+
+def compare(results, baseline_path, metrics):
+    """Prints the relative change of `metrics` against a saved run, matching results by name"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {result["name"]: result for result in baseline["results"]}
+
+    print(f"\nvs {baseline['commit']} ({baseline['timestamp']}):")
+    for result in results:
+        old = previous.get(result["name"])
+        if not old:
+            continue
+        changes = []
+        for metric in metrics:
+            if old.get(metric):
+                changes.append(f"{metric} {(result[metric] - old[metric]) / old[metric]:+.1%}")
+        print(f"  {result['name']:<32} {', '.join(changes)}")
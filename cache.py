@@ -0,0 +1,202 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from config import CACHE_DIR, CACHE_MAX_BYTES, CACHE_TTLS, CACHE_DEFAULT_TTL
+
+CACHE_MODES = ["off", "use", "refresh", "offline-replay"]
+
+
+class CacheMissError(Exception):
+    """Raised in offline-replay mode when a URL has never been cached"""
+
+
+class ResponseCache:
+    """
+    On-disk HTTP response cache.
+
+    Bodies are stored content-addressed (by SHA-256 of the body) under
+    `bodies/`, and each URL has a small JSON entry under `entries/` pointing
+    at its body along with validators (ETag / Last-Modified) and the time it
+    was stored. Entries are evicted least-recently-used once the bodies
+    exceed `max_bytes`, after dropping bodies no entry points at any more.
+
+    Modes:
+        off            - never read or write the cache
+        use            - serve fresh entries, revalidate stale ones
+        refresh        - always refetch, but store the result
+        offline-replay - serve whatever is cached regardless of age, never hit the network
+    """
+
+    def __init__(self, directory=None, mode="use", ttls=None, default_ttl=None, max_bytes=None):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode '{mode}', expected one of {CACHE_MODES}")
+
+        self.directory = directory or CACHE_DIR
+        self.mode = mode
+        self.ttls = dict(CACHE_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl if default_ttl is not None else CACHE_DEFAULT_TTL
+        self.max_bytes = max_bytes or CACHE_MAX_BYTES
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            os.makedirs(os.path.join(self.directory, "entries"), exist_ok=True)
+            os.makedirs(os.path.join(self.directory, "bodies"), exist_ok=True)
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    @property
+    def offline(self):
+        return self.mode == "offline-replay"
+
+    def _entry_path(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "entries", f"{key}.json")
+
+    def _body_path(self, digest):
+        return os.path.join(self.directory, "bodies", digest)
+
+    def ttl_for(self, source):
+        return self.ttls.get(source, self.default_ttl)
+
+    def lookup(self, url, source=None):
+        """
+        Returns (entry, body, is_fresh) for a cached URL, or (None, None, False).
+
+        In refresh mode nothing is returned, so the caller always refetches.
+        """
+        if not self.enabled or self.mode == "refresh":
+            return None, None, False
+
+        path = self._entry_path(url)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            with open(self._body_path(entry["body"]), encoding="utf-8") as f:
+                body = f.read()
+        except (OSError, ValueError, KeyError):
+            return None, None, False
+
+        # Reads count as use for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        is_fresh = self.offline or time.time() - entry["stored_at"] < self.ttl_for(source)
+        return entry, body, is_fresh
+
+    def conditional_headers(self, entry):
+        """Validators for revalidating a stale entry"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, body, status_code=200, headers=None, source=None):
+        """Stores a successful response"""
+        if not self.enabled or self.offline or status_code != 200:
+            return
+
+        headers = headers or {}
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        entry = {
+            "url": url,
+            "source": source,
+            "status_code": status_code,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "body": digest,
+            "size": len(data),
+            "stored_at": time.time()
+        }
+
+        with self._lock:
+            body_path = self._body_path(digest)
+            if not os.path.exists(body_path):
+                self._write_atomic(body_path, data)
+            self._write_atomic(self._entry_path(url), json.dumps(entry).encode("utf-8"))
+            self._evict()
+
+    def mark_revalidated(self, url, entry):
+        """Resets the age of an entry after a 304 Not Modified"""
+        if self.offline:
+            return
+        entry = dict(entry, stored_at=time.time())
+        with self._lock:
+            self._write_atomic(self._entry_path(url), json.dumps(entry).encode("utf-8"))
+
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        bodies_dir = os.path.join(self.directory, "bodies")
+        entries_dir = os.path.join(self.directory, "entries")
+
+        body_sizes = {}
+        for name in os.listdir(bodies_dir):
+            if name.endswith(".tmp"):
+                continue
+            try:
+                body_sizes[name] = os.path.getsize(os.path.join(bodies_dir, name))
+            except OSError:
+                continue
+
+        if sum(body_sizes.values()) <= self.max_bytes:
+            return
+
+        # Oldest-accessed entries first
+        entries = []
+        for name in os.listdir(entries_dir):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(entries_dir, name)
+            try:
+                with open(path) as f:
+                    digest = json.load(f)["body"]
+                entries.append((os.path.getmtime(path), path, digest))
+            except (OSError, ValueError, KeyError):
+                continue
+        entries.sort()
+
+        refs = {}
+        for _, _, digest in entries:
+            refs[digest] = refs.get(digest, 0) + 1
+
+        # Bodies left behind when their URL was re-stored with a new body
+        for digest in [digest for digest in body_sizes if digest not in refs]:
+            self._remove(self._body_path(digest))
+            del body_sizes[digest]
+        total = sum(body_sizes.values())
+
+        evicted = 0
+        for _, path, digest in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            evicted += 1
+            refs[digest] -= 1
+            if refs[digest] == 0 and digest in body_sizes:
+                self._remove(self._body_path(digest))
+                total -= body_sizes[digest]
+
+        self.logger.debug(f"Evicted {evicted} cache entries")
@@ -45,7 +45,91 @@ def get_search_queries():
 # Output settings
 OUTPUT_FILE = "eastern_africa_data_jobs.csv"
 CSV_COLUMNS = ["title", "company", "location", "posted_date", "link", "source"]
+CATEGORICAL_COLUMNS = ["company", "location", "posted_date", "source"]  # Repetitive fields, interned in JobRecords and categorical in DataFrames
+STORE_PATH = "jobs.sqlite"  # Persistent job history used by --incremental
+METRICS_FILE = "run_metrics.json"  # Per-run timings/counters; a Prometheus .prom file is written next to it
+MANIFEST_PATH = "run_manifest.sqlite"  # Finished searches of every run, for --resume
 
 # Scraper Settings
 REQUEST_TIMEOUT = 10
-RANDOM_DELAY_RANGE = (2, 5)  # Seconds
+RANDOM_DELAY_RANGE = (2, 5)  # Seconds between requests to the same host (other hosts aren't held up)
+DATE_CACHE_SIZE = 4096  # Distinct date strings memoized by parse_relative_date
+MAX_PAGES_PER_QUERY = 5  # Results pages read per search (stops early on old/known jobs)
+
+# Concurrency Settings
+MAX_WORKERS = 4  # Total searches in flight at once
+PER_HOST_CONCURRENCY = 2  # Default searches in flight per host
+
+# Work Queue (--executor process, see workqueue.py)
+WORK_QUEUE_PATH = "work_queue.sqlite"  # Shared by the coordinator and every worker process/host
+WORK_QUEUE_LEASE = 900  # Seconds before a claimed search is handed to another worker (its worker probably died)
+WORK_QUEUE_POLL = 1  # Seconds between queue checks while waiting on other workers
+
+# LinkedIn backend: "selenium" (headless Chrome), "http" (guest job search API, no browser)
+# or "auto" (http unless LINKEDIN_LI_AT is set, since only Chrome can use the cookie)
+LINKEDIN_BACKEND = "auto"
+
+# LinkedIn WebDriver Pool
+LINKEDIN_POOL_SIZE = 1  # Chrome instances kept alive; raise on multi-core hosts
+LINKEDIN_DRIVER_MAX_USES = 25  # Searches per driver before it is recycled
+LINKEDIN_EXTRACTION = "script"  # "script" (one JS call per page), "page_source" or "elements" (per-field RPCs)
+LINKEDIN_LEAN_PROFILE = True  # Block images/fonts/media and return pages at DOMContentLoaded ("eager")
+LINKEDIN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm", "*.mp3",
+    "*media.licdn.com*"
+]
+LINKEDIN_READY_TIMEOUT = 4  # Max seconds to wait for job cards, an empty-results banner or a login wall after navigating
+LINKEDIN_SCROLL_TIMEOUT = 2  # Max seconds to wait for lazy-loaded cards after each scroll
+
+HOST_CONCURRENCY = {
+    "www.linkedin.com": LINKEDIN_POOL_SIZE  # One search per pooled Chrome instance
+}
+HTTP_POOL_SIZE = 10  # Keep-alive connections kept open per host
+
+# Per-host Politeness (token bucket per host, see politeness.py)
+HOST_BURST = 1  # Requests allowed back to back after a host has been idle
+HOST_DELAY_RANGES = {}  # Per-host overrides of RANDOM_DELAY_RANGE, e.g. {"www.myjobmag.co.ke": (3, 6)}
+BACKOFF_STATUSES = {429, 503}  # Responses that slow a host down (Retry-After is honored)
+MAX_BACKOFF_FACTOR = 16  # Max multiple of the normal delay after repeated pushback
+
+# Retries and Circuit Breaker
+MAX_RETRIES = 2  # Extra attempts per request for connection errors, timeouts and RETRY_STATUSES
+RETRY_BUDGET = 30  # Retries allowed per fetcher per run, across all requests
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_BACKOFF_BASE = 1  # Seconds; retry n waits a random 0..min(base * 2^n, max)
+RETRY_BACKOFF_MAX = 30
+BREAKER_THRESHOLD = 3  # Consecutive failed searches before a scraper's domain is skipped for the rest of the run
+
+# Detail-Page Enrichment (--enrich, see enrich.py)
+ENRICH_SOURCES = ["BrighterMonday", "MyJobMag"]  # Sources whose cards lack real dates/companies
+ENRICH_WORKERS = 4  # Detail pages fetched at once (each host is still paced)
+ENRICH_DESCRIPTION_CHARS = 2000  # Descriptions are cut to this length
+
+# Query Planning
+# Abbreviations expanded when deciding whether two titles are the same query
+TITLE_SYNONYMS = {
+    "bi": "business intelligence"
+}
+
+# Response Cache
+CACHE_DIR = ".cache/http"
+CACHE_MAX_BYTES = 200 * 1024 * 1024  # LRU-evicted beyond this
+CACHE_DEFAULT_TTL = 6 * 3600  # Seconds
+CACHE_TTLS = {
+    "BrighterMonday": 6 * 3600,
+    "MyJobMag": 6 * 3600,
+    "LinkedIn": 2 * 3600  # Rendered search pages change faster
+}
+
+# HTML Parsing
+HTML_PARSER = "lxml"  # BeautifulSoup backend; falls back to "html.parser" if lxml isn't installed
+
+# Near-Duplicate Detection (same posting syndicated across sources)
+NEAR_DUPLICATE_THRESHOLD = 0.6  # Min trigram Jaccard similarity of both title and company
+MINHASH_PERMUTATIONS = 64  # Split into LSH bands of MINHASH_BAND_SIZE rows
+MINHASH_BAND_SIZE = 4
+# Company names that don't identify an employer; jobs with these (or none) are never near-duplicates
+PLACEHOLDER_COMPANIES = ["N/A", "Confidential", "Company Confidential", "Undisclosed", "Not Disclosed",
+                         "Anonymous", "Private Company", "Our Client"]
+COMPANY_SUFFIXES = {"ltd", "limited", "plc", "inc", "llc", "co", "company", "group", "corporation", "corp"}
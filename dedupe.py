@@ -0,0 +1,165 @@
+import hashlib
+import re
+from collections import defaultdict
+import numpy as np
+from config import NEAR_DUPLICATE_THRESHOLD, MINHASH_PERMUTATIONS, MINHASH_BAND_SIZE, COMPANY_SUFFIXES, PLACEHOLDER_COMPANIES
+from utils import normalize_url
+
+# Hash values live below this Mersenne prime so (a * x + b) fits in an int64
+_PRIME = (1 << 31) - 1
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _words(text):
+    return [word for word in _NON_WORD_RE.split(str(text or "").lower()) if word]
+
+
+def normalize_company(company):
+    """Lowercased company name without punctuation or legal suffixes (Ltd, PLC, ...)"""
+    return " ".join(word for word in _words(company) if word not in COMPANY_SUFFIXES)
+
+
+_PLACEHOLDERS = {normalize_company(company) for company in PLACEHOLDER_COMPANIES}
+
+def is_placeholder_company(company):
+    """Whether a company name is missing or a placeholder ("N/A", "Confidential", ...)"""
+    normalized = normalize_company(company)
+    return not normalized or normalized in _PLACEHOLDERS
+
+
+def trigrams(text):
+    """Character trigrams, tolerant of small spelling differences"""
+    return {text[i:i + 3] for i in range(max(len(text) - 2, 1))} if text else set()
+
+
+def shingles(job):
+    """(title trigrams, company trigrams) of a job after normalization"""
+    return trigrams(" ".join(_words(job.get("title")))), trigrams(normalize_company(job.get("company")))
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def is_near_duplicate(a, b, threshold=None):
+    """Whether two (title, company) shingle pairs are similar enough on both fields"""
+    threshold = threshold if threshold is not None else NEAR_DUPLICATE_THRESHOLD
+    return jaccard(a[1], b[1]) >= threshold and jaccard(a[0], b[0]) >= threshold
+
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash/LSH index that clusters the same posting seen under
+    different URLs (e.g. syndicated to LinkedIn, BrighterMonday and MyJobMag).
+
+    Jobs are blocked by company and title: both are MinHashed and each LSH
+    band is keyed on the same rows of the two signatures, so a job is only
+    compared against jobs with a similarly spelled company *and* title. A
+    big employer's other openings rarely share a band, which keeps
+    clustering near-linear in the number of jobs. Jobs without a real
+    company name (see is_placeholder_company) can't be matched to anyone's
+    and are left out. Candidates are confirmed on the trigram Jaccard
+    similarity of both title and company and on compatible locations, then
+    merged with union-find. A cluster's canonical ID comes from its first job.
+    """
+
+    def __init__(self, threshold=None, num_perm=None, band_size=None, cross_source_only=True):
+        self.threshold = threshold if threshold is not None else NEAR_DUPLICATE_THRESHOLD
+        self.num_perm = num_perm or MINHASH_PERMUTATIONS
+        self.band_size = band_size or MINHASH_BAND_SIZE
+        # The same source listing one title twice is usually two openings, not a repost
+        self.cross_source_only = cross_source_only
+
+        rng = np.random.default_rng(42)
+        self._a = rng.integers(1, _PRIME, self.num_perm, dtype=np.int64)
+        self._b = rng.integers(0, _PRIME, self.num_perm, dtype=np.int64)
+
+        self._buckets = defaultdict(list)
+        self._shingles = []
+        self._sources = []
+        self._locations = []
+        self._ids = []
+        self._parent = []
+
+    def __len__(self):
+        return len(self._parent)
+
+    def _minhash(self, grams):
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") % _PRIME for g in grams),
+            dtype=np.int64, count=len(grams)
+        )
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def _find(self, i):
+        while self._parent[i] != i:
+            self._parent[i] = self._parent[self._parent[i]]
+            i = self._parent[i]
+        return i
+
+    def _union(self, i, j):
+        # The older job stays the root, so canonical IDs don't change as jobs arrive
+        root_i, root_j = self._find(i), self._find(j)
+        if root_i != root_j:
+            self._parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    def _locations_match(self, a, b):
+        # "Nairobi" matches "Nairobi, Kenya"; unknown locations match anything
+        return not a or not b or bool(a & b)
+
+    def add(self, job):
+        """
+        Adds a job and returns (canonical_id, is_duplicate), where is_duplicate
+        means it joined a cluster that already had a job in it.
+        """
+        index = len(self._parent)
+        grams = shingles(job)
+        source = job.get("source")
+        location = set(_words(job.get("location"))) if job.get("location") not in (None, "", "N/A") else set()
+
+        self._parent.append(index)
+        self._shingles.append(grams)
+        self._sources.append(source)
+        self._locations.append(location)
+        self._ids.append("job_" + hashlib.blake2b(
+            (normalize_url(job.get("link")) or "").encode("utf-8"), digest_size=6
+        ).hexdigest())
+
+        if is_placeholder_company(job.get("company")):
+            return self._ids[index], False
+
+        titles, companies = self._minhash(grams[0] or {""}), self._minhash(grams[1])
+        candidates = set()
+        for start in range(0, self.num_perm, self.band_size):
+            end = start + self.band_size
+            bucket = self._buckets[(start, companies[start:end].tobytes(), titles[start:end].tobytes())]
+            candidates.update(bucket)
+            bucket.append(index)
+
+        is_duplicate = False
+        for other in candidates:
+            if self.cross_source_only and self._sources[other] == source:
+                continue
+            if not self._locations_match(self._locations[other], location):
+                continue
+            if is_near_duplicate(self._shingles[other], grams, self.threshold):
+                self._union(index, other)
+                is_duplicate = True
+
+        return self._ids[self._find(index)], is_duplicate
+
+    def canonical_id(self, index):
+        """Current canonical ID of the index-th added job"""
+        return self._ids[self._find(index)]
+
+
+def assign_canonical_ids(jobs, **kwargs):
+    """
+    Clusters near-duplicate jobs and returns one canonical job ID per job,
+    in input order. Jobs in the same cluster share an ID.
+    """
+    index = NearDuplicateIndex(**kwargs)
+    for job in jobs:
+        index.add(job)
+    # Resolve at the end, since later jobs can merge earlier clusters
+    return [index.canonical_id(i) for i in range(len(index))]
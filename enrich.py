@@ -0,0 +1,195 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import SoupStrainer
+from config import ENRICH_SOURCES, ENRICH_WORKERS, ENRICH_DESCRIPTION_CHARS
+from fetch import get_default_fetcher
+from metrics import METRICS
+from scrapers.parsing import make_soup
+from utils import get_random_headers, normalize_url
+
+# Detail pages are only read for their JSON-LD and meta tags
+DETAIL_STRAINER = SoupStrainer(["script", "meta"])
+
+# Statuses after which a link counts as enriched even without data (the posting is gone)
+FINAL_STATUSES = {200, 404, 410}
+
+
+def _text(html):
+    """Plain text of an HTML fragment (JobPosting descriptions are usually HTML)"""
+    return " ".join(make_soup(html).get_text(" ").split())
+
+
+def _job_posting(data):
+    """Finds a JobPosting object in parsed JSON-LD (a single object, a list or an @graph)"""
+    if isinstance(data, list):
+        for item in data:
+            posting = _job_posting(item)
+            if posting:
+                return posting
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    types = data.get("@type")
+    if types == "JobPosting" or (isinstance(types, list) and "JobPosting" in types):
+        return data
+    return _job_posting(data.get("@graph")) if "@graph" in data else None
+
+
+def parse_job_posting(html):
+    """
+    Posted date, company and description from a job detail page.
+
+    Reads the schema.org JobPosting JSON-LD most job boards embed, falling
+    back to the page's description meta tags. Missing fields are None.
+    """
+    soup = make_soup(html, parse_only=DETAIL_STRAINER)
+    details = {"posted_date": None, "company": None, "description": None}
+
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            posting = _job_posting(json.loads(script.string or "", strict=False))
+        except ValueError:
+            continue
+        if not posting:
+            continue
+
+        date = posting.get("datePosted")
+        if isinstance(date, str) and date.strip():
+            # Keep the date part, parse_relative_date reads plain ISO dates
+            details["posted_date"] = date.strip()[:10]
+
+        company = posting.get("hiringOrganization")
+        if isinstance(company, dict):
+            company = company.get("name")
+        if isinstance(company, str) and company.strip():
+            details["company"] = company.strip()
+
+        description = posting.get("description")
+        if isinstance(description, str) and description.strip():
+            details["description"] = _text(description)
+        break
+
+    if not details["description"]:
+        meta = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", property="og:description")
+        if meta and meta.get("content"):
+            details["description"] = " ".join(meta["content"].split())
+
+    if details["description"]:
+        details["description"] = details["description"][:ENRICH_DESCRIPTION_CHARS]
+    return details
+
+
+class DetailEnricher:
+    """
+    Fills in posted date, company and description from job detail pages.
+
+    Search result cards are thin (BrighterMonday has no dates, MyJobMag
+    often no company), so the JobSink hands each deduped batch to enrich():
+    jobs from ENRICH_SOURCES get their detail page fetched, up to
+    `max_workers` at a time (still paced per host by the fetcher). What was
+    found is saved in the JobStore by normalized link, so links enriched on
+    an earlier run are filled in from there without another request.
+    """
+
+    def __init__(self, store, fetcher=None, max_workers=None, sources=None):
+        self.store = store
+        self.fetcher = fetcher or get_default_fetcher()
+        self.sources = set(sources or ENRICH_SOURCES)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or ENRICH_WORKERS)
+
+        self.fetched = 0
+        self.reused = 0
+        self.failed = 0
+
+    def _keyed(self, jobs):
+        return [
+            (job, normalize_url(job.get("link"))) for job in jobs
+            if job.get("source") in self.sources and job.get("link") not in (None, "", "N/A")
+        ]
+
+    def enrich(self, jobs):
+        """Updates the jobs in place with their details and returns them"""
+        keyed = self._keyed(jobs)
+        if not keyed:
+            return jobs
+
+        details = self.store.get_details(key for _, key in keyed)
+        self.reused += sum(1 for _, key in keyed if key in details)
+
+        # Batches are already deduped on link, but two links can share a normalized key
+        to_fetch = {}
+        for job, key in keyed:
+            if key not in details and key not in to_fetch:
+                to_fetch[key] = job
+
+        fetched = {}
+        for key, result in zip(to_fetch, self._pool.map(self._fetch, to_fetch.values())):
+            if result is not None:
+                fetched[key] = result
+        if fetched:
+            self.store.save_details(fetched)
+            details.update(fetched)
+
+        for job, key in keyed:
+            if key in details:
+                self._apply(job, details[key])
+        return jobs
+
+    def fill_known(self, jobs):
+        """
+        Updates the jobs in place with details already in the store and
+        returns them, without fetching anything (e.g. repeats of a link that
+        enrich() was given earlier)
+        """
+        keyed = self._keyed(jobs)
+        if keyed:
+            details = self.store.get_details(key for _, key in keyed)
+            for job, key in keyed:
+                if key in details:
+                    self._apply(job, details[key])
+        return jobs
+
+    def _fetch(self, job):
+        """Details from a job's page, or None if it couldn't be fetched (tried again next run)"""
+        source = job.get("source")
+        try:
+            response = self.fetcher.get(job["link"], headers=get_random_headers(), source=source)
+        except Exception as e:
+            self.logger.debug(f"Could not fetch {job['link']}: {e}")
+            self.failed += 1
+            METRICS.increment("enrich_total", source=source, outcome="error")
+            return None
+
+        if response.status_code not in FINAL_STATUSES:
+            self.failed += 1
+            METRICS.increment("enrich_total", source=source, outcome="error")
+            return None
+
+        result = {"status": response.status_code}
+        if response.status_code == 200:
+            with METRICS.timer("parse_seconds", scraper="DetailEnricher", source=source):
+                result.update(parse_job_posting(response.text))
+        self.fetched += 1
+        METRICS.increment("enrich_total", source=source, outcome="fetched")
+        return result
+
+    @staticmethod
+    def _apply(job, details):
+        # The detail page's date is exact, the card's is relative or missing
+        if details.get("posted_date"):
+            job["posted_date"] = details["posted_date"]
+        if details.get("company") and job.get("company") in (None, "", "N/A"):
+            job["company"] = details["company"]
+        if details.get("description"):
+            job["description"] = details["description"]
+
+    def log_summary(self, logger=None):
+        logger = logger or self.logger
+        logger.info(f"Enrichment: {self.fetched} detail pages fetched, {self.reused} reused from earlier runs, "
+                    f"{self.failed} failed")
+
+    def close(self):
+        self._pool.shutdown()
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import time
+from collections import deque, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import MAX_WORKERS, PER_HOST_CONCURRENCY, HOST_CONCURRENCY, BREAKER_THRESHOLD
+from fetch import AsyncFetcher, FetchError
+from metrics import METRICS, COUNT_BUCKETS
+from politeness import get_default_scheduler
+
+
+def search_labels(scraper, search_term):
+    return {"scraper": scraper.__class__.__name__, "location": search_term.get("location")}
+
+
+def timed_scrape(scraper, search_term):
+    """Runs one search, recording its duration"""
+    with METRICS.timer("search_seconds", **search_labels(scraper, search_term)):
+        return scraper.scrape(search_term)
+
+
+def record_search(scraper, search_term, jobs, error):
+    labels = search_labels(scraper, search_term)
+    if isinstance(error, CircuitOpenError):
+        METRICS.increment("searches_total", status="skipped", **labels)
+        return
+    METRICS.increment("searches_total", status="error" if error else "ok", **labels)
+    METRICS.observe("jobs_per_search", len(jobs), buckets=COUNT_BUCKETS, **labels)
+
+
+class CircuitOpenError(Exception):
+    """Passed to on_result for searches skipped because their source kept failing"""
+
+
+class CircuitBreaker:
+    """
+    Stops sending searches to a source that keeps failing.
+
+    Failures are counted per (scraper, host). Only FetchErrors count (the
+    site didn't answer, or not with a page), and any search that gets through
+    resets the count. After `threshold` failed searches in a row the breaker
+    opens and stays open for the rest of the run.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold or BREAKER_THRESHOLD
+        self._failures = defaultdict(int)
+        self._open = set()
+
+    @staticmethod
+    def key(scraper, host):
+        return scraper.__class__.__name__, host
+
+    def is_open(self, key):
+        return key in self._open
+
+    def record(self, key, error):
+        """Counts a finished search. Returns True if this failure opened the breaker."""
+        if not isinstance(error, FetchError):
+            if error is None:
+                self._failures[key] = 0
+            return False
+        self._failures[key] += 1
+        if self._failures[key] >= self.threshold and key not in self._open:
+            self._open.add(key)
+            return True
+        return False
+
+
+class SearchExecutor:
+    """
+    Runs scraper searches concurrently on a thread pool.
+
+    Searches are grouped by the host they hit (see BaseScraper.host_for) and
+    each host gets its own concurrency limit, so a slow site never starves
+    the others of workers. Hosts still in their politeness cooldown (see
+    PolitenessScheduler) are passed over while other hosts can go right away,
+    so workers aren't tied up waiting on one host.
+
+    A CircuitBreaker skips the remaining searches of a scraper/host pair once
+    it has failed several searches in a row; they end up in `skipped`.
+    """
+
+    def __init__(self, max_workers=None, per_host_limit=None, host_limits=None, scheduler=None,
+                 breaker_threshold=None):
+        self.max_workers = max_workers or MAX_WORKERS
+        self.per_host_limit = per_host_limit or PER_HOST_CONCURRENCY
+        self.host_limits = dict(HOST_CONCURRENCY)
+        if host_limits:
+            self.host_limits.update(host_limits)
+        self.scheduler = scheduler or get_default_scheduler()
+        self.breaker_threshold = breaker_threshold
+        self.breaker = CircuitBreaker(breaker_threshold)
+        # (scraper, search_term) pairs skipped by the breaker in the last run
+        self.skipped = []
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _limit_for(self, host):
+        return max(1, self.host_limits.get(host, self.per_host_limit))
+
+    def _reset(self):
+        self.breaker = CircuitBreaker(self.breaker_threshold)
+        self.skipped = []
+
+    def _skip(self, index, scraper, search_term, on_result):
+        """Reports a search the breaker won't let through"""
+        self.skipped.append((scraper, search_term))
+        error = CircuitOpenError(f"skipped, {scraper.__class__.__name__} failed "
+                                 f"{self.breaker.threshold} searches in a row")
+        record_search(scraper, search_term, [], error)
+        if on_result:
+            on_result(index, scraper, search_term, [], error)
+
+    def _update_breaker(self, scraper, host, error):
+        if self.breaker.record(self.breaker.key(scraper, host), error):
+            self.logger.warning(f"{scraper.__class__.__name__} failed {self.breaker.threshold} searches in a row "
+                                f"on {host}, skipping its remaining searches")
+
+    def _finish(self, index, scraper, search_term, jobs, error, results, on_result, keep_results):
+        """Records a finished search and hands its jobs on"""
+        record_search(scraper, search_term, jobs, error)
+        if keep_results:
+            results[index] = jobs
+        if on_result:
+            on_result(index, scraper, search_term, jobs, error)
+
+    def run(self, searches, on_result=None, keep_results=True):
+        """
+        Executes searches and returns their job lists in input order.
+
+        Args:
+            searches (List[Tuple]): (scraper, search_term) pairs
+            on_result (Callable): called as on_result(index, scraper, search_term, jobs, error)
+                from the calling thread as each search finishes
+            keep_results (bool): set False when on_result consumes the jobs,
+                so finished searches aren't held in memory
+
+        Returns:
+            List[List[Dict]]: jobs per search, aligned with `searches`
+                (all empty when keep_results is False)
+        """
+        self._reset()
+        results = [[] for _ in searches]
+        if not searches:
+            return results
+
+        # Queue searches per host, keeping their original order within each host
+        pending = defaultdict(deque)
+        for index, (scraper, search_term) in enumerate(searches):
+            pending[scraper.host_for(search_term)].append(index)
+
+        hosts = deque(pending.keys())
+        in_flight = defaultdict(int)
+        futures = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or futures:
+                # Fill free workers round-robin across hosts that have spare capacity
+                # and aren't cooling down
+                submitted = True
+                while submitted and len(futures) < self.max_workers:
+                    submitted = False
+                    for _ in range(len(hosts)):
+                        host = hosts[0]
+                        hosts.rotate(-1)
+                        if host not in pending or in_flight[host] >= self._limit_for(host):
+                            continue
+                        scraper, search_term = searches[pending[host][0]]
+                        skip = self.breaker.is_open(self.breaker.key(scraper, host))
+                        if not skip and self.scheduler.ready_in(host) > 0:
+                            continue
+
+                        index = pending[host].popleft()
+                        if not pending[host]:
+                            del pending[host]
+                            hosts.remove(host)
+
+                        submitted = True
+                        if skip:
+                            self._skip(index, scraper, search_term, on_result)
+                            break
+
+                        future = pool.submit(timed_scrape, scraper, search_term)
+                        futures[future] = (index, host)
+                        in_flight[host] += 1
+                        break
+
+                # Wake up when a search finishes or a cooling host becomes ready
+                timeout = None
+                if len(futures) < self.max_workers:
+                    cooling = [self.scheduler.ready_in(host) for host in pending
+                               if in_flight[host] < self._limit_for(host)]
+                    timeout = min(cooling, default=None)
+                if not futures:
+                    time.sleep(timeout or 0)
+                    continue
+
+                done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, host = futures.pop(future)
+                    in_flight[host] -= 1
+                    scraper, search_term = searches[index]
+
+                    error = None
+                    try:
+                        jobs = future.result() or []
+                    except Exception as e:
+                        jobs = []
+                        error = e
+
+                    self._update_breaker(scraper, host, error)
+                    self._finish(index, scraper, search_term, jobs, error, results, on_result, keep_results)
+
+        return results
+
+
+class AsyncSearchExecutor(SearchExecutor):
+    """
+    asyncio variant of SearchExecutor.
+
+    Scrapers with a scrape_async() method share one AsyncFetcher, so many
+    requests stay in flight from a single thread. Other scrapers (e.g. the
+    Selenium-based LinkedIn one) run on worker threads via asyncio.to_thread.
+    """
+
+    def __init__(self, max_workers=None, per_host_limit=None, host_limits=None, cache=None, scheduler=None,
+                 breaker_threshold=None):
+        super().__init__(max_workers, per_host_limit, host_limits, scheduler, breaker_threshold)
+        self.cache = cache
+
+    def run(self, searches, on_result=None, keep_results=True):
+        return asyncio.run(self._run(searches, on_result, keep_results))
+
+    async def _run(self, searches, on_result, keep_results):
+        self._reset()
+        results = [[] for _ in searches]
+        if not searches:
+            return results
+
+        try:
+            client = AsyncFetcher(per_host_limit=self.per_host_limit, host_limits=self.host_limits, cache=self.cache,
+                                  scheduler=self.scheduler)
+        except ImportError as e:
+            self.logger.warning(f"{e}; falling back to threads for all searches")
+            client = None
+
+        workers = asyncio.Semaphore(self.max_workers)
+        host_slots = {}
+
+        async def run_one(index, scraper, search_term):
+            host = scraper.host_for(search_term)
+            if host not in host_slots:
+                host_slots[host] = asyncio.Semaphore(self._limit_for(host))
+
+            async with host_slots[host]:
+                if self.breaker.is_open(self.breaker.key(scraper, host)):
+                    return index, [], None, True
+
+                # Don't hold a worker slot through the host's cooldown
+                while self.scheduler.ready_in(host) > 0:
+                    await asyncio.sleep(self.scheduler.ready_in(host))
+
+                async with workers:
+                    try:
+                        if client and hasattr(scraper, "scrape_async"):
+                            with METRICS.timer("search_seconds", **search_labels(scraper, search_term)):
+                                jobs = await scraper.scrape_async(search_term, client)
+                        else:
+                            jobs = await asyncio.to_thread(timed_scrape, scraper, search_term)
+                        jobs, error = jobs or [], None
+                    except Exception as e:
+                        jobs, error = [], e
+
+                # Update the breaker before the next search for this host gets its slot
+                self._update_breaker(scraper, host, error)
+                return index, jobs, error, False
+
+        try:
+            # Started as tasks here, in plan order: as_completed() would start bare coroutines in
+            # arbitrary order, and the host semaphores hand out slots first come, first served
+            tasks = [asyncio.create_task(run_one(i, scraper, term)) for i, (scraper, term) in enumerate(searches)]
+            for next_done in asyncio.as_completed(tasks):
+                index, jobs, error, skipped = await next_done
+                scraper, search_term = searches[index]
+                if skipped:
+                    self._skip(index, scraper, search_term, on_result)
+                else:
+                    self._finish(index, scraper, search_term, jobs, error, results, on_result, keep_results)
+        finally:
+            if client:
+                await client.close()
+
+        return results
@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from cache import CacheMissError
+from metrics import METRICS, BYTES_BUCKETS
+from politeness import get_default_scheduler
+from config import (REQUEST_TIMEOUT, HTTP_POOL_SIZE, PER_HOST_CONCURRENCY, HOST_CONCURRENCY,
+                    MAX_RETRIES, RETRY_BUDGET, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX, RETRY_STATUSES)
+
+try:
+    import aiohttp
+except ImportError:  # Optional, only needed for the async fetch path
+    aiohttp = None
+
+
+class FetchError(Exception):
+    """A page that couldn't be fetched, after retries (connection error, timeout or bad status)"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RetryPolicy:
+    """
+    Bounded retries for transient failures (connection errors, timeouts and
+    RETRY_STATUSES) with full-jitter exponential backoff.
+
+    Each request is retried at most `max_retries` times, and all requests
+    through one fetcher share a `budget` of retries, so a site that is down
+    can't multiply the cost of the whole run.
+    """
+
+    def __init__(self, max_retries=None, budget=None, base_delay=None, max_delay=None):
+        self.max_retries = max_retries if max_retries is not None else MAX_RETRIES
+        self.budget = budget if budget is not None else RETRY_BUDGET
+        self._full_budget = self.budget
+        self.base_delay = base_delay if base_delay is not None else RETRY_BACKOFF_BASE
+        self.max_delay = max_delay if max_delay is not None else RETRY_BACKOFF_MAX
+        self._lock = threading.Lock()
+
+    def should_retry(self, attempt):
+        """Whether a request that failed on `attempt` (0-based) gets another try"""
+        if attempt >= self.max_retries:
+            return False
+        with self._lock:
+            if self.budget <= 0:
+                return False
+            self.budget -= 1
+            return True
+
+    def reset(self):
+        """Restores the full budget, for a long-lived fetcher starting a new run"""
+        with self._lock:
+            self.budget = self._full_budget
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class FetchResponse:
+    """Minimal response object shared by the sync and async fetch paths"""
+
+    def __init__(self, url, status_code, text, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.from_cache = False
+
+
+class Fetcher:
+    """
+    Shared HTTP layer for the HTML scrapers.
+
+    Keeps one keep-alive session (and connection pool) per host and caps the
+    number of requests in flight to each host. Requests are paced per host by
+    a PolitenessScheduler and transient failures are retried per RetryPolicy.
+    If a ResponseCache is given, responses are served from / stored in it
+    according to its mode (cache hits aren't paced).
+    """
+
+    def __init__(self, pool_size=None, per_host_limit=None, host_limits=None, timeout=None, cache=None, scheduler=None,
+                 retry=None):
+        self.pool_size = pool_size or HTTP_POOL_SIZE
+        self.per_host_limit = per_host_limit or PER_HOST_CONCURRENCY
+        self.host_limits = dict(HOST_CONCURRENCY)
+        if host_limits:
+            self.host_limits.update(host_limits)
+        self.timeout = timeout or REQUEST_TIMEOUT
+        self.cache = cache
+        self.scheduler = scheduler or get_default_scheduler()
+        self.retry = retry or RetryPolicy()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._sessions = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def _session_for(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._slots[host] = threading.BoundedSemaphore(
+                    max(1, self.host_limits.get(host, self.per_host_limit))
+                )
+            return session, self._slots[host]
+
+    def get(self, url, headers=None, timeout=None, source=None):
+        """Fetches a URL over the pooled session for its host, going through the cache if set"""
+        entry, body, is_fresh = (None, None, False)
+        if self.cache:
+            entry, body, is_fresh = self.cache.lookup(url, source)
+            if entry and is_fresh:
+                METRICS.increment("cache_hits_total", source=source)
+                return _cached_response(url, entry, body)
+            if self.cache.offline:
+                raise CacheMissError(f"{url} is not in the cache")
+
+        headers = dict(headers or {})
+        if entry:
+            headers.update(self.cache.conditional_headers(entry))
+
+        host = urlparse(url).netloc
+        session, slot = self._session_for(host)
+        attempt = 0
+        while True:
+            try:
+                with slot:
+                    waited = self.scheduler.acquire(host)
+                    METRICS.observe("throttle_seconds", waited, host=host)
+                    with METRICS.timer("fetch_seconds", source=source, host=host):
+                        response = session.get(url, headers=headers, timeout=timeout or self.timeout)
+            except requests.RequestException as e:
+                METRICS.increment("http_errors_total", source=source, error=e.__class__.__name__)
+                if not self.retry.should_retry(attempt):
+                    raise FetchError(f"{url}: {e}") from e
+                reason = e.__class__.__name__
+            else:
+                self.scheduler.feedback(host, response.status_code, response.headers.get("Retry-After"))
+                record_response(source, response.status_code, len(response.content))
+                if response.status_code not in RETRY_STATUSES or not self.retry.should_retry(attempt):
+                    break
+                reason = response.status_code
+
+            delay = self.retry.delay(attempt)
+            self.logger.warning(f"Retrying {url} in {delay:.1f}s ({reason})")
+            METRICS.increment("retries_total", source=source)
+            time.sleep(delay)
+            attempt += 1
+
+        if entry and response.status_code == 304:
+            self.cache.mark_revalidated(url, entry)
+            return _cached_response(url, entry, body)
+
+        if self.cache:
+            self.cache.store(url, response.text, response.status_code, response.headers, source)
+        return FetchResponse(response.url, response.status_code, response.text, response.headers)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._slots.clear()
+
+
+class AsyncFetcher:
+    """
+    asyncio counterpart of Fetcher, backed by aiohttp.
+
+    One ClientSession is shared by all hosts (aiohttp pools connections per
+    host internally); per-host limits are enforced with semaphores.
+    """
+
+    def __init__(self, pool_size=None, per_host_limit=None, host_limits=None, timeout=None, cache=None, scheduler=None,
+                 retry=None):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for the async fetch path (pip install aiohttp)")
+
+        self.pool_size = pool_size or HTTP_POOL_SIZE
+        self.per_host_limit = per_host_limit or PER_HOST_CONCURRENCY
+        self.host_limits = dict(HOST_CONCURRENCY)
+        if host_limits:
+            self.host_limits.update(host_limits)
+        self.timeout = timeout or REQUEST_TIMEOUT
+        self.cache = cache
+        self.scheduler = scheduler or get_default_scheduler()
+        self.retry = retry or RetryPolicy()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._session = None
+        self._slots = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _slot_for(self, host):
+        if host not in self._slots:
+            self._slots[host] = asyncio.Semaphore(max(1, self.host_limits.get(host, self.per_host_limit)))
+        return self._slots[host]
+
+    async def get(self, url, headers=None, timeout=None, source=None):
+        """Fetches a URL, waiting for a free slot on its host"""
+        entry, body, is_fresh = (None, None, False)
+        if self.cache:
+            entry, body, is_fresh = self.cache.lookup(url, source)
+            if entry and is_fresh:
+                METRICS.increment("cache_hits_total", source=source)
+                return _cached_response(url, entry, body)
+            if self.cache.offline:
+                raise CacheMissError(f"{url} is not in the cache")
+
+        headers = dict(headers or {})
+        if entry:
+            headers.update(self.cache.conditional_headers(entry))
+
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_size)
+            self._session = aiohttp.ClientSession(connector=connector)
+
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        host = urlparse(url).netloc
+        attempt = 0
+        while True:
+            try:
+                response = await self._request(url, headers, client_timeout, source, host)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                METRICS.increment("http_errors_total", source=source, error=e.__class__.__name__)
+                if not self.retry.should_retry(attempt):
+                    raise FetchError(f"{url}: {e!r}") from e
+                reason = e.__class__.__name__
+            else:
+                self.scheduler.feedback(host, response.status_code, response.headers.get("Retry-After"))
+                record_response(source, response.status_code, len(response.text))
+                if response.status_code not in RETRY_STATUSES or not self.retry.should_retry(attempt):
+                    break
+                reason = response.status_code
+
+            delay = self.retry.delay(attempt)
+            self.logger.warning(f"Retrying {url} in {delay:.1f}s ({reason})")
+            METRICS.increment("retries_total", source=source)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if entry and response.status_code == 304:
+            self.cache.mark_revalidated(url, entry)
+            return _cached_response(url, entry, body)
+
+        if self.cache:
+            self.cache.store(url, response.text, response.status_code, response.headers, source)
+        return response
+
+    async def _request(self, url, headers, client_timeout, source, host):
+        async with self._slot_for(host):
+            waited = await self.scheduler.acquire_async(host)
+            METRICS.observe("throttle_seconds", waited, host=host)
+            with METRICS.timer("fetch_seconds", source=source, host=host):
+                async with self._session.get(url, headers=headers, timeout=client_timeout) as response:
+                    data = await response.read()
+                    text = data.decode(response.get_encoding(), errors="replace") if data else ""
+                    return FetchResponse(str(response.url), response.status, text, response.headers)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def record_response(source, status_code, size):
+    METRICS.increment("http_requests_total", source=source, status=status_code)
+    METRICS.observe("response_bytes", size, buckets=BYTES_BUCKETS, source=source)
+
+
+def _cached_response(url, entry, body):
+    response = FetchResponse(url, entry.get("status_code", 200), body, {
+        "ETag": entry.get("etag") or "",
+        "Last-Modified": entry.get("last_modified") or ""
+    })
+    response.from_cache = True
+    return response
+
+
+_default_fetcher = None
+_default_lock = threading.Lock()
+
+def get_default_fetcher():
+    """Returns the process-wide Fetcher shared by scrapers that aren't given one"""
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = Fetcher()
+        return _default_fetcher
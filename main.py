@@ -1,136 +1,306 @@
 import pandas as pd
-import logging
 import argparse
-from datetime import datetime
-from config import LOCATIONS, JOB_TITLES, OUTPUT_FILE, CSV_COLUMNS
+import os
+import time
+from datetime import datetime, timedelta
+from config import LOCATIONS, JOB_TITLES, OUTPUT_FILE, CSV_COLUMNS, METRICS_FILE
 from utils import setup_logger
-from scrapers.brightermonday import BrighterMondayScraper
-from scrapers.myjobmag import MyJobMagScraper
-from scrapers.linkedin import LinkedinScraper
+from collections import Counter
+from executor import SearchExecutor, AsyncSearchExecutor, CircuitOpenError
+from workqueue import QueueExecutor, run_worker
+from fetch import Fetcher
+from cache import ResponseCache, CACHE_MODES
+from store import JobStore
+from manifest import RunManifest
+from sink import SINKS, HistorySink
+from dedupe import NearDuplicateIndex
+from enrich import DetailEnricher
+from metrics import METRICS
+from planner import plan_searches, log_plan
+from scrapers import build_scrapers
 
-from utils import setup_logger, parse_relative_date, is_within_days
+def run_scraper(limit=None, days=None, workers=None, executor_type="thread", cache_mode="off", incremental=False, output_format="csv", history=False, near_dedupe=True,
+                enrich=False, fetcher=None, output_file=None, linkedin_backend=None, metrics_file=None, manifest_file=None, resume=None):
+    """
+    Runs every planned search and writes the results.
 
-def run_scraper(limit=None, days=None):
+    `fetcher`, `output_file` and `linkedin_backend` let callers (e.g. the
+    pipeline benchmark) replay recorded pages and write somewhere else.
+    Stage timings and request metrics are written to `metrics_file` (JSON)
+    and a Prometheus .prom file next to it.
+
+    Each finished search is checkpointed in the run manifest (`manifest_file`).
+    `resume` carries on with an earlier run's unfinished searches; the other
+    arguments should match that run (resume_run() loads them from the manifest).
+    """
     logger = setup_logger()
     logger.info("Starting Eastern Africa Data Job Scraper...")
+    output_file = output_file or (OUTPUT_FILE if output_format == "csv" else f"{os.path.splitext(OUTPUT_FILE)[0]}.{output_format}")
+    metrics_file = metrics_file or METRICS_FILE
+    METRICS.reset()
+    started_at = datetime.now().isoformat(timespec="seconds")
+    run_start = time.perf_counter()
+    
+    def export_metrics():
+        METRICS.observe("stage_seconds", time.perf_counter() - run_start, stage="total")
+        log_stage_times(logger)
+        try:
+            METRICS.write_json(metrics_file, started_at=started_at)
+            METRICS.write_prometheus(f"{os.path.splitext(metrics_file)[0]}.prom")
+            logger.info(f"Metrics saved to {metrics_file}")
+        except Exception as e:
+            logger.error(f"Error saving metrics to {metrics_file}: {e}")
     
     if days:
         logger.info(f"Filtering jobs from the last {days} days.")
     
     # Check for .env
     from dotenv import load_dotenv
-    import os
     if not os.path.exists(".env"):
         logger.warning("No .env file found. Credentials might be missing.")
     else:
         load_dotenv()
 
+    # Response cache shared by the HTTP scrapers and LinkedIn page loads
+    cache = ResponseCache(mode=cache_mode)
+    if cache.enabled:
+        logger.info(f"Response cache: {cache_mode} ({cache.directory})")
+    fetcher = fetcher or Fetcher(cache=cache)
+
     # Initialize Scrapers
-    scrapers = [
-        BrighterMondayScraper(),
-        MyJobMagScraper(),
-        LinkedinScraper()
-    ]
+    scrapers = build_scrapers(fetcher=fetcher, cache=cache, linkedin_backend=linkedin_backend)
 
-    all_jobs = []
-    
-    total_searches = len(LOCATIONS) * len(JOB_TITLES) * len(scrapers)
     if limit:
         logger.info(f"Limit set to {limit} searches per scraper.")
-    else:
-        logger.info(f"Planned searches: {total_searches}")
     
-    for scraper in scrapers:
+    # Incremental mode: scrapers stop paging once they reach jobs we already have
+    store = None
+    if incremental:
+        store = JobStore()
+        known_links = store.known_keys()
+        logger.info(f"Incremental mode: {len(known_links)} jobs already in {store.path}")
+        for scraper in scrapers:
+            scraper.known_links = known_links
+    
+    if history:
+        store = store or JobStore()
+    
+    manifest = RunManifest(manifest_file)
+    if resume:
+        # Same searches as the original run, minus the ones already checkpointed
+        searches = manifest.searches(resume, scrapers)
+        done = manifest.done(resume)
+        run_id = resume
+        logger.info(f"Resuming run {run_id}: {len(done)} of {len(searches)} searches already done")
+    else:
+        # Plan searches: drop unsupported locations and merge synonym titles
+        with METRICS.timer("stage_seconds", stage="plan"):
+            plan, naive_count = plan_searches(scrapers, LOCATIONS, JOB_TITLES, limit=limit, days=days)
+        log_plan(plan, naive_count, logger)
+        searches = [(search.scraper, search.search_term) for search in plan]
+        done = set()
+        run_id = manifest.start_run(searches, {
+            "limit": limit, "days": days, "workers": workers, "executor_type": executor_type,
+            "cache_mode": cache_mode, "incremental": incremental, "output_format": output_format,
+            "history": history, "near_dedupe": near_dedupe, "enrich": enrich, "output_file": output_file,
+            "linkedin_backend": linkedin_backend, "metrics_file": metrics_file
+        })
+        logger.info(f"Run {run_id} recorded in {manifest.path} (resume it with: python main.py --resume {run_id})")
+    pending = [index for index in range(len(searches)) if index not in done]
+
+    def log_result(index, scraper, search_term, jobs, error):
         scraper_name = scraper.__class__.__name__
-        logger.info(f"--- Starting {scraper_name} ---")
-        
-        search_count = 0
-        
-        for location in LOCATIONS:
-            if limit and search_count >= limit:
-                break
-                
-            for title in JOB_TITLES:
-                if limit and search_count >= limit:
-                    break
-                    
-                search_term = {
-                    "title": title, 
-                    "location": location,
-                    "days": days # Pass to scraper if it supports pre-filtering
-                }
-                
-                try:
-                    jobs = scraper.scrape(search_term)
-                    
-                    if jobs:
-                        logger.info(f"Found {len(jobs)} jobs for '{title}' in '{location}' on {scraper_name}")
-                        all_jobs.extend(jobs)
-                    else:
-                        logger.info(f"No jobs found for '{title}' in '{location}' on {scraper_name}")
-                        
-                except Exception as e:
-                    logger.error(f"Failed search for '{title}' in '{location}' on {scraper_name}: {e}")
-                finally:
-                    search_count += 1
-                    
+        title = search_term["title"]
+        location = search_term["location"]
+        if isinstance(error, CircuitOpenError):
+            logger.warning(f"Skipped search for '{title}' in '{location}' on {scraper_name}: {error}")
+        elif error:
+            logger.error(f"Failed search for '{title}' in '{location}' on {scraper_name}: {error}")
+        elif jobs:
+            logger.info(f"Found {len(jobs)} jobs for '{title}' in '{location}' on {scraper_name}")
+        else:
+            logger.info(f"No jobs found for '{title}' in '{location}' on {scraper_name}")
+            
+        titles = search_term.get("titles", [title])
+        if len(titles) > 1:
+            logger.info(f"  ('{title}' also covers: {', '.join(t for t in titles if t != title)})")
+
+    if executor_type == "async":
+        executor = AsyncSearchExecutor(max_workers=workers, cache=cache)
+    elif executor_type == "process":
+        # Searches go through a shared work queue; workers rebuild their own scrapers from these options
+        executor = QueueExecutor(max_workers=workers, options={
+            "cache_mode": cache_mode, "linkedin_backend": linkedin_backend, "incremental": incremental
+        })
+    else:
+        executor = SearchExecutor(max_workers=workers)
+    logger.info(f"Running {len(pending)} searches with {executor.max_workers} workers")
+    
+    # Each search is checkpointed as it finishes. In incremental mode its jobs
+    # also go into the store, and the output is exported from the full history afterwards.
+    def handle_result(index, scraper, search_term, jobs, error):
+        log_result(index, scraper, search_term, jobs, error)
+        manifest.record(run_id, pending[index], jobs, error)
+        if jobs and incremental:
+            store.upsert(jobs)
+    
+    try:
+        with METRICS.timer("stage_seconds", stage="scrape"):
+            executor.run([searches[index] for index in pending], on_result=handle_result, keep_results=False)
+    finally:
+        for scraper in scrapers:
+            scraper.close()
+    log_skipped(executor.skipped, logger)
+    
+    # Detail pages are fetched from the sink, after dedupe, and remembered in the store
+    enricher = None
+    if enrich:
+        store = store or JobStore()
+        enricher = DetailEnricher(store, fetcher)
+    
+    def make_sink():
+        # Near-duplicates are always clustered for canonical_id; near_dedupe decides whether later copies are dropped
+        return SINKS[output_format](output_file, days, near_dedupe=NearDuplicateIndex(), enricher=enricher,
+                                    keep_near_duplicates=not near_dedupe)
+    
+    sink = None if incremental else make_sink()
+    
+    # History mode: every run is appended to the store as its own batch
+    history_sink = None
+    if history:
+        history_sink = HistorySink(store, {
+            "locations": LOCATIONS, "titles": JOB_TITLES, "limit": limit, "days": days, "manifest_run": run_id
+        })
+        logger.info(f"Recording run {history_sink.run_id} in {store.path}")
+    
+    # Write the checkpointed batches in plan order (resumed or not, the output comes out the same)
+    jobs_per_title = {title: 0 for title in JOB_TITLES}
+    found_count = 0
+    for index, jobs in manifest.iter_batches(run_id):
+        search_term = searches[index][1]
+        # Fan results back out to every title the query stood in for
+        for matched in search_term.get("titles", [search_term["title"]]):
+            jobs_per_title[matched] = jobs_per_title.get(matched, 0) + len(jobs)
+        if not jobs:
+            continue
+        found_count += len(jobs)
+        if not incremental:
+            sink.write(jobs)
+        if history_sink:
+            # The history keeps every copy, with the details the sink's enricher found for the
+            # ones it kept (there's no sink yet in incremental mode, so the batch is enriched here)
+            if enricher and incremental:
+                enricher.enrich(jobs)
+            elif enricher:
+                enricher.fill_known(jobs)
+            history_sink.write(jobs, search_term)
+    
+    for title, count in jobs_per_title.items():
+        logger.info(f"Jobs matching '{title}': {count}")
+    
+    if history_sink:
+        history_sink.close()
+    
     # Process Results
-    if not all_jobs:
+    if not found_count:
         logger.warning("No jobs found in this run.")
+        if not incremental:
+            sink.discard()
+        if enricher:
+            enricher.close()
+        if store:
+            store.close()
+        manifest.finish_run(run_id)
+        manifest.close()
+        export_metrics()
         return
-
-    df = pd.DataFrame(all_jobs)
     
-    # Deduplicate
-    initial_count = len(df)
-    df.drop_duplicates(subset=['link'], keep='first', inplace=True)
-    dedupa_count = len(df)
-    logger.info(f"Deduplication: {initial_count} -> {dedupa_count} jobs")
-    
-    # Date Filtering (Post-processing)
-    if days:
-        logger.info("Applying date filter...")
-        
-        def check_date(row):
-            date_obj = parse_relative_date(row['posted_date'])
-            # If date extraction failed (None) or is "Recent", we typically keep it
-            # But if strict filtering is needed, user might want to drop "N/A" dates.
-            # For now, let's keep "Recent" (returns Now) and drop actual old dates
-            if not date_obj:
-                # If date is N/A, we can't be sure.
-                # Policy: If we can't parse, maybe keep? Or drop? 
-                # Let's keep to be safe, but log.
-                return True
-            return is_within_days(date_obj, days)
-            
-        df = df[df.apply(check_date, axis=1)]
-        filtered_count = len(df)
-        logger.info(f"Date Filter: {dedupa_count} -> {filtered_count} jobs (Last {days} days)")
-        dedupa_count = filtered_count
-    
-    # Ensure all columns exist
-    for col in CSV_COLUMNS:
-        if col not in df.columns:
-            df[col] = "N/A"
-            
-    df = df[CSV_COLUMNS]
+    if incremental:
+        logger.info(f"Job store: {store.count()} jobs, {store.count() - len(known_links)} new this run")
+        sink = make_sink()
+        with METRICS.timer("stage_seconds", stage="export"):
+            for jobs in store.iter_jobs():
+                sink.write(jobs)
+    if enricher:
+        enricher.log_summary(logger)
+        enricher.close()
+    if store:
+        store.close()
     
     try:
-        # Write summary to file first
-        with open(OUTPUT_FILE, 'w') as f:
-            f.write(f"# Total Jobs Found: {dedupa_count}, Scrape Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        
-        # Append DataFrame
-        df.to_csv(OUTPUT_FILE, mode='a', index=False)
-        logger.info(f"Data saved to {OUTPUT_FILE}")
-        
-        # Preview
-        print("\n--- Preview ---")
-        print(df.head(10))
-        print(f"\nTotal: {dedupa_count} jobs saved.")
-        
+        with METRICS.timer("stage_seconds", stage="close"):
+            sink.close()
     except Exception as e:
-        logger.error(f"Error saving to CSV: {e}")
+        logger.error(f"Error saving to {output_file}: {e}")
+        # Left unfinished, so the output can be written again with --resume
+        manifest.close()
+        export_metrics()
+        return
+    
+    sink.log_summary(logger)
+    logger.info(f"Data saved to {output_file}")
+    manifest.finish_run(run_id)
+    manifest.close()
+    export_metrics()
+    
+    # Preview
+    print("\n--- Preview ---")
+    print(pd.DataFrame(sink.preview, columns=CSV_COLUMNS))
+    print(f"\nTotal: {sink.written} jobs saved.")
+
+def resume_run(run_id, manifest_file=None):
+    """Carries on with an interrupted run, using the options it was started with"""
+    manifest = RunManifest(manifest_file)
+    options = manifest.options(run_id)
+    resumable = options is not None and manifest.resumable(run_id)
+    manifest.close()
+    if options is None:
+        setup_logger().error(f"No run {run_id} in {manifest.path}")
+        return
+    if not resumable:
+        setup_logger().info(f"Run {run_id} finished all its searches and wrote its output, nothing to resume")
+        return
+    run_scraper(**options, manifest_file=manifest_file, resume=run_id)
+
+def log_skipped(skipped, logger):
+    """Summarizes the searches the circuit breaker skipped, per scraper and host"""
+    if not skipped:
+        return
+    counts = Counter((scraper.__class__.__name__, scraper.host_for(search_term)) for scraper, search_term in skipped)
+    logger.warning(f"Skipped {len(skipped)} searches on failing sources:")
+    for (scraper_name, host), count in counts.most_common():
+        logger.warning(f"  {scraper_name} ({host}): {count} searches")
+
+def log_stage_times(logger):
+    """Logs where the run's time went (summed across workers, so it can exceed wall time)"""
+    logger.info(f"Run time: {METRICS.total('stage_seconds', stage='total'):.1f}s, "
+                f"scraping {METRICS.total('stage_seconds', stage='scrape'):.1f}s")
+    for name, label in [
+        ("fetch_seconds", "fetching"), ("parse_seconds", "parsing"), ("throttle_seconds", "waiting on host pacing"),
+        ("sleep_seconds", "Chrome waits"),
+        ("page_load_seconds", "Chrome page loads"), ("driver_start_seconds", "Chrome startup")
+    ]:
+        total = METRICS.total(name)
+        if total:
+            logger.info(f"  {label}: {total:.1f}s")
+    for stage in ["dedupe", "enrich", "date_filter", "write", "close"]:
+        total = METRICS.total("stage_seconds", stage=stage)
+        if total:
+            logger.info(f"  {stage.replace('_', ' ')}: {total:.2f}s")
+    requests = METRICS.total("http_requests_total")
+    if requests:
+        logger.info(f"  {int(requests)} HTTP requests, {METRICS.total('response_bytes') / 2**20:.1f} MiB, "
+                    f"{int(METRICS.total('cache_hits_total'))} cache hits, {int(METRICS.total('retries_total'))} retries")
+
+def show_history(days=None, locations=None, sources=None, run="latest"):
+    """Prints a slice of the stored history without re-reading any output file"""
+    store = JobStore()
+    since = datetime.now() - timedelta(days=days) if days else None
+    df = store.query(run_id=run, sources=sources, countries=locations, since=since)
+    store.close()
+    
+    print(df.to_string(index=False) if not df.empty else "No stored jobs match.")
+    print(f"\nTotal: {len(df)} jobs")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="scrape jobs")
@@ -138,8 +308,36 @@ if __name__ == "__main__":
     parser.add_argument("--title", help="Filter by specific job title (e.g. 'data analyst')")
     parser.add_argument("--limit", type=int, help="Limit number of searches per scraper for testing")
     parser.add_argument("--days", type=int, help="Filter jobs posted in the last N days")
+    parser.add_argument("--workers", type=int, help="Number of searches to run in parallel")
+    parser.add_argument("--executor", choices=["thread", "async", "process"], default="thread", help="Run searches on a thread pool, an asyncio event loop, or worker processes fed from a work queue")
+    parser.add_argument("--incremental", action="store_true", help="Upsert into the persistent job store and stop paging at already-known jobs")
+    parser.add_argument("--format", choices=sorted(SINKS), default="csv", help="Output format, written from the run's checkpointed searches once scraping is done")
+    parser.add_argument("--history", action="store_true", help="Append this run as a batch to the SQLite job history")
+    parser.add_argument("--enrich", action="store_true", help="Fetch detail pages of new jobs for their real posted date, company and description")
+    parser.add_argument("--keep-near-duplicates", action="store_true", help="Keep every copy of a posting that appears on several sites under different links (copies share a canonical_id)")
+    parser.add_argument("--show", nargs="?", const="latest", metavar="RUN", help="Print stored jobs from the history (latest run, a run id, or 'all') instead of scraping")
+    parser.add_argument("--source", action="append", help="With --show, only jobs from this source (repeatable)")
+    parser.add_argument("--resume", type=int, metavar="RUN", help="Carry on with an interrupted run, skipping the searches it already finished")
+    parser.add_argument("--join", nargs="?", const=0, type=int, metavar="RUN", help="Work on a queued --executor process run (the latest one by default) instead of starting a new run")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, default="off", help="Response cache: off, use (TTL + revalidation), refresh, or offline-replay (no network)")
     args = parser.parse_args()
     
+    # Extra worker for a run coordinated elsewhere (e.g. on another host sharing the queue)
+    if args.join is not None:
+        run_worker(run_id=args.join or None)
+        raise SystemExit
+    
+    if args.resume:
+        resume_run(args.resume)
+        raise SystemExit
+    
+    # Read back a slice of the history
+    if args.show:
+        run = None if args.show == "all" else ("latest" if args.show == "latest" else int(args.show))
+        locations = [l for l in LOCATIONS if args.location.lower() in l.lower()] if args.location else None
+        show_history(days=args.days, locations=locations, sources=args.source, run=run)
+        raise SystemExit
+    
     # Apply filters
     if args.location:
         filtered_locs = [l for l in LOCATIONS if args.location.lower() in l.lower()]
@@ -153,4 +351,4 @@ if __name__ == "__main__":
         if filtered_titles:
             JOB_TITLES[:] = filtered_titles
             
-    run_scraper(limit=args.limit, days=args.days)
+    run_scraper(limit=args.limit, days=args.days, workers=args.workers, executor_type=args.executor, cache_mode=args.cache_mode, incremental=args.incremental, output_format=args.format, history=args.history, near_dedupe=not args.keep_near_duplicates, enrich=args.enrich)
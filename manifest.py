@@ -0,0 +1,143 @@
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from config import MANIFEST_PATH
+
+
+class RunManifest:
+    """
+    Checkpoints of scrape runs in SQLite, so an interrupted run can be resumed.
+
+    Every run's planned searches are recorded up front (scraper, search term
+    and the run's options). As each search finishes its job batch is stored
+    with it, in its own transaction, so whatever finished before a crash is
+    kept. A resumed run only runs the searches that aren't done, and the
+    output is always written from the stored batches in plan order, which
+    makes it the same as that of an uninterrupted run. Once a run's output
+    is written and every search is done, its batches are dropped (see
+    finish_run); only the search list and counts are kept.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or MANIFEST_PATH
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS manifest_runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT,
+                finished_at TEXT,
+                options TEXT
+            );
+            CREATE TABLE IF NOT EXISTS manifest_searches (
+                run_id INTEGER REFERENCES manifest_runs(run_id),
+                idx INTEGER,
+                scraper TEXT,
+                title TEXT,
+                location TEXT,
+                search_term TEXT,
+                status TEXT DEFAULT 'pending',
+                finished_at TEXT,
+                job_count INTEGER,
+                jobs TEXT,
+                error TEXT,
+                PRIMARY KEY (run_id, idx)
+            );
+        """)
+        self._conn.commit()
+
+    def start_run(self, searches, options=None):
+        """Records a run's planned (scraper, search_term) pairs and returns its run id"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO manifest_runs (started_at, options) VALUES (?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), json.dumps(options or {}))
+            )
+            run_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO manifest_searches (run_id, idx, scraper, title, location, search_term) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, idx, scraper.__class__.__name__, term.get("title"), term.get("location"), json.dumps(term))
+                    for idx, (scraper, term) in enumerate(searches)
+                ]
+            )
+        return run_id
+
+    def options(self, run_id):
+        """Options the run was started with, or None if there's no such run"""
+        row = self._conn.execute("SELECT options FROM manifest_runs WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def searches(self, run_id, scrapers):
+        """The run's planned searches as (scraper, search_term) pairs, matched by scraper class name"""
+        by_name = {scraper.__class__.__name__: scraper for scraper in scrapers}
+        rows = self._conn.execute(
+            "SELECT scraper, search_term FROM manifest_searches WHERE run_id = ? ORDER BY idx", (run_id,)
+        ).fetchall()
+
+        searches = []
+        for name, term in rows:
+            if name not in by_name:
+                raise ValueError(f"Run {run_id} used {name}, which isn't configured now")
+            searches.append((by_name[name], json.loads(term)))
+        return searches
+
+    def resumable(self, run_id):
+        """Whether --resume has anything to do: searches left to run (pending or failed), or output not written"""
+        row = self._conn.execute(
+            "SELECT finished_at IS NULL OR EXISTS (SELECT 1 FROM manifest_searches WHERE run_id = ? AND status != 'done') "
+            "FROM manifest_runs WHERE run_id = ?", (run_id, run_id)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def done(self, run_id):
+        """Indexes of the searches that finished without an error"""
+        rows = self._conn.execute(
+            "SELECT idx FROM manifest_searches WHERE run_id = ? AND status = 'done'", (run_id,)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def record(self, run_id, idx, jobs, error=None):
+        """Checkpoints a finished search. Failed searches are run again on resume."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE manifest_searches SET status = ?, finished_at = ?, job_count = ?, jobs = ?, error = ? "
+                "WHERE run_id = ? AND idx = ?",
+                ("failed" if error else "done", datetime.now().isoformat(timespec="seconds"), len(jobs),
+                 json.dumps(jobs), str(error) if error else None, run_id, idx)
+            )
+
+    def iter_batches(self, run_id):
+        """Yields (idx, jobs) for every finished search in plan order, one batch in memory at a time"""
+        cursor = self._conn.execute(
+            "SELECT idx, jobs FROM manifest_searches WHERE run_id = ? AND status = 'done' ORDER BY idx", (run_id,)
+        )
+        for idx, jobs in cursor:
+            yield idx, json.loads(jobs)
+
+    def finish_run(self, run_id):
+        """
+        Marks a run's output as written. If every search is done, --resume has
+        nothing left to do, so the job batches are dropped; a run with failed
+        searches keeps them, since resuming it rewrites the output from them.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE manifest_runs SET finished_at = ? WHERE run_id = ?",
+                (datetime.now().isoformat(timespec="seconds"), run_id)
+            )
+            cursor = self._conn.execute(
+                "UPDATE manifest_searches SET jobs = NULL WHERE run_id = ? AND jobs IS NOT NULL "
+                "AND NOT EXISTS (SELECT 1 FROM manifest_searches WHERE run_id = ? AND status != 'done')",
+                (run_id, run_id)
+            )
+        if cursor.rowcount:
+            self.logger.debug(f"Dropped the job batches of finished run {run_id}")
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,171 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500)
+BYTES_BUCKETS = (1024, 10 * 1024, 50 * 1024, 100 * 1024, 250 * 1024, 500 * 1024, 1024 * 1024, 5 * 1024 * 1024)
+
+PROMETHEUS_PREFIX = "jobscraper_"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, data):
+        """Adds a histogram exported with to_dict() (e.g. by another process) into this one"""
+        previous = 0
+        for i, cumulative in enumerate(data["buckets"].values()):
+            self.counts[i] += cumulative - previous
+            previous = cumulative
+        self.count += data["count"]
+        self.sum += data["sum"]
+        for value in (data["min"], data["max"]):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self):
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count, "sum": self.sum, "min": self.min, "max": self.max,
+            "mean": self.sum / self.count if self.count else None, "buckets": buckets
+        }
+
+
+class Metrics:
+    """
+    Thread-safe counters and histograms for one scrape run, keyed by metric
+    name and labels (scraper, location, status, ...).
+
+    Exported at the end of a run as JSON and in the Prometheus text format
+    (e.g. for node_exporter's textfile collector).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+    def increment(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observes the duration of the block in seconds, even if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def total(self, name, **labels):
+        """Sum of a counter (or histogram sum) over every label set matching `labels`"""
+        wanted = set(self._key(name, labels)[1])
+        with self._lock:
+            total = sum(v for (n, l), v in self._counters.items() if n == name and wanted <= set(l))
+            total += sum(h.sum for (n, l), h in self._histograms.items() if n == name and wanted <= set(l))
+        return total
+
+    def to_dict(self):
+        with self._lock:
+            counters, histograms = {}, {}
+            for (name, labels), value in sorted(self._counters.items()):
+                counters.setdefault(name, []).append({"labels": dict(labels), "value": value})
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                histograms.setdefault(name, []).append(dict(labels=dict(labels), **histogram.to_dict()))
+        return {"counters": counters, "histograms": histograms}
+
+    def merge(self, data):
+        """Adds metrics exported with to_dict() (e.g. by a worker process) into this registry"""
+        with self._lock:
+            for name, series in data["counters"].items():
+                for s in series:
+                    key = self._key(name, s["labels"])
+                    self._counters[key] = self._counters.get(key, 0) + s["value"]
+            for name, series in data["histograms"].items():
+                for s in series:
+                    key = self._key(name, s["labels"])
+                    histogram = self._histograms.get(key)
+                    if histogram is None:
+                        bounds = [float(b) for b in s["buckets"] if b != "+Inf"]
+                        histogram = self._histograms[key] = Histogram(bounds)
+                    histogram.merge(s)
+
+    def write_json(self, path, **extra):
+        with open(path, "w") as f:
+            json.dump(dict(extra, **self.to_dict()), f, indent=1)
+
+    def to_prometheus(self):
+        lines = []
+        data = self.to_dict()
+        for name, series in data["counters"].items():
+            metric = PROMETHEUS_PREFIX + name
+            lines.append(f"# TYPE {metric} counter")
+            for s in series:
+                lines.append(f"{metric}{_labels(s['labels'])} {s['value']}")
+        for name, series in data["histograms"].items():
+            metric = PROMETHEUS_PREFIX + name
+            lines.append(f"# TYPE {metric} histogram")
+            for s in series:
+                for bound, count in s["buckets"].items():
+                    lines.append(f"{metric}_bucket{_labels(dict(s['labels'], le=bound))} {count}")
+                lines.append(f"{metric}_sum{_labels(s['labels'])} {s['sum']}")
+                lines.append(f"{metric}_count{_labels(s['labels'])} {s['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_prometheus())
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+# Process-wide registry the scrapers, fetchers and executors report into
+METRICS = Metrics()
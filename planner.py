@@ -0,0 +1,69 @@
+import logging
+from collections import OrderedDict
+
+
+class PlannedSearch:
+    """One query actually sent to a scraper, standing in for one or more equivalent titles"""
+
+    def __init__(self, scraper, location, query, titles, days=None):
+        self.scraper = scraper
+        self.location = location
+        self.query = query
+        self.titles = titles
+        self.days = days
+
+    @property
+    def search_term(self):
+        return {
+            "title": self.query,
+            "location": self.location,
+            "days": self.days,  # Pass to scraper if it supports pre-filtering
+            "titles": self.titles
+        }
+
+
+def plan_searches(scrapers, locations, titles, limit=None, days=None):
+    """
+    Builds the list of searches to dispatch.
+
+    Locations a scraper doesn't support are dropped, and titles that share a
+    query key (e.g. 'BI developer' / 'business intelligence developer') are
+    collapsed into one query, issued with the first title in `titles`.
+    `limit` caps the number of planned searches per scraper.
+
+    Returns:
+        Tuple[List[PlannedSearch], int]: the plan and the naive search count
+    """
+    naive_count = len(scrapers) * len(locations) * len(titles)
+    plan = []
+
+    for scraper in scrapers:
+        groups = OrderedDict()
+        for title in titles:
+            groups.setdefault(scraper.query_key(title), []).append(title)
+
+        search_count = 0
+        for location in locations:
+            if not scraper.supports_location(location):
+                continue
+
+            for group in groups.values():
+                if limit and search_count >= limit:
+                    break
+                plan.append(PlannedSearch(scraper, location, group[0], group, days))
+                search_count += 1
+
+    return plan, naive_count
+
+
+def log_plan(plan, naive_count, logger=None):
+    """Reports planned vs naive search counts per scraper"""
+    logger = logger or logging.getLogger("Planner")
+    per_scraper = OrderedDict()
+    for search in plan:
+        name = search.scraper.__class__.__name__
+        per_scraper[name] = per_scraper.get(name, 0) + 1
+
+    logger.info(f"Planned searches: {len(plan)} (naive: {naive_count}, saved: {naive_count - len(plan)})")
+    for name, count in per_scraper.items():
+        logger.info(f"  {name}: {count}")
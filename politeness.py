@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from config import RANDOM_DELAY_RANGE, HOST_BURST, HOST_DELAY_RANGES, MAX_BACKOFF_FACTOR, BACKOFF_STATUSES
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or an HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostBucket:
+    """
+    Token bucket for one host. Each request costs a random delay drawn from
+    `delay_range` worth of tokens, so requests are spaced like the old
+    random_sleep() calls, and up to `burst` requests can go out back to back
+    after an idle period. `penalty` stretches the delays after the host
+    pushes back (429/503) and relaxes again as requests succeed.
+    """
+
+    def __init__(self, delay_range, burst, now=None):
+        self.delay_range = delay_range
+        self.mean_delay = sum(delay_range) / 2
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic() if now is None else now
+        self.penalty = 1.0
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        rate = 1 / (self.mean_delay * self.penalty)
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until a request may go out"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.mean_delay * self.penalty
+
+    def take(self):
+        self.tokens -= random.uniform(*self.delay_range) / self.mean_delay
+
+
+class PolitenessScheduler:
+    """
+    Per-host request pacing shared by the fetchers and the search executor.
+
+    Fetchers call acquire() (or acquire_async()) before each network request,
+    which only waits on that request's own host, so work for other hosts
+    keeps going during one host's cooldown. feedback() backs a host off on
+    429/503 responses, honoring Retry-After, and eases it back to its normal
+    pace as requests succeed. The executor uses ready_in() to start searches
+    on hosts that can be hit right away first.
+    """
+
+    def __init__(self, delay_range=None, burst=None, host_delay_ranges=None, max_backoff=None):
+        self.delay_range = delay_range or RANDOM_DELAY_RANGE
+        self.burst = burst or HOST_BURST
+        self.host_delay_ranges = dict(HOST_DELAY_RANGES)
+        if host_delay_ranges:
+            self.host_delay_ranges.update(host_delay_ranges)
+        self.max_backoff = max_backoff or MAX_BACKOFF_FACTOR
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # Time base of the buckets (subclasses sharing buckets across processes use wall time)
+        self.clock = time.monotonic
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _new_bucket(self, host):
+        return HostBucket(self.host_delay_ranges.get(host, self.delay_range), self.burst, self.clock())
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = self._new_bucket(host)
+        return bucket
+
+    @contextmanager
+    def _host(self, host):
+        """A host's bucket, held exclusively while it's read and updated"""
+        with self._lock:
+            yield self._bucket(host)
+
+    def ready_in(self, host):
+        """Seconds until `host` can take another request (0 if it can right now)"""
+        with self._host(host) as bucket:
+            return bucket.wait_time(self.clock())
+
+    def _try_acquire(self, host):
+        with self._host(host) as bucket:
+            wait = bucket.wait_time(self.clock())
+            if wait <= 0:
+                bucket.take()
+            return wait
+
+    def acquire(self, host):
+        """Blocks until a request to `host` is allowed. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(host)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, host):
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(host)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def feedback(self, host, status_code, retry_after=None):
+        """Adjusts a host's pace after a response"""
+        with self._host(host) as bucket:
+            if status_code in BACKOFF_STATUSES:
+                bucket.penalty = min(bucket.penalty * 2, self.max_backoff)
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = bucket.mean_delay * bucket.penalty
+                bucket.blocked_until = max(bucket.blocked_until, self.clock() + delay)
+                bucket.tokens = min(bucket.tokens, 0.0)
+                self.logger.warning(f"{host} returned {status_code}, backing off {delay:.0f}s (pace x{bucket.penalty:g})")
+            elif status_code < 400 and bucket.penalty > 1:
+                bucket.penalty = max(1.0, bucket.penalty * 0.75)
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+def get_default_scheduler():
+    """Returns the process-wide scheduler shared by fetchers and executors that aren't given one"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = PolitenessScheduler()
+        return _default_scheduler
@@ -0,0 +1,80 @@
+import sys
+import pandas as pd
+from config import CSV_COLUMNS, CATEGORICAL_COLUMNS
+
+
+def intern_value(value):
+    """Shared copy of a repetitive string (company, location, ...), so equal values don't each take memory"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class JobRecord:
+    """
+    One job with the CSV_COLUMNS fields, kept in __slots__ instead of a dict.
+
+    company, location, posted_date and source repeat across thousands of
+    jobs, so they're interned and every record shares one copy of each
+    distinct value. job["link"] and job.get() work as on the scrapers'
+    dicts, so code that only reads jobs can take either.
+
+    Meant for jobs held in memory for a whole scrape (the Streamlit
+    ScrapeJob). The CLI pipeline streams one search's batch at a time
+    through the manifest and sinks and never holds a run, so it keeps the
+    scrapers' dicts (their repetitive fields are interned too, see
+    BaseScraper._format_job); records also have no slot for fields added
+    on the way, like the enricher's description.
+    """
+
+    __slots__ = tuple(CSV_COLUMNS)
+
+    def __init__(self, title, company, location, posted_date, link, source):
+        self.title = title
+        self.company = intern_value(company)
+        self.location = intern_value(location)
+        self.posted_date = intern_value(posted_date)
+        self.link = link
+        self.source = intern_value(source)
+
+    @classmethod
+    def from_dict(cls, job):
+        return cls(*(job.get(column) for column in CSV_COLUMNS))
+
+    def to_dict(self):
+        return {column: getattr(self, column) for column in CSV_COLUMNS}
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        if not isinstance(other, JobRecord):
+            return NotImplemented
+        return all(getattr(self, column) == getattr(other, column) for column in CSV_COLUMNS)
+
+    def __repr__(self):
+        return f"JobRecord({', '.join(f'{column}={getattr(self, column)!r}' for column in CSV_COLUMNS)})"
+
+
+def categorize(df, columns=None):
+    """Converts the low-cardinality columns present in `df` to categoricals, in place"""
+    for column in columns or CATEGORICAL_COLUMNS:
+        if column in df.columns and df[column].dtype == object:
+            df[column] = df[column].astype("category")
+    return df
+
+
+def jobs_frame(jobs, columns=None):
+    """
+    DataFrame of jobs (dicts or JobRecords), built column by column with
+    categorical dtypes for CATEGORICAL_COLUMNS.
+    """
+    columns = columns or CSV_COLUMNS
+    return categorize(pd.DataFrame({column: [job.get(column) for job in jobs] for column in columns}, columns=columns))
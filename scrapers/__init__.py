@@ -1 +1,14 @@
 # Init package
+
+
+def build_scrapers(fetcher=None, cache=None, linkedin_backend=None, scheduler=None):
+    """The scrapers a run uses, in planning order (also rebuilt by work queue workers)"""
+    from .brightermonday import BrighterMondayScraper
+    from .myjobmag import MyJobMagScraper
+    from .linkedin_guest import create_linkedin_scraper
+
+    return [
+        BrighterMondayScraper(fetcher=fetcher),
+        MyJobMagScraper(fetcher=fetcher),
+        create_linkedin_scraper(cache=cache, fetcher=fetcher, backend=linkedin_backend, scheduler=scheduler)
+    ]
@@ -1,11 +1,24 @@
 from abc import ABC, abstractmethod
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Set
+from urllib.parse import urlparse
+from config import MAX_PAGES_PER_QUERY
+from fetch import get_default_fetcher, FetchError
+from metrics import METRICS
+from records import intern_value
+from .parsing import make_soup
+from utils import get_random_headers, canonical_title, normalize_url, parse_relative_date, is_within_days
+
+# Placeholder dates that carry no information for early stopping
+UNDATED = {"Recent", "N/A", "", None}
+
 
 class BaseScraper(ABC):
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.results: List[Dict] = []
+        # Normalized links already in the job store (incremental mode), see reached_known()
+        self.known_links: Optional[Set[str]] = None
 
     @abstractmethod
     def scrape(self, search_term: Dict) -> List[Dict]:
@@ -20,13 +33,178 @@ class BaseScraper(ABC):
         """
         pass
 
+    def supports_location(self, location: str) -> bool:
+        """Whether a search in this location can return results at all"""
+        return True
+
+    def query_key(self, title: str) -> str:
+        """Key under which equivalent titles collapse into a single query"""
+        return canonical_title(title)
+
+    def reached_known(self, jobs: List[Dict]) -> bool:
+        """
+        Whether a page of results runs into listings stored on an earlier run.
+        Results are listed newest first, so paging can stop there in incremental mode.
+        """
+        if not self.known_links:
+            return False
+        return any(normalize_url(job.get("link")) in self.known_links for job in jobs)
+
+    def should_stop_paging(self, page_jobs: List[Dict], search_term: Dict) -> bool:
+        """
+        Whether to stop after a results page: it was empty (or only repeated
+        earlier pages), it reached already-known jobs, or every dated listing
+        on it is older than the search's `days` cutoff.
+        """
+        if not page_jobs or self.reached_known(page_jobs):
+            return True
+
+        days = search_term.get("days")
+        if not days:
+            return False
+
+        dated = [job["posted_date"] for job in page_jobs if job.get("posted_date") not in UNDATED]
+        return bool(dated) and not any(is_within_days(parse_relative_date(date), days) for date in dated)
+
+    def _new_jobs(self, page_jobs: List[Dict], seen_links: Set[str]) -> List[Dict]:
+        """Drops jobs already returned by an earlier page of the same search"""
+        new_jobs = []
+        for job in page_jobs:
+            if job["link"] not in seen_links:
+                seen_links.add(job["link"])
+                new_jobs.append(job)
+        return new_jobs
+
+    def close(self):
+        """Releases any long-lived resources (browsers, sessions) held by the scraper"""
+        pass
+
+    def host_for(self, search_term: Dict) -> str:
+        """Returns the host a search will hit, used to apply per-host concurrency limits"""
+        return self.__class__.__name__
+
+    def _labels(self, search_term: Dict) -> Dict:
+        """Metric labels for a search (see metrics.METRICS)"""
+        return {"scraper": self.__class__.__name__, "location": search_term.get("location")}
+
     def _format_job(self, title, company, location, date, link, source):
-        """Standardizes job data structure"""
+        """Standardizes job data structure (repetitive fields are interned, see records.py)"""
         return {
             "title": title.strip() if title else "N/A",
-            "company": company.strip() if company else "N/A",
-            "location": location.strip() if location else "N/A",
-            "posted_date": date.strip() if date else "N/A",
+            "company": intern_value(company.strip()) if company else "N/A",
+            "location": intern_value(location.strip()) if location else "N/A",
+            "posted_date": intern_value(date.strip()) if date else "N/A",
             "link": link.strip() if link else "N/A",
             "source": source
         }
+
+
+class HttpScraper(BaseScraper):
+    """
+    Base for scrapers that fetch plain HTML search pages.
+
+    Subclasses implement build_search_url() and parse(); fetching goes through
+    a shared Fetcher (or an AsyncFetcher in scrape_async) which can be
+    injected to point the scraper at a local stand-in server, and which paces
+    requests per host (see politeness.py). Pages are parsed with the
+    HTML_PARSER backend, limited to `parse_only` when set.
+    """
+
+    source = None
+    default_domains: Dict[str, str] = {}
+    # SoupStrainer for the part of the page parse() reads (None parses everything)
+    parse_only = None
+
+    def __init__(self, fetcher=None, domains=None, max_pages=None, parser=None, strain=True):
+        super().__init__()
+        self.fetcher = fetcher or get_default_fetcher()
+        self.domains = dict(domains or self.default_domains)
+        self.max_pages = max_pages or MAX_PAGES_PER_QUERY
+        self.parser = parser
+        self.strain = strain
+
+    def _soup(self, html):
+        return make_soup(html, self.parser, self.parse_only if self.strain else None)
+
+    def supports_location(self, location: str) -> bool:
+        return location in self.domains
+
+    def host_for(self, search_term: Dict) -> str:
+        base_url = self.domains.get(search_term.get("location"))
+        return urlparse(base_url).netloc if base_url else super().host_for(search_term)
+
+    def build_search_url(self, search_term: Dict, page: int = 1) -> Optional[str]:
+        """Returns the URL of a search results page, or None if the location isn't supported"""
+        raise NotImplementedError
+
+    def parse(self, html: str, search_term: Dict) -> List[Dict]:
+        """Extracts jobs from a search results page"""
+        raise NotImplementedError
+
+    def scrape(self, search_term):
+        if not self.build_search_url(search_term):
+            self.logger.debug(f"{self.source} does not support location: {search_term.get('location')}")
+            return []
+
+        jobs = []
+        seen_links = set()
+        for page in range(1, self.max_pages + 1):
+            search_url = self.build_search_url(search_term, page)
+            self.logger.info(f"Scraping {search_url}")
+            try:
+                response = self.fetcher.get(search_url, headers=get_random_headers(), source=self.source)
+                if response.status_code != 200:
+                    raise FetchError(f"Status {response.status_code}", response.status_code)
+
+                with METRICS.timer("parse_seconds", **self._labels(search_term)):
+                    page_jobs = self._new_jobs(self.parse(response.text, search_term), seen_links)
+                jobs.extend(page_jobs)
+            except FetchError as e:
+                self.logger.error(f"Failed to fetch {search_url}: {e}")
+                # The site itself failed: let the executor count it against the host,
+                # unless earlier pages already got us something
+                if page == 1:
+                    raise
+                break
+            except Exception as e:
+                self.logger.error(f"Error scraping {search_url}: {e}")
+                break
+
+            if self.should_stop_paging(page_jobs, search_term):
+                break
+
+        return jobs
+
+    async def scrape_async(self, search_term, client):
+        """Same as scrape(), fetching through an AsyncFetcher"""
+        if not self.build_search_url(search_term):
+            return []
+
+        jobs = []
+        seen_links = set()
+        for page in range(1, self.max_pages + 1):
+            search_url = self.build_search_url(search_term, page)
+            self.logger.info(f"Scraping {search_url}")
+            try:
+                response = await client.get(search_url, headers=get_random_headers(), source=self.source)
+                if response.status_code != 200:
+                    raise FetchError(f"Status {response.status_code}", response.status_code)
+
+                with METRICS.timer("parse_seconds", **self._labels(search_term)):
+                    page_jobs = self._new_jobs(self.parse(response.text, search_term), seen_links)
+                jobs.extend(page_jobs)
+            except FetchError as e:
+                self.logger.error(f"Failed to fetch {search_url}: {e}")
+                # The site itself failed: let the executor count it against the host,
+                # unless earlier pages already got us something
+                if page == 1:
+                    raise
+                break
+            except Exception as e:
+                self.logger.error(f"Error scraping {search_url}: {e}")
+                break
+
+            if self.should_stop_paging(page_jobs, search_term):
+                break
+
+        return jobs
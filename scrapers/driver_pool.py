@@ -0,0 +1,113 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from metrics import METRICS
+
+
+class DriverPool:
+    """
+    Bounded pool of long-lived WebDriver instances.
+
+    Drivers are created lazily (up to `size`), prepared once (e.g. logged in)
+    and handed out with checkout(). A driver is recycled after `max_uses`
+    checkouts, when it fails a health check, or when it is marked broken.
+    """
+
+    def __init__(self, factory, size=1, max_uses=25, prepare=None):
+        self.factory = factory
+        self.prepare = prepare
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._uses = {}
+        self._broken = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _create(self):
+        with METRICS.timer("driver_start_seconds"):
+            driver = self.factory()
+        try:
+            if self.prepare:
+                with METRICS.timer("driver_prepare_seconds"):
+                    self.prepare(driver)
+        except Exception:
+            self._quit(driver)
+            raise
+        with self._lock:
+            self._uses[id(driver)] = 0
+        self.logger.info(f"Started new driver ({len(self._uses)} live)")
+        return driver
+
+    def _quit(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self._broken.discard(id(driver))
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _acquire(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return self._create()
+
+            if self._is_healthy(driver):
+                return driver
+            self.logger.warning("Discarding unresponsive driver")
+            self._quit(driver)
+
+    def _release(self, driver):
+        with self._lock:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            worn_out = self._uses[id(driver)] >= self.max_uses
+            broken = id(driver) in self._broken
+
+        if self._closed or worn_out or broken:
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+
+    def mark_broken(self, driver):
+        """Flags a checked-out driver so it is quit instead of returned to the pool"""
+        with self._lock:
+            self._broken.add(id(driver))
+
+    @contextmanager
+    def checkout(self):
+        """Borrows a driver, blocking while all `size` drivers are in use"""
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+
+        with self._slots:
+            driver = self._acquire()
+            try:
+                # Errors don't retire the driver by themselves: callers mark_broken() when
+                # the browser is at fault, and a dead one fails the health check anyway
+                yield driver
+            finally:
+                self._release(driver)
+
+    def close(self):
+        """Quits all idle drivers; drivers still checked out are quit on return"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
@@ -1,9 +1,18 @@
 import logging
 import os
-import time
-import random
+from contextlib import ExitStack
+from urllib.parse import urlparse, urljoin
 from .base import BaseScraper
+from .driver_pool import DriverPool
+from .parsing import make_soup
+from config import (LINKEDIN_POOL_SIZE, LINKEDIN_DRIVER_MAX_USES, LINKEDIN_EXTRACTION, MAX_PAGES_PER_QUERY,
+                    LINKEDIN_LEAN_PROFILE, LINKEDIN_BLOCKED_URLS, LINKEDIN_READY_TIMEOUT, LINKEDIN_SCROLL_TIMEOUT)
+from cache import CacheMissError
+from fetch import FetchError
+from metrics import METRICS
+from politeness import get_default_scheduler
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -14,11 +23,88 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+RESULTS_PER_PAGE = 25
+
+# Card and field selectors, tried in order (shared by all extraction modes)
+AUTH_CARD_SELECTORS = [".jobs-search-results__list-item"]
+PUBLIC_CARD_SELECTORS = ["div.base-search-card", "div.job-search-card", "li.jobs-search__results-list__item"]
+TITLE_SELECTORS = [".base-search-card__title", "h3.base-search-card__title", "a.job-card-list__title", "h3"]
+COMPANY_SELECTORS = [".base-search-card__subtitle", "h4.base-search-card__subtitle", "h4", "a.job-card-container__company-name"]
+LOCATION_SELECTORS = [".job-search-card__location", ".job-card-container__metadata-item"]
+
+# What LinkedIn shows instead of cards: an empty search, or a sign-in wall
+NO_RESULTS_SELECTORS = [".jobs-search-no-results-banner", ".jobs-search-two-pane__no-results-banner--expand",
+                        ".jobs-search-no-results", ".no-results"]
+LOGIN_WALL_SELECTORS = [".authwall-join-form", "form.join-form", "form.login__form", "#session_key"]
+
+# Extracts all cards in one round trip; mirrors the per-element fallbacks
+EXTRACT_CARDS_JS = """
+const cardSelectors = arguments[0];
+const fields = arguments[1];
+
+let cards = [];
+for (const selector of cardSelectors) {
+    cards = document.querySelectorAll(selector);
+    if (cards.length) break;
+}
+
+const firstText = (card, selectors) => {
+    for (const selector of selectors) {
+        const elem = card.querySelector(selector);
+        const text = elem ? (elem.innerText || "").trim() : "";
+        if (text) return text;
+    }
+    return null;
+};
+
+return Array.from(cards).map(card => {
+    const link = card.querySelector("a");
+    const time = card.querySelector("time");
+    return {
+        title: firstText(card, fields.title),
+        company: firstText(card, fields.company),
+        location: firstText(card, fields.location),
+        link: link ? link.href : null,
+        date: time ? (time.getAttribute("datetime") || time.innerText) : null
+    };
+});
+"""
+
+def posted_within_param(days):
+    """
+    Builds the 'posted within' filter. f_TPR takes seconds: r604800 is 1 week,
+    r2592000 roughly 30 days, and other values (10 days = r864000) work too.
+    Dates are still filtered post-scrape.
+    """
+    if not days:
+        return ""
+    seconds = int(days) * 24 * 3600
+    return f"&f_TPR=r{seconds}"
+
 class LinkedinScraper(BaseScraper):
-    def __init__(self):
+    source = "LinkedIn"
+
+    def __init__(self, pool_size=None, max_uses=None, cache=None, max_pages=None, extraction=None, scheduler=None):
         super().__init__()
         self.cookie = os.getenv("LINKEDIN_LI_AT")
         self.base_url = "https://www.linkedin.com"
+        # Optional ResponseCache for rendered search pages
+        self.cache = cache
+        self.max_pages = max_pages or MAX_PAGES_PER_QUERY
+        # "script" (one execute_script call), "page_source" (parse HTML once) or "elements"
+        self.extraction = extraction or LINKEDIN_EXTRACTION
+        # Page loads are paced per host like the HTTP scrapers' requests
+        self.scheduler = scheduler or get_default_scheduler()
+        # Drivers are started lazily and reused (already logged in) across searches
+        self.pool = DriverPool(
+            self._setup_driver,
+            size=pool_size or LINKEDIN_POOL_SIZE,
+            max_uses=max_uses or LINKEDIN_DRIVER_MAX_USES,
+            prepare=self._login
+        )
+
+    def host_for(self, search_term):
+        return urlparse(self.base_url).netloc
 
     def _setup_driver(self):
         options = Options()
@@ -31,119 +117,310 @@ class LinkedinScraper(BaseScraper):
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
         
+        if LINKEDIN_LEAN_PROFILE:
+            # We only read the job cards: get() returns at DOMContentLoaded and images,
+            # fonts and media are never downloaded
+            options.page_load_strategy = "eager"
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_argument("--mute-audio")
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        
         # Selenium 4.6+ has built-in Selenium Manager, so we don't need webdriver_manager
         driver = webdriver.Chrome(options=options)
+        
+        if LINKEDIN_LEAN_PROFILE:
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LINKEDIN_BLOCKED_URLS})
+            except Exception as e:
+                self.logger.warning(f"Could not block resources, loading full pages: {e}")
         return driver
 
-    def scrape(self, search_term):
+    def _login(self, driver):
+        """Logs a freshly started driver in if a cookie is present"""
+        if self.cookie:
+            self.logger.info("Using LinkedIn cookie for authentication...")
+            driver.get(self.base_url)
+            driver.add_cookie({
+                'name': 'li_at',
+                'value': self.cookie,
+                'domain': '.linkedin.com'
+            })
+            driver.refresh()
+            self._wait_until_ready(driver)
+
+    def close(self):
+        self.pool.close()
+
+    def _search_url(self, search_term, page=1):
         title = search_term.get("title")
         location = search_term.get("location")
         days = search_term.get("days")
         
-        driver = self._setup_driver()
+        # Construct Search URL
+        time_param = posted_within_param(days)
+
+        # Result pages are offset by 25 cards
+        start_param = f"&start={(page - 1) * RESULTS_PER_PAGE}" if page > 1 else ""
+
+        return f"{self.base_url}/jobs/search/?keywords={title}&location={location}{time_param}{start_param}"
+
+    def _cached_page(self, search_url, search_term):
+        """Parses a page from the cache if present, else returns None"""
+        if not self.cache:
+            return None
+        entry, html, is_fresh = self.cache.lookup(search_url, self.source)
+        if entry and is_fresh:
+            self.logger.info(f"Using cached page for {search_url}")
+            METRICS.increment("cache_hits_total", source=self.source)
+            with METRICS.timer("parse_seconds", **self._labels(search_term)):
+                return self.parse(html, search_term)
+        if self.cache.offline:
+            raise CacheMissError(f"{search_url} is not in the cache")
+        return None
+
+    def scrape(self, search_term):
         jobs = []
+        seen_links = set()
+        
+        with ExitStack() as stack:
+            # Only check a driver out once a page actually needs Chrome
+            driver = None
+            for page in range(1, self.max_pages + 1):
+                search_url = self._search_url(search_term, page)
+                
+                # Replay the rendered page from the cache if we have it, skipping Chrome entirely
+                page_jobs = self._cached_page(search_url, search_term)
+                if page_jobs is None:
+                    if driver is None:
+                        driver = stack.enter_context(self.pool.checkout())
+                    try:
+                        page_jobs = self._scrape_with(driver, search_url, search_term)
+                    except FetchError:
+                        # Same as the HTTP scrapers: only a failure with nothing to show counts against LinkedIn
+                        if page == 1:
+                            raise
+                        break
+                
+                page_jobs = self._new_jobs(page_jobs, seen_links)
+                jobs.extend(page_jobs)
+                if self.should_stop_paging(page_jobs, search_term):
+                    break
+        
+        return jobs
+
+    def _scrape_with(self, driver, search_url, search_term):
+        location = search_term.get("location")
+        self.logger.info(f"Scraping {search_url}")
+        labels = self._labels(search_term)
+        host = self.host_for(search_term)
         
         try:
-            # Login if cookie present
-            if self.cookie:
-                self.logger.info("Using LinkedIn cookie for authentication...")
-                driver.get(self.base_url)
-                driver.add_cookie({
-                    'name': 'li_at',
-                    'value': self.cookie,
-                    'domain': '.linkedin.com'
-                })
-                driver.refresh()
-                time.sleep(3)
-            
-            # Construct Search URL
-            # f_TPR=r2592000 roughly 30 days, r604800 is 1 week. 
-            # If days is 10, closest valid param for public search is usually r2592000 (month) or we filter post-scrape.
-            # But we can try passing seconds: 10 * 24 * 3600 = 864000
-            
-            time_param = ""
-            if days:
-                seconds = int(days) * 24 * 3600
-                time_param = f"&f_TPR=r{seconds}"
-
-            search_url = f"{self.base_url}/jobs/search/?keywords={title}&location={location}{time_param}"
-            self.logger.info(f"Scraping {search_url}")
-            
-            driver.get(search_url)
-            time.sleep(random.uniform(3, 6)) # Wait for load
-            
-            # Scroll to load more
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(1)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            METRICS.observe("throttle_seconds", self.scheduler.acquire(host), host=host)
+            with METRICS.timer("page_load_seconds", **labels):
+                driver.get(search_url)
+            # Wait for the cards (or LinkedIn saying there are none) rather than a fixed time
+            with METRICS.timer("sleep_seconds", **labels):
+                state = self._wait_for_results(driver)
+                if state == "cards":
+                    self._load_more(driver)
+        except WebDriverException as e:
+            # Navigation failed (crashed browser, timeout, network): the site or
+            # browser is at fault, so count it against LinkedIn and drop the driver
+            self.logger.error(f"LinkedIn page load error: {e}")
+            self.pool.mark_broken(driver)
+            raise FetchError(f"{search_url}: {e}") from e
+        
+        if state == "empty":
+            self.logger.info(f"No results for {search_url}")
+        elif state == "login_wall":
+            self.logger.warning(f"LinkedIn showed a login wall for {search_url}")
+        elif state is None:
+            self.logger.info(f"No job cards on {search_url} after {LINKEDIN_READY_TIMEOUT}s")
+        
+        # Extraction errors are our bugs, not LinkedIn's: they propagate as they are
+        page_source = None
+        if self.cache or self.extraction == "page_source":
+            page_source = driver.page_source
+        if self.cache:
+            self.cache.store(search_url, page_source, source=self.source)
 
-            # Parse Results
-            if self.cookie:
-                job_cards = driver.find_elements(By.CLASS_NAME, "jobs-search-results__list-item")
+        # Parse Results
+        with METRICS.timer("parse_seconds", **labels):
+            if self.extraction == "script":
+                jobs = self._extract_with_script(driver, location)
+            elif self.extraction == "page_source":
+                jobs = self.parse(page_source, search_term)
             else:
-                # Public search selectors
-                job_cards = driver.find_elements(By.CSS_SELECTOR, "div.base-search-card") or \
-                            driver.find_elements(By.CSS_SELECTOR, "div.job-search-card") or \
-                            driver.find_elements(By.CSS_SELECTOR, "li.jobs-search__results-list__item")
-
-            self.logger.info(f"Found {len(job_cards)} potential job cards")
-            
-            for card in job_cards[:20]:
-                try:
-                    # Helper to get text safe
-                    def get_text(elem, selector):
+                jobs = self._extract_with_elements(driver, location)
+        
+        self.logger.info(f"Found {len(jobs)} potential job cards")
+        return jobs
+
+    def _card_selectors(self):
+        return AUTH_CARD_SELECTORS if self.cookie else PUBLIC_CARD_SELECTORS
+
+    def _wait_until_ready(self, driver):
+        """Waits for the DOM to be parsed (all an eager page load guarantees anyway)"""
+        try:
+            WebDriverWait(driver, LINKEDIN_READY_TIMEOUT).until(
+                lambda d: d.execute_script("return document.readyState") != "loading"
+            )
+        except TimeoutException:
+            self.logger.warning("LinkedIn page still loading after login")
+
+    def _page_state(self, driver):
+        """"cards", "empty" or "login_wall" depending on what the page shows, False while it shows none"""
+        for state, selectors in (("cards", self._card_selectors()),
+                                 ("empty", NO_RESULTS_SELECTORS),
+                                 ("login_wall", LOGIN_WALL_SELECTORS)):
+            if driver.find_elements(By.CSS_SELECTOR, ", ".join(selectors)):
+                return state
+        return False
+
+    def _wait_for_results(self, driver):
+        """
+        Waits until the page shows job cards, an empty-results banner or a
+        login wall and returns which (see _page_state), or None on timeout.
+        """
+        try:
+            return WebDriverWait(driver, LINKEDIN_READY_TIMEOUT, poll_frequency=0.25).until(self._page_state)
+        except TimeoutException:
+            return None
+
+    def _load_more(self, driver):
+        """
+        Scrolls down while the page holds less than a full page of cards,
+        waiting for lazy-loaded ones to appear instead of sleeping.
+        """
+        selector = ", ".join(self._card_selectors())
+        count_cards = lambda d: d.execute_script("return document.querySelectorAll(arguments[0]).length", selector)
+
+        cards = count_cards(driver)
+        while cards < RESULTS_PER_PAGE:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            try:
+                WebDriverWait(driver, LINKEDIN_SCROLL_TIMEOUT, poll_frequency=0.25).until(
+                    lambda d: count_cards(d) > cards
+                )
+            except TimeoutException:
+                # Nothing more to load
+                break
+            cards = count_cards(driver)
+
+    def _extract_with_script(self, driver, location):
+        """Pulls every card's fields in a single execute_script round trip"""
+        cards = driver.execute_script(EXTRACT_CARDS_JS, self._card_selectors(), {
+            "title": TITLE_SELECTORS,
+            "company": COMPANY_SELECTORS,
+            "location": LOCATION_SELECTORS
+        }) or []
+        
+        return [
+            self._format_job(
+                title=card.get("title"),
+                company=card.get("company"),
+                location=card.get("location") or location,
+                date=card.get("date") or "Recent",
+                link=card.get("link") or "N/A",
+                source=self.source
+            )
+            for card in cards
+        ]
+
+    def _extract_with_elements(self, driver, location):
+        """Original per-element extraction (one WebDriver call per field)"""
+        job_cards = []
+        for selector in self._card_selectors():
+            job_cards = driver.find_elements(By.CSS_SELECTOR, selector)
+            if job_cards:
+                break
+        
+        jobs = []
+        for card in job_cards:
+            try:
+                # Helper to get text safe
+                def get_text(selectors):
+                    for selector in selectors:
                         try:
-                            return elem.find_element(By.CSS_SELECTOR, selector).get_attribute("innerText").strip()
+                            text = card.find_element(By.CSS_SELECTOR, selector).get_attribute("innerText").strip()
                         except:
-                            return None
-
-                    # Extract title
-                    job_title = get_text(card, ".base-search-card__title") or \
-                                get_text(card, "h3.base-search-card__title") or \
-                                get_text(card, "a.job-card-list__title") or \
-                                get_text(card, "h3")
-
-                    # Company
-                    company = get_text(card, ".base-search-card__subtitle") or \
-                              get_text(card, "h4.base-search-card__subtitle") or \
-                              get_text(card, "h4") or \
-                              get_text(card, "a.job-card-container__company-name")
-
-                    # Location
-                    job_loc = get_text(card, ".job-search-card__location") or \
-                              get_text(card, ".job-card-container__metadata-item") or \
-                              location
-                    
-                    # Link
-                    try:
-                        link_elem = card.find_element(By.TAG_NAME, "a")
-                        link = link_elem.get_attribute("href")
-                    except:
-                        link = "N/A"
-                        
-                    # Date
-                    try:
-                        date_elem = card.find_element(By.CSS_SELECTOR, "time")
-                        date = date_elem.get_attribute("datetime") or date_elem.get_attribute("innerText")
-                    except:
-                        date = "Recent"
-
-                    jobs.append(self._format_job(
-                        title=job_title,
-                        company=company,
-                        location=job_loc,
-                        date=date,
-                        link=link,
-                        source="LinkedIn"
-                    ))
-                except Exception as e:
-                    # self.logger.debug(f"Error parsing card: {e}")
-                    continue
+                            continue
+                        if text:
+                            return text
+                    return None
+
+                # Link
+                try:
+                    link = card.find_element(By.TAG_NAME, "a").get_attribute("href")
+                except:
+                    link = "N/A"
                     
-        except Exception as e:
-            self.logger.error(f"LinkedIn scrape error: {e}")
-        finally:
-            driver.quit()
-            
+                # Date
+                try:
+                    date_elem = card.find_element(By.CSS_SELECTOR, "time")
+                    date = date_elem.get_attribute("datetime") or date_elem.get_attribute("innerText")
+                except:
+                    date = "Recent"
+
+                jobs.append(self._format_job(
+                    title=get_text(TITLE_SELECTORS),
+                    company=get_text(COMPANY_SELECTORS),
+                    location=get_text(LOCATION_SELECTORS) or location,
+                    date=date,
+                    link=link,
+                    source=self.source
+                ))
+            except Exception as e:
+                # self.logger.debug(f"Error parsing card: {e}")
+                continue
+        
         return jobs
+
+    def parse(self, html, search_term):
+        """
+        Extracts job cards from a saved page source (e.g. a cached page),
+        using the same selectors as the live WebDriver path.
+        """
+        return parse_job_cards(self, html, search_term.get("location"), self._card_selectors())
+
+
+def parse_job_cards(scraper, html, location, card_selectors, parser=None):
+    """Parses LinkedIn job cards out of page HTML (full pages or guest API fragments)"""
+    soup = make_soup(html, parser)
+    
+    job_cards = []
+    for selector in card_selectors:
+        job_cards = soup.select(selector)
+        if job_cards:
+            break
+    
+    jobs = []
+    for card in job_cards:
+        def get_text(selectors):
+            for selector in selectors:
+                elem = card.select_one(selector)
+                text = elem.get_text(" ", strip=True) if elem else None
+                if text:
+                    return text
+            return None
+        
+        link_elem = card.find("a")
+        link = urljoin(scraper.base_url, link_elem["href"]) if link_elem and link_elem.get("href") else "N/A"
+        
+        date_elem = card.find("time")
+        if date_elem:
+            date = date_elem.get("datetime") or date_elem.get_text(strip=True)
+        else:
+            date = "Recent"
+        
+        jobs.append(scraper._format_job(
+            title=get_text(TITLE_SELECTORS),
+            company=get_text(COMPANY_SELECTORS),
+            location=get_text(LOCATION_SELECTORS) or location,
+            date=date,
+            link=link,
+            source=scraper.source
+        ))
+    
+    return jobs
@@ -0,0 +1,55 @@
+import os
+from urllib.parse import urlparse
+from .base import HttpScraper
+from .linkedin import LinkedinScraper, PUBLIC_CARD_SELECTORS, parse_job_cards, posted_within_param
+from config import LINKEDIN_BACKEND
+
+# The guest API returns job cards in batches of this size
+GUEST_PAGE_SIZE = 10
+
+class LinkedinGuestScraper(HttpScraper):
+    """
+    Browser-free LinkedIn backend for unauthenticated searches.
+
+    Fetches the HTML fragments LinkedIn's public job search loads as you
+    scroll (jobs-guest API) over plain HTTP and parses them with the same
+    card selectors as the Selenium path.
+    """
+    source = "LinkedIn"
+
+    def __init__(self, base_url="https://www.linkedin.com", **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def supports_location(self, location):
+        return True
+
+    def host_for(self, search_term):
+        return urlparse(self.base_url).netloc
+
+    def build_search_url(self, search_term, page=1):
+        title = search_term.get("title")
+        location = search_term.get("location")
+        time_param = posted_within_param(search_term.get("days"))
+        start = (page - 1) * GUEST_PAGE_SIZE
+        return (
+            f"{self.base_url}/jobs-guest/jobs/api/seeMoreJobPostings/search"
+            f"?keywords={title}&location={location}{time_param}&start={start}"
+        )
+
+    def parse(self, html, search_term):
+        return parse_job_cards(self, html, search_term.get("location"), PUBLIC_CARD_SELECTORS, self.parser)
+
+
+def create_linkedin_scraper(cache=None, fetcher=None, backend=None, scheduler=None):
+    """
+    Returns the LinkedIn scraper for the configured backend:
+    "selenium", "http", or "auto" (http unless a LINKEDIN_LI_AT cookie is set).
+    """
+    backend = backend or LINKEDIN_BACKEND
+    if backend == "auto":
+        backend = "selenium" if os.getenv("LINKEDIN_LI_AT") else "http"
+
+    if backend == "http":
+        return LinkedinGuestScraper(fetcher=fetcher)
+    return LinkedinScraper(cache=cache, scheduler=scheduler)
@@ -1,94 +1,85 @@
-import requests
-from bs4 import BeautifulSoup
-from .base import BaseScraper
-from utils import random_sleep, get_random_headers
+from .base import HttpScraper
+from .parsing import class_strainer
 import logging
 
-class MyJobMagScraper(BaseScraper):
-    def __init__(self):
-        super().__init__()
-        self.domains = {
-            "Kenya": "https://www.myjobmag.co.ke",
-            # "Uganda": "https://ug.myjobmag.com", # Domain does not exist
-            # Add others if discovered
-        }
+def is_company_link(href):
+    return href and '/company/' in href
 
-    def scrape(self, search_term):
-        title = search_term.get("title")
-        location = search_term.get("location")
-        
-        base_url = self.domains.get(location)
+class MyJobMagScraper(HttpScraper):
+    source = "MyJobMag"
+    default_domains = {
+        "Kenya": "https://www.myjobmag.co.ke",
+        # "Uganda": "https://ug.myjobmag.com", # Domain does not exist
+        # Add others if discovered
+    }
+    parse_only = class_strainer(("ul", "class", "job-list"))
+
+    def build_search_url(self, search_term, page=1):
+        base_url = self.domains.get(search_term.get("location"))
         if not base_url:
             # MyJobMag might not have specific sites for all 12 countries
-            return []
+            return None
+        page_param = f"&currentpage={page}" if page > 1 else ""
+        return f"{base_url}/search/jobs?q={search_term.get('title')}{page_param}"
 
-        search_url = f"{base_url}/search/jobs?q={title}"
-        self.logger.info(f"Scraping {search_url}")
+    def parse(self, html, search_term):
+        location = search_term.get("location")
+        base_url = self.domains.get(location)
         
-        headers = get_random_headers()
-        try:
-            response = requests.get(search_url, headers=headers, timeout=10)
-            if response.status_code != 200:
-                self.logger.error(f"Failed to fetch {search_url}: Status {response.status_code}")
-                return []
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            jobs = []
+        soup = self._soup(html)
+        jobs = []
+        
+        # Select job list items
+        job_list = soup.find('ul', class_='job-list')
+        if not job_list:
+            return []
             
-            # Select job list items
-            job_list = soup.find('ul', class_='job-list')
-            if not job_list:
-                return []
+        items = job_list.find_all('li', class_='job-list-li')
+        
+        for item in items:
+            try:
+                h2 = item.find('h2')
+                if not h2: continue
                 
-            items = job_list.find_all('li', class_='job-list-li')
-            
-            for item in items:
-                try:
-                    h2 = item.find('h2')
-                    if not h2: continue
-                    
-                    a_tag = h2.find('a')
-                    if not a_tag: continue
-                    
-                    job_title = a_tag.get_text(strip=True)
-                    job_link =  base_url + a_tag['href'] if not a_tag['href'].startswith('http') else a_tag['href']
-                    
-                    # Company is often in a separate item or span
-                    # Inspecting typical MyJobMag structure
-                    # Usually: <li class="job-logo">...</li> <li class="job-info">...</li>
-                    # But simpler view: look for 'job-item-image' which has alt text sometimes?
-                    # Or look for listing-company
-                    
-                    # Fallback simple search in the item text
-                    # Often structure: <h2>Title</h2> <div class="job-desc">...</div>
-                    # Company name is not continually structured well in list view
-                    # We might need to visit the link or guess.
-                    # Actually, usually there is a param or checking 'li.job-logo img' alt
-                    
-                    company = "N/A"
-                    img = item.find('img')
-                    if img and img.get('alt'):
-                        company = img.get('alt')
-                    elif item.find('a', href=lambda x: x and '/company/' in x):
-                         company = item.find('a', href=lambda x: x and '/company/' in x).get_text(strip=True)
-
-                    date_elem = item.find('li', id='job-date')
-                    date = date_elem.get_text(strip=True) if date_elem else "Recent"
+                a_tag = h2.find('a')
+                if not a_tag: continue
+                
+                job_title = a_tag.get_text(strip=True)
+                job_link =  base_url + a_tag['href'] if not a_tag['href'].startswith('http') else a_tag['href']
+                
+                # Company is often in a separate item or span
+                # Inspecting typical MyJobMag structure
+                # Usually: <li class="job-logo">...</li> <li class="job-info">...</li>
+                # But simpler view: look for 'job-item-image' which has alt text sometimes?
+                # Or look for listing-company
+                
+                # Fallback simple search in the item text
+                # Often structure: <h2>Title</h2> <div class="job-desc">...</div>
+                # Company name is not continually structured well in list view
+                # We might need to visit the link or guess.
+                # Actually, usually there is a param or checking 'li.job-logo img' alt
+                
+                company = "N/A"
+                img = item.find('img')
+                if img and img.get('alt'):
+                    company = img.get('alt')
+                else:
+                    company_link = item.find('a', href=is_company_link)
+                    if company_link:
+                        company = company_link.get_text(strip=True)
 
-                    jobs.append(self._format_job(
-                        title=job_title,
-                        company=company,
-                        location=location,
-                        date=date,
-                        link=job_link,
-                        source="MyJobMag"
-                    ))
-                except Exception as e:
-                    continue
-            
-            random_sleep()
-            return jobs
+                date_elem = item.find('li', id='job-date')
+                date = date_elem.get_text(strip=True) if date_elem else "Recent"
 
-        except Exception as e:
-            self.logger.error(f"Error scraping {base_url}: {e}")
-            return []
+                jobs.append(self._format_job(
+                    title=job_title,
+                    company=company,
+                    location=location,
+                    date=date,
+                    link=job_link,
+                    source=self.source
+                ))
+            except Exception as e:
+                continue
+        
+        return jobs
@@ -0,0 +1,57 @@
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
+from config import HTML_PARSER
+
+logger = logging.getLogger("Parsing")
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+_warned = False
+
+def resolve_backend(backend=None):
+    """Returns the BeautifulSoup tree builder to use, falling back to html.parser without lxml"""
+    global _warned
+    backend = backend or HTML_PARSER
+    if backend.startswith("lxml") and not LXML_AVAILABLE:
+        if not _warned:
+            logger.warning("lxml is not installed, falling back to html.parser")
+            _warned = True
+        return "html.parser"
+    return backend
+
+
+def make_soup(html, backend=None, parse_only=None):
+    """
+    Builds a BeautifulSoup tree with the selected backend.
+
+    `parse_only` (a SoupStrainer) limits the tree to the parts of the page
+    a scraper actually reads, which skips building nodes for the rest.
+    """
+    return BeautifulSoup(html, resolve_backend(backend), parse_only=parse_only)
+
+
+def class_strainer(*targets):
+    """
+    SoupStrainer keeping tags that match any of the (name, attr, value) targets.
+    For 'class' the value only needs to be one of the tag's classes.
+    """
+    def match(name, attrs):
+        for tag, attr, value in targets:
+            if name != tag:
+                continue
+            if attr is None:
+                return True
+            found = attrs.get(attr)
+            if attr == "class" and found is not None:
+                if value in (found.split() if isinstance(found, str) else found):
+                    return True
+            elif found == value:
+                return True
+        return False
+
+    return SoupStrainer(match)
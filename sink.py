@@ -0,0 +1,213 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from config import CSV_COLUMNS
+from utils import parse_dates
+from metrics import METRICS
+
+
+class JobSink:
+    """
+    Consumes jobs as they arrive instead of buffering the whole run.
+
+    Jobs are deduped on their link with a set of 8-byte digests, optionally
+    clustered across sources by a NearDuplicateIndex (each job gets its
+    cluster's canonical_id column, and only the first job of a cluster is
+    kept unless `keep_near_duplicates`), optionally
+    completed from their detail pages (a DetailEnricher, only ever asked
+    about jobs that survived dedupe) and filtered to the last `days` days
+    before being handed to _write_rows().
+    """
+
+    preview_size = 10
+    columns = CSV_COLUMNS
+
+    def __init__(self, days=None, near_dedupe=None, enricher=None, keep_near_duplicates=False):
+        self.days = days
+        self.near_dedupe = near_dedupe
+        self.keep_near_duplicates = keep_near_duplicates
+        self.enricher = enricher
+        if near_dedupe is not None:
+            self.columns = self.columns + ["canonical_id"]
+        self.cutoff = datetime.now() - timedelta(days=days) if days else None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.received = 0
+        self.duplicates = 0
+        self.near_duplicates = 0
+        self.filtered = 0
+        self.written = 0
+        self.preview = []
+
+        self._seen = set()
+
+    def _digest(self, link):
+        return hashlib.blake2b((link or "").encode("utf-8"), digest_size=8).digest()
+
+    def write(self, jobs, search_term=None):
+        """Dedupes, filters and writes a batch of jobs. Returns how many were written."""
+        self.received += len(jobs)
+        with METRICS.timer("stage_seconds", stage="dedupe"):
+            jobs = self._dedupe(jobs)
+
+        if self.enricher and jobs:
+            with METRICS.timer("stage_seconds", stage="enrich"):
+                jobs = self.enricher.enrich(jobs)
+
+        # Unparseable dates ("Recent", "N/A") count as now, so they are kept
+        if self.cutoff and jobs:
+            with METRICS.timer("stage_seconds", stage="date_filter"):
+                recent = parse_dates([job.get("posted_date") for job in jobs]) >= self.cutoff
+                kept = [job for job, keep in zip(jobs, recent) if keep]
+            self.filtered += len(jobs) - len(kept)
+            jobs = kept
+
+        rows = [{col: job.get(col, "N/A") for col in self.columns} for job in jobs]
+        if rows:
+            with METRICS.timer("stage_seconds", stage="write", sink=self.__class__.__name__):
+                self._write_rows(rows, search_term)
+            self.preview.extend(rows[:self.preview_size - len(self.preview)])
+            self.written += len(rows)
+        return len(rows)
+
+    def _dedupe(self, jobs):
+        unique = []
+        for job in jobs:
+            digest = self._digest(job.get("link"))
+            if digest in self._seen:
+                self.duplicates += 1
+                continue
+            self._seen.add(digest)
+
+            if self.near_dedupe is not None:
+                # IDs are final for rows already written, even if a later job links two clusters
+                job["canonical_id"], is_duplicate = self.near_dedupe.add(job)
+                if is_duplicate:
+                    self.near_duplicates += 1
+                    if not self.keep_near_duplicates:
+                        continue
+            unique.append(job)
+        return unique
+
+    def _write_rows(self, rows, search_term):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def discard(self):
+        """Drops whatever was written, leaving any previous output untouched"""
+        pass
+
+    def log_summary(self, logger=None):
+        logger = logger or self.logger
+        unique = self.received - self.duplicates
+        logger.info(f"Deduplication: {self.received} -> {unique} jobs")
+        if self.near_dedupe is not None and self.keep_near_duplicates:
+            logger.info(f"Near-duplicates: {self.near_duplicates} of {unique} jobs repost an earlier one (kept, see canonical_id)")
+        elif self.near_dedupe is not None:
+            logger.info(f"Near-duplicates: {unique} -> {unique - self.near_duplicates} jobs (same posting across sources)")
+            unique -= self.near_duplicates
+        if self.days:
+            logger.info(f"Date Filter: {unique} -> {self.written} jobs (Last {self.days} days)")
+
+
+class FileSink(JobSink):
+    """
+    Streams rows to `<path>.partial`. close() prepends the summary header
+    and moves the file into place, so an interrupted run still leaves every
+    job written so far in the .partial file.
+    """
+
+    def __init__(self, path, days=None, near_dedupe=None, enricher=None, keep_near_duplicates=False):
+        super().__init__(days, near_dedupe, enricher, keep_near_duplicates)
+        self.path = path
+        self.partial_path = f"{path}.partial"
+        self._file = open(self.partial_path, "w", newline="", encoding="utf-8")
+
+    def _write_rows(self, rows, search_term):
+        for row in rows:
+            self._write_row(row)
+        self._file.flush()
+
+    def _write_row(self, row):
+        raise NotImplementedError
+
+    def _summary_line(self):
+        raise NotImplementedError
+
+    def close(self):
+        """Writes the summary header followed by the streamed rows to `path`"""
+        self._file.close()
+        with open(self.partial_path, newline="", encoding="utf-8") as body, \
+                open(self.path, "w", newline="", encoding="utf-8") as out:
+            out.write(self._summary_line())
+            shutil.copyfileobj(body, out)
+        os.remove(self.partial_path)
+
+    def discard(self):
+        self._file.close()
+        os.remove(self.partial_path)
+
+
+class CsvSink(FileSink):
+    """CSV output with the '# Total Jobs Found' header line and CSV_COLUMNS order (then canonical_id)"""
+
+    def __init__(self, path, days=None, near_dedupe=None, enricher=None, keep_near_duplicates=False):
+        super().__init__(path, days, near_dedupe, enricher, keep_near_duplicates)
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, lineterminator="\n")
+        self._writer.writeheader()
+
+    def _write_row(self, row):
+        self._writer.writerow(row)
+
+    def _summary_line(self):
+        return f"# Total Jobs Found: {self.written}, Scrape Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+
+
+class JsonlSink(FileSink):
+    """JSON Lines output; the first line is a summary object, then one job per line (with its description if enriched)"""
+
+    def __init__(self, path, days=None, near_dedupe=None, enricher=None, keep_near_duplicates=False):
+        super().__init__(path, days, near_dedupe, enricher, keep_near_duplicates)
+        if enricher:
+            self.columns = self.columns + ["description"]
+
+    def _write_row(self, row):
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def _summary_line(self):
+        summary = {"total_jobs": self.written, "scrape_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        return json.dumps({"summary": summary}) + "\n"
+
+
+class HistorySink(JobSink):
+    """
+    Appends each batch to the JobStore's append-only history under one run id.
+    Nothing is date-filtered here; readers filter on posted_at with query().
+    """
+
+    def __init__(self, store, params=None):
+        super().__init__(days=None)
+        self.store = store
+        self.run_id = store.start_run(params)
+
+    def _write_rows(self, rows, search_term):
+        country = search_term.get("location") if search_term else None
+        self.store.append(self.run_id, rows, country=country)
+
+    def close(self):
+        self.store.finish_run(self.run_id)
+
+    def discard(self):
+        self.store.finish_run(self.run_id)
+
+
+SINKS = {
+    "csv": CsvSink,
+    "jsonl": JsonlSink
+}
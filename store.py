@@ -0,0 +1,341 @@
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+import pandas as pd
+from config import STORE_PATH, CSV_COLUMNS, CATEGORICAL_COLUMNS, OUTPUT_FILE
+from utils import normalize_url, parse_relative_date
+from records import categorize
+
+
+class JobStore:
+    """
+    Persistent job history in SQLite.
+
+    `jobs` holds one row per posting, keyed by the normalized job link, with
+    the time it was first and last seen, so repeated runs upsert into it
+    instead of rebuilding the output from scratch.
+
+    `job_history` is append-only: every run is recorded in `runs` and its
+    jobs are appended as a batch tagged with the run id. It is indexed on
+    link, source, location, country and posted date so readers can load
+    just the slice they need with query().
+    """
+
+    def __init__(self, path=None):
+        self.path = path or STORE_PATH
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                key TEXT PRIMARY KEY,
+                title TEXT,
+                company TEXT,
+                location TEXT,
+                posted_date TEXT,
+                link TEXT,
+                source TEXT,
+                first_seen TEXT,
+                last_seen TEXT
+            )
+        """)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT,
+                finished_at TEXT,
+                params TEXT,
+                job_count INTEGER DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS job_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER REFERENCES runs(run_id),
+                key TEXT,
+                title TEXT,
+                company TEXT,
+                location TEXT,
+                country TEXT,
+                posted_date TEXT,
+                posted_at TEXT,
+                link TEXT,
+                source TEXT,
+                scraped_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_history_key ON job_history(key);
+            CREATE INDEX IF NOT EXISTS idx_history_source ON job_history(source);
+            CREATE INDEX IF NOT EXISTS idx_history_location ON job_history(location);
+            CREATE INDEX IF NOT EXISTS idx_history_country ON job_history(country);
+            CREATE INDEX IF NOT EXISTS idx_history_posted_at ON job_history(posted_at);
+            CREATE INDEX IF NOT EXISTS idx_history_run ON job_history(run_id);
+            CREATE TABLE IF NOT EXISTS job_details (
+                key TEXT PRIMARY KEY,
+                company TEXT,
+                posted_date TEXT,
+                description TEXT,
+                status INTEGER,
+                enriched_at TEXT
+            );
+        """)
+        self._conn.commit()
+
+    def known_keys(self):
+        """Returns the normalized links of every stored job"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT key FROM jobs")}
+
+    def upsert(self, jobs, seen_at=None):
+        """
+        Inserts new jobs and refreshes the last-seen time (and latest fields) of known ones.
+
+        Returns:
+            Tuple[int, int]: (new jobs, already known jobs)
+        """
+        seen_at = (seen_at or datetime.now()).isoformat(timespec="seconds")
+        rows = []
+        for job in jobs:
+            key = normalize_url(job.get("link"))
+            if not key or key == "N/A":
+                continue
+            rows.append((
+                key, job.get("title"), job.get("company"), job.get("location"),
+                job.get("posted_date"), job.get("link"), job.get("source"), seen_at, seen_at
+            ))
+
+        with self._lock:
+            before = self._count()
+            self._conn.executemany("""
+                INSERT INTO jobs (key, title, company, location, posted_date, link, source, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    title = excluded.title,
+                    company = excluded.company,
+                    location = excluded.location,
+                    posted_date = excluded.posted_date,
+                    link = excluded.link,
+                    source = excluded.source,
+                    last_seen = excluded.last_seen
+            """, rows)
+            self._conn.commit()
+            new_count = self._count() - before
+
+        return new_count, len(set(row[0] for row in rows)) - new_count
+
+    def get_details(self, keys):
+        """Detail-page data stored for these normalized links (see enrich.py), as {key: dict}"""
+        keys = list(keys)
+        details = {}
+        with self._lock:
+            # Chunked to stay under SQLite's bound parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, company, posted_date, description, status FROM job_details "
+                    f"WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+                )
+                for key, company, posted_date, description, status in rows:
+                    details[key] = {"company": company, "posted_date": posted_date,
+                                    "description": description, "status": status}
+        return details
+
+    def save_details(self, details):
+        """Stores detail-page data by normalized link, replacing what was there"""
+        enriched_at = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_details (key, company, posted_date, description, status, enriched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, d.get("company"), d.get("posted_date"), d.get("description"), d.get("status"), enriched_at)
+                 for key, d in details.items()]
+            )
+            self._conn.commit()
+
+    def _count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def count(self):
+        with self._lock:
+            return self._count()
+
+    def load(self):
+        """Returns every stored job (newest first) as a DataFrame with CSV_COLUMNS plus first/last seen"""
+        with self._lock:
+            return categorize(pd.read_sql_query(
+                f"SELECT {', '.join(CSV_COLUMNS)}, first_seen, last_seen FROM jobs ORDER BY first_seen DESC, rowid",
+                self._conn
+            ))
+
+    def iter_jobs(self, chunksize=1000):
+        """Yields stored jobs (newest first) as lists of dicts, `chunksize` at a time"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(CSV_COLUMNS)} FROM jobs ORDER BY first_seen DESC, rowid"
+            )
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            yield [dict(zip(CSV_COLUMNS, row)) for row in rows]
+
+    def start_run(self, params=None):
+        """Records a new run (batch) and returns its id"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, params) VALUES (?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), json.dumps(params or {}))
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def finish_run(self, run_id):
+        with self._lock:
+            self._conn.execute("""
+                UPDATE runs SET
+                    finished_at = ?,
+                    job_count = (SELECT COUNT(*) FROM job_history WHERE run_id = ?)
+                WHERE run_id = ?
+            """, (datetime.now().isoformat(timespec="seconds"), run_id, run_id))
+            self._conn.commit()
+
+    def latest_run(self):
+        """Id of the most recent finished run, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(run_id) FROM runs WHERE finished_at IS NOT NULL"
+            ).fetchone()
+        return row[0]
+
+    def append(self, run_id, jobs, country=None):
+        """Appends a batch of jobs to the history under `run_id`"""
+        scraped_at = datetime.now().isoformat(timespec="seconds")
+        rows = [
+            (
+                run_id, normalize_url(job.get("link")), job.get("title"), job.get("company"),
+                job.get("location"), country, job.get("posted_date"),
+                parse_relative_date(job.get("posted_date")).isoformat(timespec="seconds"),
+                job.get("link"), job.get("source"), scraped_at
+            )
+            for job in jobs
+        ]
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO job_history (run_id, key, title, company, location, country,
+                                         posted_date, posted_at, link, source, scraped_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            self._conn.commit()
+
+    def history_sources(self):
+        """Distinct sources present in the history"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT source FROM job_history ORDER BY source")]
+
+    def _history_filter(self, run_id=None, sources=None, countries=None, location=None, since=None,
+                        title=None, company=None):
+        """Builds the WHERE clause shared by query(), count_history() and iter_history()"""
+        where, params = [], []
+        if run_id is not None:
+            where.append("run_id = ?")
+            params.append(run_id)
+        if sources:
+            where.append(f"source IN ({', '.join('?' for _ in sources)})")
+            params.extend(sources)
+        if countries:
+            where.append(f"country IN ({', '.join('?' for _ in countries)})")
+            params.extend(countries)
+        if location:
+            where.append("location LIKE ?")
+            params.append(f"%{location}%")
+        if title:
+            where.append("title LIKE ?")
+            params.append(f"%{title}%")
+        if company:
+            where.append("company LIKE ?")
+            params.append(f"%{company}%")
+        if since:
+            where.append("posted_at >= ?")
+            params.append(since.isoformat(timespec="seconds"))
+        return (f"WHERE {' AND '.join(where)}" if where else ""), params
+
+    def _history_sql(self, select, where_sql, latest_only):
+        if latest_only:
+            return f"""
+                SELECT {select} FROM job_history
+                WHERE id IN (SELECT MAX(id) FROM job_history {where_sql} GROUP BY key)
+            """
+        return f"SELECT {select} FROM job_history {where_sql}"
+
+    def query(self, run_id=None, sources=None, countries=None, location=None, since=None,
+              columns=None, latest_only=True, title=None, company=None, limit=None, offset=0):
+        """
+        Reads a slice of the history as a DataFrame.
+
+        Args:
+            run_id (int): only this batch ("latest" for the most recent finished run)
+            sources (List[str]): e.g. ["LinkedIn"]
+            countries (List[str]): search countries, e.g. ["Kenya", "Uganda"]
+            location (str): substring of the job's own location
+            since (datetime): only jobs posted on or after this time
+            columns (List[str]): columns to return (defaults to CSV_COLUMNS)
+            latest_only (bool): keep only the most recent row per link
+            title, company (str): case-insensitive substrings to match
+            limit, offset (int): page through the results (newest posting first)
+        """
+        columns = columns or CSV_COLUMNS
+        if run_id == "latest":
+            run_id = self.latest_run()
+            if run_id is None:
+                return pd.DataFrame(columns=columns)
+
+        where_sql, params = self._history_filter(run_id, sources, countries, location, since, title, company)
+        sql = self._history_sql(", ".join(columns), where_sql, latest_only) + " ORDER BY posted_at DESC, id"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+
+        with self._lock:
+            return categorize(pd.read_sql_query(sql, self._conn, params=params))
+
+    def count_history(self, run_id=None, latest_only=True, **filters):
+        """Number of rows query() would return for the same filters, without loading them"""
+        if run_id == "latest":
+            run_id = self.latest_run()
+            if run_id is None:
+                return 0
+
+        where_sql, params = self._history_filter(run_id, **filters)
+        sql = f"SELECT COUNT(*) FROM ({self._history_sql('id', where_sql, latest_only)})"
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def iter_history(self, run_id=None, latest_only=True, chunksize=1000, **filters):
+        """Yields the rows query() would return as lists of dicts, `chunksize` at a time"""
+        if run_id == "latest":
+            run_id = self.latest_run()
+            if run_id is None:
+                return
+
+        where_sql, params = self._history_filter(run_id, **filters)
+        sql = self._history_sql(", ".join(CSV_COLUMNS), where_sql, latest_only) + " ORDER BY posted_at DESC, id"
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(sql, params)
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            yield [dict(zip(CSV_COLUMNS, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def read_output_csv(path=None):
+    """Reads a CSV written by run_scraper, skipping its '# Total Jobs Found' summary line"""
+    return pd.read_csv(path or OUTPUT_FILE, skiprows=1, dtype={column: "category" for column in CATEGORICAL_COLUMNS})
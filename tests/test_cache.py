@@ -0,0 +1,174 @@
+"""
+Response cache: fresh hits skip the network, stale entries are revalidated
+with their validators and a 304 serves the cached body, and the other modes
+behave as documented.
+"""
+import json
+import os
+import threading
+import pytest
+from cache import ResponseCache, CacheMissError
+from fetch import Fetcher
+
+URL = "https://jobs.example/search?q=python"
+PAGE = "<html><body>python jobs</body></html>"
+
+
+class FakeResponse:
+    def __init__(self, url, status_code, text="", headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """Answers each request with the next queued (status, body, headers)"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        status_code, text, headers = self.responses.pop(0)
+        return FakeResponse(url, status_code, text, headers)
+
+
+class NoWait:
+    def acquire(self, host):
+        return 0.0
+
+    def feedback(self, host, status_code, retry_after=None):
+        pass
+
+
+def fetcher_for(cache, session):
+    fetcher = Fetcher(cache=cache, scheduler=NoWait())
+    fetcher._session_for = lambda host: (session, threading.BoundedSemaphore(1))
+    return fetcher
+
+
+def age(cache, url, seconds):
+    """Backdates a cached entry's stored_at, leaving its LRU position alone"""
+    path = cache._entry_path(url)
+    with open(path) as f:
+        entry = json.load(f)
+    entry["stored_at"] -= seconds
+    with open(path, "w") as f:
+        json.dump(entry, f)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(directory=str(tmp_path / "cache"), ttls={"Example": 60}, default_ttl=60)
+
+
+def test_fresh_entry_is_served_without_a_request(cache):
+    cache.store(URL, PAGE, headers={"ETag": '"v1"'}, source="Example")
+    session = FakeSession([])
+    response = fetcher_for(cache, session).get(URL, source="Example")
+
+    assert response.text == PAGE
+    assert response.from_cache
+    assert session.requests == []
+
+
+def test_stale_entry_is_revalidated_and_304_serves_cached_body(cache):
+    cache.store(URL, PAGE, headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+                source="Example")
+    age(cache, URL, 120)
+    assert cache.lookup(URL, "Example")[2] is False
+
+    session = FakeSession([(304, "", {})])
+    response = fetcher_for(cache, session).get(URL, source="Example")
+
+    assert session.requests == [{"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}]
+    assert response.text == PAGE
+    assert response.from_cache
+    # The 304 resets the entry's age, so the next lookup is fresh again
+    assert cache.lookup(URL, "Example")[2] is True
+
+
+def test_stale_entry_replaced_when_page_changed(cache):
+    cache.store(URL, PAGE, headers={"ETag": '"v1"'}, source="Example")
+    age(cache, URL, 120)
+
+    new_page = "<html><body>more python jobs</body></html>"
+    session = FakeSession([(200, new_page, {"ETag": '"v2"'})])
+    response = fetcher_for(cache, session).get(URL, source="Example")
+
+    assert response.text == new_page
+    assert not response.from_cache
+    entry, body, is_fresh = cache.lookup(URL, "Example")
+    assert (entry["etag"], body, is_fresh) == ('"v2"', new_page, True)
+
+
+def test_error_responses_are_not_stored(cache):
+    session = FakeSession([(404, "not found", {})])
+    fetcher_for(cache, session).get(URL, source="Example")
+    assert cache.lookup(URL, "Example") == (None, None, False)
+
+
+def test_refresh_mode_always_refetches_and_stores(tmp_path):
+    directory = str(tmp_path / "cache")
+    ResponseCache(directory=directory).store(URL, "old", source="Example")
+    refresh = ResponseCache(directory=directory, mode="refresh")
+
+    session = FakeSession([(200, PAGE, {})])
+    response = fetcher_for(refresh, session).get(URL, source="Example")
+
+    assert response.text == PAGE
+    assert session.requests == [{}]
+    assert ResponseCache(directory=directory).lookup(URL, "Example")[1] == PAGE
+
+
+def test_offline_replay_serves_stale_entries_and_raises_on_miss(tmp_path):
+    directory = str(tmp_path / "cache")
+    writer = ResponseCache(directory=directory, default_ttl=60)
+    writer.store(URL, PAGE, source="Example")
+    age(writer, URL, 10 ** 6)
+
+    session = FakeSession([])
+    fetcher = fetcher_for(ResponseCache(directory=directory, mode="offline-replay"), session)
+    assert fetcher.get(URL, source="Example").text == PAGE
+    with pytest.raises(CacheMissError):
+        fetcher.get("https://jobs.example/never-seen", source="Example")
+    assert session.requests == []
+
+
+def test_identical_bodies_are_stored_once(cache):
+    cache.store(URL, PAGE)
+    cache.store(URL + "&page=2", PAGE)
+    assert len(os.listdir(os.path.join(cache.directory, "bodies"))) == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(directory=str(tmp_path / "cache"), max_bytes=350)
+    urls = [f"https://jobs.example/{i}" for i in range(3)]
+    for i, url in enumerate(urls):
+        cache.store(url, f"{i}" * 100)
+        path = cache._entry_path(url)
+        os.utime(path, (1000 + i, 1000 + i))
+    # Reading the first entry makes the second the least recently used
+    assert cache.lookup(urls[0])[1] is not None
+
+    cache.store("https://jobs.example/3", "3" * 100)
+
+    assert cache.lookup(urls[1]) == (None, None, False)
+    assert cache.lookup(urls[0])[1] == "0" * 100
+    assert cache.lookup("https://jobs.example/3")[1] == "3" * 100
+
+
+def test_restoring_a_url_drops_its_old_body(tmp_path):
+    cache = ResponseCache(directory=str(tmp_path / "cache"), max_bytes=1000)
+    for i in range(12):
+        cache.store(URL, f"{i:02d}" + "x" * 97)
+
+    assert cache.lookup(URL)[1] == "11" + "x" * 97
+    assert len(os.listdir(os.path.join(cache.directory, "bodies"))) <= 10
+
+    cache.store(URL + "&page=2", PAGE)
+    assert cache.lookup(URL)[1] is not None
+    assert cache.lookup(URL + "&page=2")[1] == PAGE
@@ -0,0 +1,35 @@
+"""Date parsing: parse_dates agrees with parse_relative_date, and the sinks filter batches with it"""
+from datetime import datetime, timedelta
+from sink import JobSink
+from utils import parse_dates, parse_relative_date
+
+DATES = ["2025-11-15", "3 days ago", "Yesterday", "2 weeks ago", "Recent", "N/A", None, "Dec 03, 2025"]
+
+
+class ListSink(JobSink):
+    def __init__(self, days):
+        super().__init__(days)
+        self.rows = []
+
+    def _write_rows(self, rows, search_term):
+        self.rows.extend(rows)
+
+
+def test_parse_dates_matches_row_wise_parser():
+    parsed = parse_dates(DATES)
+    for value, date in zip(DATES, parsed):
+        # Unparseable dates count as now, so compare to the day
+        assert date.date() == parse_relative_date(value).date()
+
+
+def test_sink_filters_each_batch_by_posted_date():
+    today = datetime.now().strftime("%Y-%m-%d")
+    old = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    sink = ListSink(days=7)
+    jobs = [{"posted_date": date, "link": f"https://example.com/{i}"}
+            for i, date in enumerate([today, old, "2 days ago", "a month ago", "Recent", None])]
+
+    assert sink.write(jobs) == 4
+    assert sink.write([]) == 0
+    assert [row["posted_date"] for row in sink.rows] == [today, "2 days ago", "Recent", None]
+    assert sink.filtered == 2
@@ -0,0 +1,93 @@
+"""Near-duplicate clustering thresholds and blocking (dedupe.py)"""
+import csv
+import pytest
+from benchmarks.bench_dedupe import build_postings
+from dedupe import NearDuplicateIndex, assign_canonical_ids, is_placeholder_company
+from sink import CsvSink
+
+
+def job(title, company, source, location="Nairobi", link=None):
+    return {"title": title, "company": company, "source": source, "location": location,
+            "link": link or f"https://example.com/{source}/{title}/{company}/{location}"}
+
+
+def same_cluster(*jobs):
+    return len(set(assign_canonical_ids(list(jobs)))) == 1
+
+
+def test_syndicated_copies_cluster():
+    assert same_cluster(
+        job("Data Analyst", "Safaricom PLC", "LinkedIn"),
+        job("data analyst ", "Safaricom", "BrighterMonday", location="Nairobi, Kenya"),
+        job("Data Analyst", "Safaricom Limited", "MyJobMag", location="N/A"),
+    )
+
+
+@pytest.mark.parametrize("other", [
+    job("Data Analyst", "Safaricom", "LinkedIn", link="https://example.com/2"),  # same source: two openings
+    job("Data Analyst", "Safaricom", "MyJobMag", location="Kampala"),      # elsewhere
+    job("Data Engineer", "Safaricom", "MyJobMag"),                         # other role, same employer
+    job("Data Analyst", "Equity Bank", "MyJobMag"),                        # other employer
+])
+def test_distinct_postings_stay_apart(other):
+    assert not same_cluster(job("Data Analyst", "Safaricom", "LinkedIn"), other)
+
+
+@pytest.mark.parametrize("company", ["N/A", "", None, "Confidential", "Company Confidential Ltd"])
+def test_placeholder_companies_never_cluster(company):
+    assert is_placeholder_company(company)
+    assert not same_cluster(job("Data Analyst", company, "LinkedIn"), job("Data Analyst", company, "MyJobMag"))
+
+
+def test_canonical_id_is_first_jobs():
+    index = NearDuplicateIndex()
+    first_id, first_dup = index.add(job("Data Analyst", "Safaricom", "LinkedIn"))
+    second_id, second_dup = index.add(job("Data Analyst", "Safaricom PLC", "MyJobMag"))
+    assert (second_id, first_dup, second_dup) == (first_id, False, True)
+
+
+def partition(ids):
+    clusters = {}
+    for i, cluster in enumerate(ids):
+        clusters.setdefault(cluster, set()).add(i)
+    return {frozenset(members) for members in clusters.values()}
+
+
+@pytest.mark.parametrize("skewed", [False, True], ids=["even", "skewed"])
+def test_matches_true_clusters(skewed):
+    jobs, clusters = build_postings(1500, skewed=skewed)
+    assert partition(assign_canonical_ids(jobs)) == partition(clusters)
+
+
+def test_big_employer_is_not_one_block():
+    # 200 openings at one company: other titles and locations mustn't all become candidates
+    titles = ["Data Analyst", "Data Engineer", "Data Scientist", "BI Developer", "Analytics Engineer"]
+    cities = [f"City{i}" for i in range(40)]
+    index = NearDuplicateIndex()
+    for i, (title, city) in enumerate((t, c) for t in titles for c in cities):
+        index.add(job(title, "Safaricom", ["LinkedIn", "MyJobMag"][i % 2], location=city))
+    largest = max(len(bucket) for bucket in index._buckets.values())
+    assert largest <= len(cities)
+
+
+def sink_rows(tmp_path, keep_near_duplicates):
+    path = str(tmp_path / "jobs.csv")
+    sink = CsvSink(path, near_dedupe=NearDuplicateIndex(), keep_near_duplicates=keep_near_duplicates)
+    sink.write([job("Data Analyst", "Safaricom", "LinkedIn"), job("Data Engineer", "Equity Bank", "LinkedIn")])
+    sink.write([job("Data Analyst", "Safaricom PLC", "MyJobMag")])
+    sink.close()
+    with open(path, encoding="utf-8") as f:
+        next(f)
+        return list(csv.DictReader(f))
+
+
+def test_output_carries_canonical_id(tmp_path):
+    rows = sink_rows(tmp_path, keep_near_duplicates=False)
+    assert [row["source"] for row in rows] == ["LinkedIn", "LinkedIn"]
+    assert len({row["canonical_id"] for row in rows}) == 2
+
+
+def test_kept_copies_share_canonical_id(tmp_path):
+    rows = sink_rows(tmp_path, keep_near_duplicates=True)
+    assert [row["source"] for row in rows] == ["LinkedIn", "LinkedIn", "MyJobMag"]
+    assert rows[0]["canonical_id"] == rows[2]["canonical_id"] != rows[1]["canonical_id"]
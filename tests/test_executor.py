@@ -0,0 +1,171 @@
+"""Search executors: results in input order, per-host concurrency limits and the circuit breaker"""
+import random
+import threading
+import time
+from collections import defaultdict
+import pytest
+from executor import SearchExecutor, AsyncSearchExecutor
+from fetch import FetchError
+from scrapers.base import BaseScraper
+
+
+class NoWait:
+    """Scheduler that never holds a host back"""
+
+    def ready_in(self, host):
+        return 0.0
+
+    def acquire(self, host):
+        return 0.0
+
+
+class FakeScraper(BaseScraper):
+    """Returns one job per search after a short random delay, recording how many ran at once per host"""
+
+    def __init__(self, host, errors=None):
+        super().__init__()
+        self.host = host
+        # title -> exception to raise for that search
+        self.errors = errors or {}
+        self.calls = []
+
+    def host_for(self, search_term):
+        return self.host
+
+    def scrape(self, search_term):
+        tracker.enter(self.host)
+        try:
+            time.sleep(random.uniform(0.005, 0.03))
+            self.calls.append(search_term["title"])
+            if search_term["title"] in self.errors:
+                raise self.errors[search_term["title"]]
+            return [{"link": f"https://{self.host}/{search_term['title']}"}]
+        finally:
+            tracker.leave(self.host)
+
+
+class ConcurrencyTracker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.running = defaultdict(int)
+        self.peak = defaultdict(int)
+        self.peak_total = 0
+
+    def enter(self, host):
+        with self._lock:
+            self.running[host] += 1
+            self.peak[host] = max(self.peak[host], self.running[host])
+            self.peak_total = max(self.peak_total, sum(self.running.values()))
+
+    def leave(self, host):
+        with self._lock:
+            self.running[host] -= 1
+
+
+tracker = ConcurrencyTracker()
+
+EXECUTORS = {"thread": SearchExecutor, "async": AsyncSearchExecutor}
+LIMITS = {"a.example": 1, "b.example": 2, "c.example": 3}
+# One search at a time, so the breaker sees each failure before the next search starts
+BREAKER_LIMITS = {"down.example": 1, "up.example": 1}
+
+
+def make_executor(kind, **kwargs):
+    return EXECUTORS[kind](max_workers=6, host_limits=dict(LIMITS, **BREAKER_LIMITS), scheduler=NoWait(), **kwargs)
+
+
+def interleaved_searches(per_host=8):
+    scrapers = [FakeScraper(host) for host in LIMITS]
+    return [(scraper, {"title": f"t{i}", "location": "Kenya"}) for i in range(per_host) for scraper in scrapers]
+
+
+@pytest.fixture(autouse=True)
+def reset_tracker():
+    tracker.reset()
+
+
+@pytest.mark.parametrize("kind", sorted(EXECUTORS))
+def test_results_come_back_in_input_order(kind):
+    searches = interleaved_searches()
+    finished = []
+    results = make_executor(kind).run(searches, on_result=lambda index, *rest: finished.append(index))
+
+    assert results == [[{"link": f"https://{scraper.host}/{term['title']}"}] for scraper, term in searches]
+    assert sorted(finished) == list(range(len(searches)))
+
+
+@pytest.mark.parametrize("kind", sorted(EXECUTORS))
+def test_per_host_limits_hold(kind):
+    make_executor(kind).run(interleaved_searches())
+
+    for host, limit in LIMITS.items():
+        assert 1 <= tracker.peak[host] <= limit
+    # Hosts still ran side by side
+    assert tracker.peak_total > max(LIMITS.values())
+
+
+@pytest.mark.parametrize("kind", sorted(EXECUTORS))
+def test_searches_keep_their_order_within_a_host(kind):
+    searches = interleaved_searches()
+    make_executor(kind).run(searches)
+    # One at a time on a.example, so it ran its searches in plan order
+    assert searches[0][0].calls == [f"t{i}" for i in range(8)]
+
+
+def test_keep_results_false_hands_jobs_to_on_result_only():
+    searches = interleaved_searches(per_host=2)
+    seen = {}
+    results = make_executor("thread").run(
+        searches, on_result=lambda index, scraper, term, jobs, error: seen.setdefault(index, jobs), keep_results=False
+    )
+    assert results == [[] for _ in searches]
+    assert all(len(seen[index]) == 1 for index in range(len(searches)))
+
+
+# --- Circuit breaker ---
+
+def failing_searches(errors, count=6, host="down.example"):
+    scraper = FakeScraper(host, errors={f"t{i}": error for i, error in errors.items()})
+    return scraper, [(scraper, {"title": f"t{i}", "location": "Kenya"}) for i in range(count)]
+
+
+def outcomes(executor, searches):
+    errors = {}
+    executor.run(searches, on_result=lambda index, scraper, term, jobs, error: errors.__setitem__(index, error))
+    return [type(errors[index]).__name__ if errors[index] else None for index in range(len(searches))]
+
+
+@pytest.mark.parametrize("kind", sorted(EXECUTORS))
+def test_breaker_skips_a_source_after_consecutive_fetch_errors(kind):
+    scraper, searches = failing_searches({i: FetchError("Status 503", 503) for i in range(6)})
+    executor = make_executor(kind, breaker_threshold=3)
+
+    assert outcomes(executor, searches) == ["FetchError"] * 3 + ["CircuitOpenError"] * 3
+    assert len(scraper.calls) == 3
+    assert [term["title"] for _, term in executor.skipped] == ["t3", "t4", "t5"]
+
+
+def test_breaker_resets_on_success():
+    _, searches = failing_searches({0: FetchError("timeout"), 1: FetchError("timeout"),
+                                    3: FetchError("timeout"), 4: FetchError("timeout")})
+    executor = make_executor("thread", breaker_threshold=3)
+    assert "CircuitOpenError" not in outcomes(executor, searches)
+    assert executor.skipped == []
+
+
+def test_breaker_ignores_errors_that_are_not_the_sites_fault():
+    # A parser bug isn't the site being down
+    _, searches = failing_searches({i: ValueError("bad selector") for i in range(6)})
+    executor = make_executor("thread", breaker_threshold=3)
+    assert outcomes(executor, searches) == ["ValueError"] * 6
+
+
+def test_breaker_is_per_host():
+    _, down = failing_searches({i: FetchError("Status 502", 502) for i in range(4)}, count=4)
+    healthy = [(FakeScraper("up.example"), {"title": f"t{i}", "location": "Kenya"}) for i in range(4)]
+    result = outcomes(make_executor("thread", breaker_threshold=2), down + healthy)
+    assert result[4:] == [None] * 4
+    assert result[2:4] == ["CircuitOpenError"] * 2
@@ -0,0 +1,21 @@
+"""
+Retry policy: retries are capped per request and by a budget shared across a
+run, which a long-lived fetcher restores when the next run starts.
+"""
+from fetch import RetryPolicy
+
+
+def test_budget_is_shared_across_requests():
+    retry = RetryPolicy(max_retries=2, budget=3)
+    assert [retry.should_retry(0), retry.should_retry(1), retry.should_retry(2)] == [True, True, False]
+    assert [retry.should_retry(0), retry.should_retry(0)] == [True, False]
+
+
+def test_reset_restores_the_budget():
+    retry = RetryPolicy(max_retries=2, budget=1)
+    assert retry.should_retry(0)
+    assert not retry.should_retry(0)
+
+    retry.reset()
+    assert retry.should_retry(0)
+    assert not retry.should_retry(0)
@@ -0,0 +1,131 @@
+"""
+LinkedinScraper's readiness waits and error handling, driven by a stand-in
+WebDriver that answers element lookups from saved pages (no Chrome needed).
+"""
+import os
+import time
+import pytest
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import WebDriverException
+from benchmarks.fixture_pages import FIXTURES_DIR
+from config import LINKEDIN_READY_TIMEOUT
+from fetch import FetchError
+from scrapers.driver_pool import DriverPool
+from scrapers.linkedin import LinkedinScraper
+
+TESTS_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read(*path):
+    with open(os.path.join(*path), encoding="utf-8") as f:
+        return f.read()
+
+
+class PageDriver:
+    """Just enough of a WebDriver for _scrape_with: every get() shows the same saved page"""
+
+    def __init__(self, html):
+        self.page_source = html
+        self.soup = BeautifulSoup(html, "html.parser")
+        self.current_url = None
+
+    def get(self, url):
+        self.current_url = url
+
+    def find_elements(self, by, selector):
+        return self.soup.select(selector)
+
+    def execute_script(self, script, *args):
+        if "querySelectorAll" in script:
+            return len(self.soup.select(args[0]))
+        return None
+
+    def quit(self):
+        pass
+
+
+class NoWait:
+    def acquire(self, host):
+        return 0.0
+
+
+def scraper_for(html):
+    scraper = LinkedinScraper(extraction="page_source", max_pages=1, scheduler=NoWait())
+    scraper.cookie = None
+    scraper.pool = DriverPool(lambda: PageDriver(html))
+    return scraper
+
+
+def timed_scrape(html):
+    scraper = scraper_for(html)
+    start = time.monotonic()
+    try:
+        jobs = scraper.scrape({"title": "Data Engineer", "location": "Djibouti"})
+    finally:
+        scraper.close()
+    return jobs, time.monotonic() - start
+
+
+@pytest.mark.parametrize("page, state", [
+    ("linkedin_no_results.html", "empty"),
+    ("linkedin_login_wall.html", "login_wall"),
+])
+def test_wait_ends_on_page_without_cards(page, state):
+    html = read(TESTS_FIXTURES, page)
+    assert scraper_for(html)._wait_for_results(PageDriver(html)) == state
+
+    jobs, elapsed = timed_scrape(html)
+    assert jobs == []
+    # Recognized right away, not after the ready timeout
+    assert elapsed < min(1, LINKEDIN_READY_TIMEOUT)
+
+
+def test_wait_ends_on_cards():
+    html = read(FIXTURES_DIR, "linkedin_synthetic1.html")
+    scraper = scraper_for(html)
+    assert scraper._wait_for_results(PageDriver(html)) == "cards"
+
+    jobs, elapsed = timed_scrape(html)
+    assert jobs == scraper.parse(html, {"location": "Djibouti"})
+    assert len(jobs) == 25
+    assert elapsed < 1
+
+
+def test_wait_times_out_on_blank_page(monkeypatch):
+    monkeypatch.setattr("scrapers.linkedin.LINKEDIN_READY_TIMEOUT", 0.3)
+    html = "<html><body><main></main></body></html>"
+    assert scraper_for(html)._wait_for_results(PageDriver(html)) is None
+
+
+class CrashingDriver(PageDriver):
+    def get(self, url):
+        raise WebDriverException("chrome not reachable")
+
+
+def test_navigation_errors_count_against_linkedin():
+    scraper = scraper_for("")
+    scraper.pool = DriverPool(lambda: CrashingDriver(""))
+    try:
+        with pytest.raises(FetchError):
+            scraper.scrape({"title": "Data Engineer", "location": "Kenya"})
+        # The driver was dropped, not handed to the next search
+        assert scraper.pool._idle.empty()
+    finally:
+        scraper.close()
+
+
+def test_extraction_errors_propagate(monkeypatch):
+    html = read(FIXTURES_DIR, "linkedin_synthetic1.html")
+    scraper = scraper_for(html)
+
+    def broken_parse(html, search_term):
+        raise AttributeError("'NoneType' object has no attribute 'get_text'")
+
+    monkeypatch.setattr(scraper, "parse", broken_parse)
+    try:
+        with pytest.raises(AttributeError):
+            scraper.scrape({"title": "Data Engineer", "location": "Kenya"})
+        # A parser bug doesn't cost a healthy browser
+        assert not scraper.pool._idle.empty()
+    finally:
+        scraper.close()
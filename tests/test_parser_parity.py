@@ -0,0 +1,37 @@
+"""
+The fast parser path (HTML_PARSER backend + SoupStrainer) must return the
+same records as the original full html.parser tree, for every HttpScraper,
+on the committed fixture pages (benchmarks/fixtures).
+"""
+import pytest
+from benchmarks.fixture_pages import load_fixtures
+from benchmarks.parser_parity import SCRAPERS, check_page
+from scrapers.base import HttpScraper
+
+FIXTURES = load_fixtures(sources=SCRAPERS)
+
+
+def all_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from all_subclasses(subclass)
+
+
+def test_every_http_scraper_has_fixtures():
+    covered = {SCRAPERS[fixture["source"]] for fixture in FIXTURES}
+    assert set(all_subclasses(HttpScraper)) <= covered
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda fixture: fixture["file"])
+def test_fast_parser_matches_reference(fixture):
+    reference, fast = check_page(fixture["source"], fixture["location"], fixture["html"])
+    assert reference, "fixture page parsed to no records"
+    assert fast == reference
+    assert fast == fixture["expected"]
+
+
+@pytest.mark.parametrize("source", sorted(SCRAPERS))
+def test_pages_without_cards_parse_to_nothing(source):
+    html = "<html><body><main><p>No jobs found</p></main></body></html>"
+    reference, fast = check_page(source, "Kenya", html)
+    assert reference == fast == []
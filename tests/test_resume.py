@@ -0,0 +1,150 @@
+"""
+Checkpointed runs: an interrupted or partly failed run, once resumed, writes
+the same output as an uninterrupted one, and finished runs drop their batches.
+"""
+import zlib
+import pytest
+from benchmarks.fixture_pages import load_fixtures, FixtureFetcher
+from fetch import FetchError, FetchResponse
+from main import run_scraper, resume_run
+from manifest import RunManifest
+from store import JobStore
+from enrich import DetailEnricher
+from config import ENRICH_SOURCES
+
+FIXTURES = load_fixtures()
+
+
+class UrlFixtureFetcher(FixtureFetcher):
+    """Picks the fixture page by URL, so a search gets the same page however often it runs"""
+
+    def __init__(self, fixtures, fail=None):
+        super().__init__(fixtures)
+        # fail(source, request_number) -> exception to raise instead of responding
+        self.fail = fail
+
+    def get(self, url, headers=None, timeout=None, source=None):
+        self.requests += 1
+        if self.fail:
+            error = self.fail(source, self.requests)
+            if error:
+                raise error
+        pages = self.pages.get(source)
+        html = "<html><body></body></html>"
+        if pages and self._is_first_page(url):
+            html = pages[zlib.crc32(url.encode()) % len(pages)]
+        response = FetchResponse(url, 200, html)
+        response.from_cache = True
+        return response
+
+
+@pytest.fixture
+def run_in(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manifest_file = str(tmp_path / "manifest.sqlite")
+
+    def run(name, fail=None, **kwargs):
+        output_file = str(tmp_path / f"{name}.csv")
+        run_scraper(
+            limit=3, workers=1, fetcher=UrlFixtureFetcher(FIXTURES, fail), output_file=output_file,
+            linkedin_backend="http", metrics_file=str(tmp_path / "metrics.json"),
+            manifest_file=manifest_file, **kwargs
+        )
+        return output_file
+
+    run.manifest_file = manifest_file
+    return run
+
+
+def rows(path):
+    # Without the summary line, which carries the run time
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()[1:]
+
+
+def latest_run(manifest_file):
+    manifest = RunManifest(manifest_file)
+    try:
+        return manifest._conn.execute("SELECT MAX(run_id) FROM manifest_runs").fetchone()[0]
+    finally:
+        manifest.close()
+
+
+def stored_batches(manifest_file, run_id):
+    manifest = RunManifest(manifest_file)
+    try:
+        return manifest._conn.execute(
+            "SELECT COUNT(*) FROM manifest_searches WHERE run_id = ? AND jobs IS NOT NULL", (run_id,)
+        ).fetchone()[0]
+    finally:
+        manifest.close()
+
+
+def test_resume_after_crash_matches_clean_run(run_in):
+    expected = rows(run_in("clean"))
+    assert len(expected) > 10
+
+    # The fifth request (the third search, after two pages each) dies the way
+    # Ctrl-C or a killed process would leave it
+    crash = lambda source, n: KeyboardInterrupt() if n == 5 else None
+    with pytest.raises(KeyboardInterrupt):
+        run_in("resumed", fail=crash)
+    run_id = latest_run(run_in.manifest_file)
+    assert stored_batches(run_in.manifest_file, run_id) == 2
+
+    output_file = run_in("resumed", resume=run_id)
+    assert rows(output_file) == expected
+
+
+def test_resume_retries_failed_searches(run_in):
+    expected = rows(run_in("clean"))
+
+    down = lambda source, n: FetchError("Status 503", 503) if source == "MyJobMag" else None
+    partial = rows(run_in("resumed", fail=down))
+    run_id = latest_run(run_in.manifest_file)
+    assert len(partial) < len(expected)
+    # Finished, but with failures: the batches stay for --resume
+    assert stored_batches(run_in.manifest_file, run_id) > 0
+
+    assert rows(run_in("resumed", resume=run_id)) == expected
+
+
+def test_finished_runs_drop_their_batches(run_in, caplog):
+    run_in("clean")
+    run_id = latest_run(run_in.manifest_file)
+    assert stored_batches(run_in.manifest_file, run_id) == 0
+
+    manifest = RunManifest(run_in.manifest_file)
+    try:
+        assert not manifest.resumable(run_id)
+        assert len(manifest.done(run_id)) == 9
+    finally:
+        manifest.close()
+
+    resume_run(run_id, manifest_file=run_in.manifest_file)
+    assert "nothing to resume" in caplog.text
+
+
+class MarkingEnricher(DetailEnricher):
+    """DetailEnricher whose detail pages all carry the same posted date"""
+
+    posted_date = "2020-01-02"
+
+    def _fetch(self, job):
+        self.fetched += 1
+        return {"status": 200, "posted_date": self.posted_date}
+
+
+@pytest.mark.parametrize("incremental", [False, True], ids=["output", "incremental"])
+def test_history_gets_enriched_jobs(run_in, monkeypatch, incremental):
+    monkeypatch.setattr("main.DetailEnricher", MarkingEnricher)
+    # Near-duplicates are kept, so every copy in the output was enriched too
+    run_in("enriched", history=True, enrich=True, incremental=incremental, near_dedupe=False)
+
+    store = JobStore()
+    try:
+        dates = {row["posted_date"] for rows in store.iter_history(latest_only=False) for row in rows
+                 if row["source"] in ENRICH_SOURCES}
+    finally:
+        store.close()
+    assert dates == {MarkingEnricher.posted_date}
@@ -0,0 +1,69 @@
+"""Work queue claiming and the per-host pacing its workers share"""
+import threading
+import time
+import pytest
+from workqueue import WorkQueue, QueueScheduler, host_limit
+
+HOST = "www.example.co.ke"
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "queue.sqlite")
+
+
+def scheduler_on(path, delay=0.2):
+    return QueueScheduler(WorkQueue(path), delay_range=(delay, delay), burst=1)
+
+
+def test_workers_share_host_pacing(queue_path):
+    # Two "workers" with their own connections take turns on one bucket
+    workers = [scheduler_on(queue_path), scheduler_on(queue_path)]
+    per_worker = 3
+
+    def run(scheduler):
+        for _ in range(per_worker):
+            scheduler.acquire(HOST)
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=run, args=(scheduler,)) for scheduler in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    # One burst token, then one request per 0.2 s across both workers
+    assert elapsed >= (2 * per_worker - 1) * 0.2 * 0.9
+
+
+def test_backoff_reaches_other_workers(queue_path):
+    first, second = scheduler_on(queue_path), scheduler_on(queue_path)
+    first.acquire(HOST)
+    first.feedback(HOST, 429, retry_after="5")
+    assert second.ready_in(HOST) > 4
+
+
+def test_other_hosts_are_not_held_up(queue_path):
+    first, second = scheduler_on(queue_path), scheduler_on(queue_path)
+    first.acquire(HOST)
+    first.feedback(HOST, 503, retry_after="5")
+    assert second.ready_in("www.other.co.ug") == 0
+
+
+def test_claims_respect_host_limit(queue_path):
+    queue = WorkQueue(queue_path)
+    limit = host_limit(HOST)
+    items = [("Scraper", HOST, {"title": f"t{i}"}) for i in range(limit + 2)] + [("Scraper", "other", {"title": "x"})]
+    run_id = queue.create_run(items)
+
+    claimed = [queue.claim(run_id, "w") for _ in range(limit + 1)]
+    hosts = [items[item[0]][1] for item in claimed if item]
+    assert hosts.count(HOST) == limit
+    assert hosts.count("other") == 1
+    assert queue.claim(run_id, "w") is None
+
+    # Finishing one frees a slot on its host, and results come back in plan order
+    queue.complete(run_id, claimed[0][0], [{"link": "a"}])
+    assert queue.claim(run_id, "w")[0] == limit
+    assert [idx for idx, _, _ in queue.collect(run_id)] == [0]
@@ -1,10 +1,15 @@
 import logging
+import re
 import time
 import random
+from functools import lru_cache
 from fake_useragent import UserAgent
 import dateparser
-from datetime import datetime
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from datetime import date, datetime, timedelta
 from urllib.parse import urlparse, urlunparse
+from config import TITLE_SYNONYMS, DATE_CACHE_SIZE
 
 def setup_logger(name="JobScraper"):
     """Sets up a console logger"""
@@ -41,20 +46,109 @@ def get_random_headers():
         "Upgrade-Insecure-Requests": "1"
     }
 
+# Date strings we see constantly and can parse without dateparser
+ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+RELATIVE_DATE_RE = re.compile(
+    r"^(\d+|an?|one)\s+(second|minute|hour|day|week|month|year)s?\s+ago$", re.IGNORECASE
+)
+RELATIVE_UNITS = {
+    "second": relativedelta(seconds=1),
+    "minute": relativedelta(minutes=1),
+    "hour": relativedelta(hours=1),
+    "day": relativedelta(days=1),
+    "week": relativedelta(weeks=1),
+    "month": relativedelta(months=1),
+    "year": relativedelta(years=1)
+}
+RECENT_DATES = {"recent", "n/a", "today", "just now"}
+
+def _parse_date_fast(date_str):
+    """ISO dates (LinkedIn's datetime attribute) and 'N <unit>s ago', else None"""
+    if ISO_DATE_RE.match(date_str):
+        try:
+            dt = datetime.fromisoformat(date_str)
+        except ValueError:
+            return None
+        # Compare in local time like the rest of the pipeline
+        return dt.astimezone().replace(tzinfo=None) if dt.tzinfo else dt
+
+    match = RELATIVE_DATE_RE.match(date_str)
+    if match:
+        amount, unit = match.groups()
+        count = int(amount) if amount.isdigit() else 1
+        return datetime.now() - RELATIVE_UNITS[unit.lower()] * count
+
+    if date_str.lower() == "yesterday":
+        return datetime.now() - timedelta(days=1)
+
+    return None
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_slow(date_str, today):
+    """
+    dateparser fallback, memoized per day: relative results are
+    at most a day stale, absolute ones never change.
+    """
+    try:
+        return dateparser.parse(date_str)
+    except:
+        return None
+
 def parse_relative_date(date_str):
     """
     Parses a relative date string (e.g., '2 days ago', 'Just now') into a datetime object.
     Returns datetime.now() if parsing fails to ensure we don't crash, 
     but effectively treats unknown dates as 'recent'.
     """
-    if not date_str or date_str.lower() in ["recent", "n/a", "today", "just now"]:
+    if not date_str or not isinstance(date_str, str) or date_str.lower() in RECENT_DATES:
         return datetime.now()
         
-    try:
-        dt = dateparser.parse(date_str)
-        return dt if dt else datetime.now()
-    except:
-        return datetime.now()
+    dt = _parse_date_fast(date_str.strip()) or _parse_date_slow(date_str, date.today())
+    return dt if dt else datetime.now()
+
+def parse_dates(values):
+    """
+    Vectorized parse_relative_date for a pandas Series (or a list of strings).
+
+    Plain ISO dates are converted in one pd.to_datetime call; every other
+    distinct string is parsed once and mapped back onto the rows.
+    """
+    if not isinstance(values, pd.Series):
+        values = pd.Series(values, dtype=object)
+    # astype(object) first: categorical columns can't be filled with a value that isn't a category
+    values = values.astype(object).fillna("N/A").astype(str)
+    parsed = pd.to_datetime(values, format="%Y-%m-%d", errors="coerce")
+
+    remaining = parsed.isna()
+    if remaining.any():
+        lookup = {value: parse_relative_date(value) for value in values[remaining].unique()}
+        parsed[remaining] = pd.to_datetime(values[remaining].map(lookup))
+
+    return parsed
+
+def filter_by_days(df, days, column="posted_date"):
+    """Keeps rows posted within the last N days (unparseable dates count as recent)"""
+    cutoff = datetime.now() - timedelta(days=days)
+    return df[parse_dates(df[column]) >= cutoff]
+
+def is_within_days(date_obj, days):
+    """Checks whether a datetime falls within the last N days"""
+    return date_obj >= datetime.now() - timedelta(days=days)
+
+def canonical_title(title):
+    """
+    Reduces a job title to a canonical form so synonyms compare equal,
+    e.g. 'head of BI' and 'business intelligence head' -> 'business intelligence head'.
+    """
+    words = []
+    for word in title.lower().split():
+        words.extend(TITLE_SYNONYMS.get(word, word).split())
+        
+    # 'head of X' -> 'X head'
+    if len(words) > 2 and words[0] == "head" and words[1] == "of":
+        words = words[2:] + ["head"]
+        
+    return " ".join(words)
 
 def normalize_url(url):
     """
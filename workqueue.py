@@ -0,0 +1,407 @@
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from config import WORK_QUEUE_PATH, WORK_QUEUE_LEASE, WORK_QUEUE_POLL, PER_HOST_CONCURRENCY, HOST_CONCURRENCY
+from executor import SearchExecutor, CircuitBreaker, CircuitOpenError, timed_scrape
+from fetch import Fetcher, FetchError
+from metrics import METRICS
+from politeness import PolitenessScheduler
+from utils import setup_logger
+
+
+class WorkItemError(Exception):
+    """A search that failed in a worker process (only the message makes it back)"""
+
+
+# Errors the coordinator rebuilds with their own type, so it can tell them apart
+ERROR_TYPES = {"CircuitOpenError": CircuitOpenError, "FetchError": FetchError}
+
+
+def host_limit(host):
+    return max(1, HOST_CONCURRENCY.get(host, PER_HOST_CONCURRENCY))
+
+
+class WorkQueue:
+    """
+    Searches of a multi-process (or multi-host) run, queued in SQLite.
+
+    The coordinator enqueues every planned search of a run as a work item.
+    Workers claim pending items, never more at once per host than the
+    host's concurrency limit (across all workers), scrape them and store the
+    jobs on the item. The coordinator collects finished items and merges
+    them through the usual sink. An item whose worker hasn't finished it
+    within WORK_QUEUE_LEASE seconds is handed out again. Workers pace their
+    requests through the per-host buckets kept here too (see QueueScheduler).
+
+    Workers on other hosts need the database on a shared filesystem; the
+    queue only relies on the methods below, so a server-backed queue can
+    stand in for it.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or WORK_QUEUE_PATH
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        # Autocommit, transactions are opened explicitly (see _transaction)
+        self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS queue_runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT,
+                options TEXT
+            );
+            CREATE TABLE IF NOT EXISTS work_items (
+                run_id INTEGER REFERENCES queue_runs(run_id),
+                idx INTEGER,
+                scraper TEXT,
+                host TEXT,
+                search_term TEXT,
+                status TEXT DEFAULT 'pending',
+                worker TEXT,
+                claimed_at REAL,
+                attempts INTEGER DEFAULT 0,
+                finished_at REAL,
+                jobs TEXT,
+                error TEXT,
+                error_type TEXT,
+                merged INTEGER DEFAULT 0,
+                PRIMARY KEY (run_id, idx)
+            );
+            CREATE INDEX IF NOT EXISTS idx_work_items_status ON work_items(run_id, status, host);
+            CREATE TABLE IF NOT EXISTS worker_metrics (
+                run_id INTEGER,
+                worker TEXT,
+                data TEXT
+            );
+            CREATE TABLE IF NOT EXISTS host_pacing (
+                host TEXT PRIMARY KEY,
+                tokens REAL,
+                updated REAL,
+                penalty REAL,
+                blocked_until REAL
+            );
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so two workers can't claim the same item
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def create_run(self, items, options=None):
+        """
+        Enqueues a run's searches and returns its run id.
+
+        Args:
+            items (List[Tuple]): (scraper class name, host, search_term) per search, in plan order
+            options (Dict): what workers need to rebuild the scrapers (see run_worker)
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO queue_runs (created_at, options) VALUES (?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), json.dumps(options or {}))
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO work_items (run_id, idx, scraper, host, search_term) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, idx, scraper, host, json.dumps(term)) for idx, (scraper, host, term) in enumerate(items)]
+            )
+        return run_id
+
+    def latest_run(self):
+        row = self._conn.execute("SELECT MAX(run_id) FROM queue_runs").fetchone()
+        return row[0]
+
+    def run_options(self, run_id):
+        row = self._conn.execute("SELECT options FROM queue_runs WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def claim(self, run_id, worker):
+        """Claims the first pending item on a host with spare capacity, or returns None"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE work_items SET status = 'pending', worker = NULL "
+                "WHERE run_id = ? AND status = 'claimed' AND claimed_at < ?",
+                (run_id, now - WORK_QUEUE_LEASE)
+            )
+            busy = dict(conn.execute(
+                "SELECT host, COUNT(*) FROM work_items WHERE run_id = ? AND status = 'claimed' GROUP BY host",
+                (run_id,)
+            ).fetchall())
+            heads = conn.execute(
+                "SELECT host, MIN(idx) FROM work_items WHERE run_id = ? AND status = 'pending' "
+                "GROUP BY host ORDER BY MIN(idx)",
+                (run_id,)
+            ).fetchall()
+
+            for host, idx in heads:
+                if busy.get(host, 0) >= host_limit(host):
+                    continue
+                conn.execute(
+                    "UPDATE work_items SET status = 'claimed', worker = ?, claimed_at = ?, attempts = attempts + 1 "
+                    "WHERE run_id = ? AND idx = ?",
+                    (worker, now, run_id, idx)
+                )
+                scraper, search_term = conn.execute(
+                    "SELECT scraper, search_term FROM work_items WHERE run_id = ? AND idx = ?", (run_id, idx)
+                ).fetchone()
+                return idx, scraper, json.loads(search_term)
+        return None
+
+    def complete(self, run_id, idx, jobs, error=None):
+        """Stores a claimed item's jobs (or error). Ignored if another worker already finished it."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE work_items SET status = ?, finished_at = ?, jobs = ?, error = ?, error_type = ? "
+                "WHERE run_id = ? AND idx = ? AND status = 'claimed'",
+                ("failed" if error else "done", time.time(), json.dumps(jobs),
+                 str(error) if error else None, error.__class__.__name__ if error else None, run_id, idx)
+            )
+
+    def skip_remaining(self, run_id, scraper, host, message):
+        """Fails every pending item of a scraper/host whose circuit breaker opened. Returns the count."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE work_items SET status = 'failed', finished_at = ?, jobs = '[]', error = ?, "
+                "error_type = 'CircuitOpenError' "
+                "WHERE run_id = ? AND scraper = ? AND host = ? AND status = 'pending'",
+                (time.time(), message, run_id, scraper, host)
+            )
+        return cursor.rowcount
+
+    def collect(self, run_id):
+        """
+        Finished items not handed to the coordinator yet, in plan order.
+
+        Returns:
+            List[Tuple]: (idx, jobs, error) with error rebuilt as an exception (or None)
+        """
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT idx, jobs, error, error_type FROM work_items "
+                "WHERE run_id = ? AND status IN ('done', 'failed') AND merged = 0 ORDER BY idx",
+                (run_id,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE work_items SET merged = 1 WHERE run_id = ? AND idx = ?", [(run_id, row[0]) for row in rows]
+            )
+
+        finished = []
+        for idx, jobs, error, error_type in rows:
+            if error_type:
+                error = ERROR_TYPES.get(error_type, WorkItemError)(error)
+            finished.append((idx, json.loads(jobs or "[]"), error))
+        return finished
+
+    def remaining(self, run_id):
+        """Items not finished yet (pending or claimed)"""
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM work_items WHERE run_id = ? AND status IN ('pending', 'claimed')", (run_id,)
+        ).fetchone()
+        return row[0]
+
+    def add_metrics(self, run_id, worker, data):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO worker_metrics (run_id, worker, data) VALUES (?, ?, ?)", (run_id, worker, json.dumps(data))
+            )
+
+    def worker_metrics(self, run_id):
+        rows = self._conn.execute("SELECT data FROM worker_metrics WHERE run_id = ?", (run_id,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self._conn.close()
+
+
+class QueueScheduler(PolitenessScheduler):
+    """
+    PolitenessScheduler whose host buckets live in a WorkQueue's database.
+
+    Every worker of a run, in any process or on any host sharing the queue
+    file, takes its tokens from the same bucket per host, so N workers hit a
+    host no faster than one thread-mode run would, and a 429/Retry-After
+    seen by one worker slows the host down for all of them. Buckets are read
+    and written back in one BEGIN IMMEDIATE transaction, and use wall-clock
+    time since monotonic clocks differ between processes.
+    """
+
+    def __init__(self, queue, **kwargs):
+        super().__init__(**kwargs)
+        self.queue = queue
+        self.clock = time.time
+
+    @contextmanager
+    def _host(self, host):
+        with self.queue._transaction() as conn:
+            bucket = self._new_bucket(host)
+            row = conn.execute(
+                "SELECT tokens, updated, penalty, blocked_until FROM host_pacing WHERE host = ?", (host,)
+            ).fetchone()
+            if row:
+                bucket.tokens, bucket.updated, bucket.penalty, bucket.blocked_until = row
+            yield bucket
+            conn.execute(
+                "INSERT OR REPLACE INTO host_pacing (host, tokens, updated, penalty, blocked_until) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (host, bucket.tokens, bucket.updated, bucket.penalty, bucket.blocked_until)
+            )
+
+
+def run_worker(path=None, run_id=None):
+    """
+    Claims and scrapes a run's searches until none are left. Started by
+    QueueExecutor in worker processes, or by hand on other hosts to join a
+    run (python main.py --join RUN).
+    """
+    logger = setup_logger()
+    queue = WorkQueue(path)
+    run_id = run_id or queue.latest_run()
+    options = queue.run_options(run_id)
+    if options is None:
+        logger.error(f"No run {run_id} in {queue.path}")
+        return
+
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Worker {worker} joining run {run_id}")
+
+    # Imported here: the scrapers pull in Selenium, which the queue itself doesn't need
+    from cache import ResponseCache
+    from scrapers import build_scrapers
+    from store import JobStore
+
+    cache = ResponseCache(mode=options.get("cache_mode", "off"))
+    # Pacing is shared with the run's other workers through the queue
+    scheduler = QueueScheduler(queue)
+    scrapers = build_scrapers(
+        fetcher=Fetcher(cache=cache, scheduler=scheduler), cache=cache,
+        linkedin_backend=options.get("linkedin_backend"), scheduler=scheduler
+    )
+    if options.get("incremental"):
+        store = JobStore()
+        known_links = store.known_keys()
+        store.close()
+        for scraper in scrapers:
+            scraper.known_links = known_links
+    by_name = {scraper.__class__.__name__: scraper for scraper in scrapers}
+
+    # Each worker has its own breaker, but an open one skips the source's searches for every worker
+    breaker = CircuitBreaker()
+    METRICS.reset()
+    done = 0
+    try:
+        while True:
+            item = queue.claim(run_id, worker)
+            if item is None:
+                if not queue.remaining(run_id):
+                    break
+                time.sleep(WORK_QUEUE_POLL)
+                continue
+
+            idx, name, search_term = item
+            scraper = by_name[name]
+            try:
+                jobs, error = timed_scrape(scraper, search_term) or [], None
+            except Exception as e:
+                jobs, error = [], e
+            queue.complete(run_id, idx, jobs, error)
+            done += 1
+
+            host = scraper.host_for(search_term)
+            if breaker.record(breaker.key(scraper, host), error):
+                skipped = queue.skip_remaining(
+                    run_id, name, host, f"skipped, {name} failed {breaker.threshold} searches in a row"
+                )
+                logger.warning(f"{name} failed {breaker.threshold} searches in a row on {host}, "
+                               f"skipped its {skipped} remaining searches")
+    finally:
+        for scraper in scrapers:
+            scraper.close()
+        queue.add_metrics(run_id, worker, METRICS.to_dict())
+        queue.close()
+        logger.info(f"Worker {worker} finished {done} searches")
+
+
+class QueueExecutor(SearchExecutor):
+    """
+    Runs searches in worker processes fed from a WorkQueue.
+
+    Same interface as SearchExecutor: the planned searches are enqueued,
+    `max_workers` processes are started to work through them (more can join
+    from other hosts), and finished searches are handed to on_result in this
+    process as they come in, so dedupe, date filtering and output stay in
+    the usual sink. Worker metrics are merged into METRICS at the end.
+
+    `options` is what workers need to rebuild the scrapers: cache_mode,
+    linkedin_backend and incremental.
+    """
+
+    def __init__(self, max_workers=None, queue_path=None, options=None, poll_interval=None):
+        super().__init__(max_workers)
+        self.queue_path = queue_path or WORK_QUEUE_PATH
+        self.options = options or {}
+        self.poll_interval = poll_interval or WORK_QUEUE_POLL
+        self.run_id = None
+
+    def run(self, searches, on_result=None, keep_results=True):
+        self._reset()
+        results = [[] for _ in searches]
+        if not searches:
+            return results
+
+        queue = WorkQueue(self.queue_path)
+        items = [(scraper.__class__.__name__, scraper.host_for(term), term) for scraper, term in searches]
+        self.run_id = queue.create_run(items, self.options)
+        self.logger.info(f"Queued {len(searches)} searches as run {self.run_id} in {queue.path} "
+                         f"(other hosts can join with: python main.py --join {self.run_id})")
+
+        # Spawned rather than forked, so workers don't inherit this process's threads and connections
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target=run_worker, args=(queue.path, self.run_id), name=f"worker-{i}")
+            for i in range(self.max_workers)
+        ]
+        for process in workers:
+            process.start()
+
+        try:
+            while True:
+                left = queue.remaining(self.run_id)
+                for idx, jobs, error in queue.collect(self.run_id):
+                    scraper, search_term = searches[idx]
+                    if isinstance(error, CircuitOpenError):
+                        self.skipped.append((scraper, search_term))
+                    self._finish(idx, scraper, search_term, jobs, error, results, on_result, keep_results)
+                if not left:
+                    break
+                if not any(process.is_alive() for process in workers):
+                    self.logger.error(f"All worker processes exited with {left} searches left in run {self.run_id}")
+                    break
+                time.sleep(self.poll_interval)
+
+            for process in workers:
+                process.join()
+        finally:
+            for process in workers:
+                if process.is_alive():
+                    process.terminate()
+            for data in queue.worker_metrics(self.run_id):
+                METRICS.merge(data)
+            queue.close()
+
+        return results